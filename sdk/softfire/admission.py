@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from sdk.softfire.bulkhead import BULKHEAD_METHODS
+from sdk.softfire.utils import RateLimitedError
+
+logger = logging.getLogger(__name__)
+
+# buckets kept, a forgotten bucket comes back full
+_MAX_USERS = 4096
+# the stream is a provide_resources call
+_ALIASES = {'provide_resources_stream': 'provide_resources'}
+
+
+class TokenBucket(object):
+    def __init__(self, rate, burst):
+        """
+        Allow rate calls per second on average and burst calls at once
+
+        :param rate: the tokens added per second
+        :param burst: the max number of tokens
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """
+        Take a token if available
+
+        :return: 0 if the token was taken, otherwise the seconds until the next token
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class AdmissionController(object):
+    def __init__(self, method_rates=None, user_rate=None, max_concurrent=0, max_users=_MAX_USERS):
+        """
+        Decide whether a call can start: each user has a token bucket per method and one for all the methods,
+        and at most max_concurrent calls run at the same time
+
+        :param method_rates: dict of method key -> (rate, burst) of the bucket of each user
+        :param user_rate: (rate, burst) of the bucket of each user for all the methods, None for no limit
+        :param max_concurrent: the max number of calls running at the same time, 0 for no limit
+        :param max_users: the number of users whose buckets are kept, the least recently seen one is forgotten
+        """
+        self.method_rates = method_rates or {}
+        self.user_rate = user_rate
+        self.max_concurrent = max_concurrent
+        self.max_users = max_users
+        self.running = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, username, method, rate):
+        key = (username, method)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(*rate)
+                while len(self._buckets) > self.max_users:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket
+
+    def admit(self, method, username):
+        """
+        Count the call as running, call release when it ends
+
+        :raise RateLimitedError: if the call must be rejected, with the seconds to wait before retrying
+        """
+        method = _ALIASES.get(method, method)
+        rate = self.method_rates.get(method)
+        if rate is not None:
+            retry_after = self._bucket(username, method, rate).take()
+            if retry_after:
+                raise RateLimitedError("Too many %s calls of %s, retry later" % (method, username), retry_after)
+        if self.user_rate is not None:
+            retry_after = self._bucket(username, None, self.user_rate).take()
+            if retry_after:
+                raise RateLimitedError("Too many calls of %s, retry later" % username, retry_after)
+        with self._lock:
+            if self.max_concurrent and self.running >= self.max_concurrent:
+                raise RateLimitedError("Too many calls running, retry later", 1.0)
+            self.running += 1
+
+    def release(self):
+        with self._lock:
+            self.running -= 1
+
+
+def _get_rate(manager_instance, prefix):
+    rate = manager_instance.get_config_float('system', '%s_rate' % prefix, '0')
+    if rate <= 0:
+        return None
+    return rate, manager_instance.get_config_float('system', '%s_burst' % prefix, str(max(1.0, rate)))
+
+
+def get_admission_controller(manager_instance):
+    """
+    Create the AdmissionController configured in the system section: <method>_rate and <method>_burst for the
+    calls of a method by one user, i.e. refresh_resources_rate = 0.2 and refresh_resources_burst = 3, user_rate
+    and user_burst for all the calls of one user, max_concurrent_calls for all the calls
+
+    :param manager_instance: the AbstractManager
+    :return: the AdmissionController, None if no limit is configured
+    """
+    method_rates = {}
+    for method in BULKHEAD_METHODS:
+        rate = _get_rate(manager_instance, method)
+        if rate is not None:
+            method_rates[method] = rate
+    user_rate = _get_rate(manager_instance, 'user')
+    max_concurrent = manager_instance.get_config_int('system', 'max_concurrent_calls', '0')
+    if not method_rates and user_rate is None and max_concurrent <= 0:
+        return None
+    return AdmissionController(method_rates, user_rate, max_concurrent)
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from sdk.softfire.utils import ServerBusyError
+
+logger = logging.getLogger(__name__)
+
+# methods that can be isolated in their own bulkhead, see get_bulkheads
+BULKHEAD_METHODS = ('list_resources', 'validate_resources', 'provide_resources', 'release_resources',
+                    'refresh_resources', 'create_user', 'delete_user')
+_DEFAULT_QUEUE = 10
+
+
+class Bulkhead(object):
+    def __init__(self, name, max_concurrent, max_queue=_DEFAULT_QUEUE):
+        """
+        Bound the calls of one method: at most max_concurrent run at the same time and at most max_queue wait
+        for a free slot, the others are rejected immediately
+
+        :param name: the name used in the logs
+        :param max_concurrent: the number of calls running at the same time
+        :param max_queue: the number of calls waiting for a free slot
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.running = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    @property
+    def capacity(self):
+        return self.max_concurrent + self.max_queue
+
+    def _check_queue(self):
+        if self.waiting >= self.max_queue:
+            logger.warning("Rejecting %s call: %d running and %d queued" % (self.name, self.running, self.waiting))
+            raise ServerBusyError("Too many %s calls, retry later" % self.name)
+
+    def acquire(self):
+        with self._condition:
+            if self.running >= self.max_concurrent:
+                self._check_queue()
+                self.waiting += 1
+                try:
+                    while self.running >= self.max_concurrent:
+                        self._condition.wait()
+                finally:
+                    self.waiting -= 1
+            self.running += 1
+
+    def release(self):
+        with self._condition:
+            self.running -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AsyncBulkhead(Bulkhead):
+    """
+    Bulkhead of the asyncio server: the calls wait for a free slot on the event loop instead of holding a thread
+    """
+
+    def __init__(self, name, max_concurrent, max_queue=_DEFAULT_QUEUE):
+        super().__init__(name, max_concurrent, max_queue)
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            if self.running >= self.max_concurrent:
+                self._check_queue()
+                self.waiting += 1
+                try:
+                    await self._condition.wait_for(lambda: self.running < self.max_concurrent)
+                finally:
+                    self.waiting -= 1
+            self.running += 1
+
+    async def release(self):
+        async with self._condition:
+            self.running -= 1
+            self._condition.notify()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+
+def get_bulkheads(manager_instance, bulkhead_class=Bulkhead):
+    """
+    Create the bulkheads configured in the system section as <method>_threads and <method>_queue,
+    i.e. provide_resources_threads = 3 and provide_resources_queue = 10.
+    Methods without <method>_threads share the server_threads pool
+
+    :param manager_instance: the AbstractManager
+    :param bulkhead_class: Bulkhead, or AsyncBulkhead for the asyncio server
+    :return: dict of method key -> Bulkhead
+    """
+    bulkheads = {}
+    for key in BULKHEAD_METHODS:
+        threads = manager_instance.get_config_int('system', '%s_threads' % key, '0')
+        if threads > 0:
+            bulkheads[key] = bulkhead_class(key, threads,
+                                            manager_instance.get_config_int('system', '%s_queue' % key, _DEFAULT_QUEUE))
+    if 'provide_resources' in bulkheads:
+        bulkheads['provide_resources_stream'] = bulkheads['provide_resources']
+    return bulkheads
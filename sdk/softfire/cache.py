@@ -0,0 +1,282 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from sdk.softfire.cancellation import CancellationToken, cancellation_scope, current_cancellation_token
+from sdk.softfire.utils import CancelledError
+
+
+class TTLCache(object):
+    def __init__(self, max_size=256, ttl=60):
+        """
+        Thread safe LRU cache whose entries expire after ttl seconds
+
+        :param max_size: the max number of entries, the least recently used one is evicted when full
+        :param ttl: the time to live of the entries in seconds
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        :return: the value or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._put(key, value)
+
+    def _put(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, predicate=None):
+        """
+        Remove the entries whose key matches predicate, all of them if predicate is None
+        """
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+
+def _username(user_info):
+    if user_info is None:
+        return ''
+    return user_info.name
+
+
+def call_key(method, user_info, payload=None):
+    """
+    Identify a call by method, user name and payload hash
+    """
+    payload_hash = hashlib.sha1(payload.encode('utf-8')).hexdigest() if payload else ''
+    return method, _username(user_info), payload_hash
+
+
+class ResponseCache(TTLCache):
+    """
+    Cache of the ResponseMessage of the catalog calls (list_resources and refresh_resources), keyed by call_key
+    """
+
+    key = staticmethod(call_key)
+
+    def __init__(self, max_size=256, ttl=60):
+        super().__init__(max_size=max_size, ttl=ttl)
+        # number of invalidations per user name, None for all the users
+        self._generations = {}
+
+    def generation(self, key):
+        """
+        Get the generation of the entry of key before computing its value, see put_if_valid
+        """
+        with self._lock:
+            return self._generations.get(None, 0), self._generations.get(key[1], 0)
+
+    def put_if_valid(self, key, value, generation):
+        """
+        Store value unless the entry of key was invalidated since generation, i.e. a provide_resources ran while
+        list_resources was computing value
+
+        :return: True if stored
+        """
+        with self._lock:
+            if (self._generations.get(None, 0), self._generations.get(key[1], 0)) != generation:
+                return False
+            self._put(key, value)
+            return True
+
+    def invalidate(self, predicate=None):
+        if predicate is None:
+            with self._lock:
+                self._generations[None] = self._generations.get(None, 0) + 1
+        super().invalidate(predicate)
+
+    def invalidate_user(self, user_info):
+        username = _username(user_info)
+        with self._lock:
+            self._generations[username] = self._generations.get(username, 0) + 1
+        self.invalidate(lambda key: key[1] == username)
+
+
+def get_response_cache(manager_instance):
+    """
+    Create the ResponseCache configured in the system section by response_cache_ttl (seconds, 0 disables it)
+    and response_cache_size
+
+    :param manager_instance: the AbstractManager
+    :return: the ResponseCache or None if disabled
+    """
+    ttl = manager_instance.get_config_float('system', 'response_cache_ttl', '0')
+    if ttl <= 0:
+        return None
+    return ResponseCache(max_size=manager_instance.get_config_int('system', 'response_cache_size', 256), ttl=ttl)
+
+
+def get_request_results(manager_instance):
+    """
+    Create the TTLCache of the responses of the calls with a request id, configured in the system section by
+    request_results_ttl (seconds, 0 disables it) and request_results_size
+
+    :param manager_instance: the AbstractManager
+    :return: the TTLCache or None if disabled
+    """
+    ttl = manager_instance.get_config_float('system', 'request_results_ttl', '3600')
+    if ttl <= 0:
+        return None
+    return TTLCache(max_size=manager_instance.get_config_int('system', 'request_results_size', 1024), ttl=ttl)
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        # the computation runs within the scope of its own token, cancelled when all its callers went away
+        self.cancellation = CancellationToken()
+        self.waiters = 0
+        self.wakeups = []
+
+
+class SingleFlight(object):
+    """
+    Coalesce concurrent calls with the same key: only the first one runs, the others wait for its result
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _leave(self, key, call, wakeup):
+        with self._lock:
+            if call.event.is_set() or wakeup.is_set():
+                return
+            wakeup.set()
+            call.waiters -= 1
+            abandoned = call.waiters == 0
+            if abandoned and self._calls.get(key) is call:
+                # the next callers compute again instead of getting the cancelled computation
+                del self._calls[key]
+        if abandoned:
+            call.cancellation.cancel()
+
+    def do(self, key, compute, cancellable=False):
+        """
+        :param compute: called within the cancellation_scope of a CancellationToken of its own
+        :param cancellable: if True the caller stops waiting, raising CancelledError, when its
+         current_cancellation_token is cancelled, and the computation is cancelled once all its callers stopped
+        """
+        wakeup = threading.Event()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            call.waiters += 1
+            call.wakeups.append(wakeup)
+        if cancellable:
+            current_cancellation_token().add_callback(lambda: self._leave(key, call, wakeup))
+        if leader:
+            try:
+                with cancellation_scope(call.cancellation):
+                    call.result = compute()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                    call.event.set()
+                    for waiting in call.wakeups:
+                        waiting.set()
+        else:
+            wakeup.wait()
+            if not call.event.is_set():
+                raise CancelledError("The call was cancelled")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class _AsyncCall(object):
+    def __init__(self):
+        self.task = None
+        self.cancellation = CancellationToken()
+        self.waiters = 0
+
+
+class AsyncSingleFlight(object):
+    """
+    SingleFlight for coroutines running on the same event loop. The computation runs in its own task, so that it
+    completes even if the callers waiting for it are cancelled
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def _done(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            # retrieve it, so that it is not logged when nobody was waiting anymore
+            call.task.exception()
+
+    @staticmethod
+    async def _run(cancellation, compute):
+        with cancellation_scope(cancellation):
+            return await compute()
+
+    async def do(self, key, compute, cancellable=False):
+        """
+        :param compute: coroutine function, awaited within the cancellation_scope of a CancellationToken of its own
+        :param cancellable: if True the computation is cancelled once all the callers waiting for it are cancelled
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _AsyncCall()
+            call.task = asyncio.ensure_future(self._run(call.cancellation, compute))
+            call.task.add_done_callback(lambda _: self._done(key, call))
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if cancellable and not call.task.done():
+                call.waiters -= 1
+                if call.waiters == 0:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                    call.cancellation.cancel()
+            raise
+
+
+def get_single_flight_methods(manager_instance):
+    """
+    Get the methods whose concurrent identical calls are coalesced, configured in the system section as
+    comma separated list by coalesce_methods
+
+    :param manager_instance: the AbstractManager
+    :return: set of method keys
+    """
+    methods = manager_instance.get_config_value('system', 'coalesce_methods', 'list_resources,refresh_resources')
+    return {m.strip() for m in methods.split(',') if m.strip()}
@@ -0,0 +1,145 @@
+import contextvars
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from sdk.softfire.utils import CancelledError
+
+_current_token = contextvars.ContextVar('softfire_cancellation_token', default=None)
+# grpc gives the calls without deadline about 9.22e18 seconds, more than time functions and sockets accept
+_MAX_TIMEOUT = 365 * 24 * 3600
+
+
+class CancellationToken(object):
+    def __init__(self, timeout=None):
+        """
+        Tell long operations that their result is not wanted anymore: the caller went away or the deadline passed
+
+        :param timeout: seconds until the token is cancelled, None for no deadline
+        """
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self._event = threading.Event()
+        self._children = weakref.WeakSet()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_context(cls, context):
+        """
+        :param context: the grpc.ServicerContext or grpc.aio.ServicerContext of the call
+        :return: a token with the deadline of the call, cancelled when the call terminates
+        """
+        remaining = context.time_remaining()
+        token = cls(remaining if remaining is not None and remaining < _MAX_TIMEOUT else None)
+        if hasattr(context, 'add_done_callback'):
+            context.add_done_callback(lambda _: token.cancel())
+        else:
+            context.add_callback(token.cancel)
+        return token
+
+    def child(self, timeout=None):
+        """
+        :param timeout: seconds until the child is cancelled, None for the deadline of this token
+        :return: a token cancelled with this one, whose deadline is never later than the one of this token
+        """
+        remaining = self.time_remaining()
+        if timeout is None or (remaining is not None and remaining < timeout):
+            timeout = remaining
+        token = CancellationToken(timeout)
+        with self._lock:
+            self._children.add(token)
+        if self._event.is_set():
+            token.cancel()
+        return token
+
+    def cancel(self):
+        with self._lock:
+            self._event.set()
+            children = list(self._children)
+            callbacks, self._callbacks = self._callbacks, []
+        for child in children:
+            child.cancel()
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback):
+        """
+        Call callback() once when cancel() is called, at once if it already was. The deadline passing alone does not
+        call it: the tokens of the gRPC calls are cancelled when their deadline expires
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    @property
+    def cancelled(self):
+        if self._event.is_set():
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def time_remaining(self):
+        """
+        :return: the seconds until the deadline, None if there is none
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def request_timeout(self):
+        """
+        Timeout of a blocking request made now, i.e. an OpenStack request
+
+        :return: the seconds until the deadline, None if there is none
+        :raise CancelledError: if the token is cancelled or the deadline is reached
+        """
+        self.check()
+        remaining = self.time_remaining()
+        if remaining is not None and remaining <= 0:
+            raise CancelledError("The deadline of the call expired")
+        return remaining
+
+    def check(self):
+        """
+        :raise CancelledError: if the token is cancelled
+        """
+        if self._event.is_set():
+            raise CancelledError("The call was cancelled")
+        if self.cancelled:
+            raise CancelledError("The deadline of the call expired")
+
+    def wait(self, timeout=None):
+        """
+        Sleep at most timeout seconds, waking up when the token is cancelled
+
+        :return: True if the token is cancelled
+        """
+        remaining = self.time_remaining()
+        if remaining is not None and (timeout is None or remaining < timeout):
+            timeout = remaining
+        self._event.wait(timeout)
+        return self.cancelled
+
+
+def current_cancellation_token():
+    """
+    :return: the CancellationToken of the call being served, a token never cancelled outside of a call
+    """
+    token = _current_token.get()
+    if token is None:
+        return CancellationToken()
+    return token
+
+
+@contextmanager
+def cancellation_scope(token):
+    """
+    Make token the current_cancellation_token while the block runs
+    """
+    reset_token = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset_token)
@@ -0,0 +1,108 @@
+import logging
+import threading
+
+import grpc
+
+from sdk.softfire.grpc import messages_pb2_grpc
+from sdk.softfire.utils import Backoff, get_config
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelPool(object):
+    def __init__(self):
+        """
+        Long lived gRPC channels and stubs shared by all the calls to the same target. The channels are created
+        at the first use, reconnect by themselves when the connection drops and are recreated after close
+        """
+        self._channels = {}
+        self._stubs = {}
+        self._lock = threading.Lock()
+
+    def get_channel(self, target, options=()):
+        key = (target, tuple(options))
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                logger.debug("Opening channel to %s" % target)
+                channel = self._channels[key] = grpc.insecure_channel(target, options=list(options))
+            return channel
+
+    def get_stub(self, stub_class, target, options=()):
+        channel = self.get_channel(target, options)
+        key = (stub_class, target, tuple(options))
+        with self._lock:
+            stub = self._stubs.get(key)
+            if stub is None or stub[0] is not channel:
+                stub = self._stubs[key] = (channel, stub_class(channel))
+            return stub[1]
+
+    def close(self):
+        with self._lock:
+            channels = list(self._channels.values())
+            self._channels.clear()
+            self._stubs.clear()
+        for channel in channels:
+            channel.close()
+
+
+_pool = ChannelPool()
+
+
+def get_channel_pool():
+    return _pool
+
+
+def get_em_target(config_file_path):
+    return '%s:%s' % (get_config("system", "experiment_manager_ip", config_file_path, 'localhost'),
+                      get_config("system", "experiment_manager_port", config_file_path, '5051'))
+
+
+def get_em_backoff(config_file_path):
+    return Backoff(initial=float(get_config("system", "em_backoff_initial", config_file_path, '0.1')),
+                   maximum=float(get_config("system", "em_backoff_max", config_file_path, '5')))
+
+
+def get_em_timeout(config_file_path):
+    """
+    :return: the deadline in seconds of the calls to the experiment manager
+    """
+    return float(get_config("system", "em_call_timeout", config_file_path, '5'))
+
+
+def get_em_channel_options(config_file_path):
+    """
+    The default gRPC server policy accepts a ping without calls at most every 5 minutes, more frequent ones are
+    answered with GOAWAY too_many_pings: em_keepalive_time is at least 300 seconds unless the experiment manager sets
+    grpc.http2.min_ping_interval_without_data_ms
+    """
+    backoff = get_em_backoff(config_file_path)
+    keepalive_time = float(get_config("system", "em_keepalive_time", config_file_path, '300'))
+    return (
+        ('grpc.keepalive_time_ms', int(keepalive_time * 1000)),
+        ('grpc.keepalive_timeout_ms', 10000),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.http2.max_pings_without_data', 0),
+        ('grpc.initial_reconnect_backoff_ms', int(backoff.initial * 1000)),
+        ('grpc.min_reconnect_backoff_ms', int(backoff.initial * 1000)),
+        ('grpc.max_reconnect_backoff_ms', int(backoff.maximum * 1000)),
+    )
+
+
+def get_em_channel(config_file_path):
+    """
+    :return: the shared channel to the experiment manager configured in config_file_path
+    """
+    return _pool.get_channel(get_em_target(config_file_path), get_em_channel_options(config_file_path))
+
+
+def get_registration_stub(config_file_path):
+    """
+    :return: the shared RegistrationService stub of the experiment manager configured in config_file_path
+    """
+    return _pool.get_stub(messages_pb2_grpc.RegistrationServiceStub, get_em_target(config_file_path),
+                          get_em_channel_options(config_file_path))
+
+
+def close_channels():
+    _pool.close()
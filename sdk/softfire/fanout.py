@@ -0,0 +1,73 @@
+import logging
+import time
+from concurrent import futures
+
+from sdk.softfire.cancellation import cancellation_scope, current_cancellation_token
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutResult(object):
+    def __init__(self):
+        """
+        Outcome of fan_out per testbed name: results of the testbeds that succeeded, error messages of the others
+        and duration in seconds of all of them
+        """
+        self.results = {}
+        self.errors = {}
+        self.durations = {}
+
+
+def _run_for_testbed(function, name, testbed, cancellation):
+    start = time.monotonic()
+    with cancellation_scope(cancellation):
+        return function(name, testbed, cancellation), time.monotonic() - start
+
+
+def fan_out(openstack_credentials, function, timeout=None, cancellation=None, testbed_timeouts=True):
+    """
+    Call function(testbed_name, testbed, cancellation) for all the testbeds at the same time, so that the whole takes
+    as long as the slowest testbed. Each call gets a child of cancellation whose deadline is the timeout of the
+    testbed (its 'timeout' credential, else timeout): a testbed still running then is cancelled and reported as
+    failed, without waiting for it
+
+    :param openstack_credentials: dict of testbed name -> testbed credentials
+    :param timeout: seconds each testbed has, None for the deadline of cancellation
+    :param cancellation: the CancellationToken of the call being served by default
+    :param testbed_timeouts: if False the 'timeout' credential of the testbeds is ignored, i.e. for work that must
+     not stop halfway
+    :rtype: FanOutResult
+    :raise CancelledError: if cancellation is cancelled
+    """
+    cancellation = cancellation or current_cancellation_token()
+    cancellation.check()
+    result = FanOutResult()
+    if not openstack_credentials:
+        return result
+    executor = futures.ThreadPoolExecutor(max_workers=len(openstack_credentials), thread_name_prefix='testbed')
+    calls = []
+    try:
+        start = time.monotonic()
+        for name, testbed in openstack_credentials.items():
+            testbed_timeout = testbed.get('timeout', timeout) if testbed_timeouts else timeout
+            # the credentials may give the timeout as string
+            token = cancellation.child(float(testbed_timeout) if testbed_timeout is not None else None)
+            calls.append((name, token, executor.submit(_run_for_testbed, function, name, testbed, token)))
+        for name, token, call in calls:
+            try:
+                # time_remaining is None without deadline: wait for the testbed
+                result.results[name], result.durations[name] = call.result(timeout=token.time_remaining())
+            except futures.TimeoutError:
+                token.cancel()
+                result.durations[name] = time.monotonic() - start
+                result.errors[name] = "Testbed %s did not answer in time" % name
+                logger.error(result.errors[name])
+            except Exception as e:
+                result.durations[name] = time.monotonic() - start
+                result.errors[name] = getattr(e, 'message', None) or str(e) or e.__class__.__name__
+                logger.exception("Error on testbed %s" % name)
+    finally:
+        # the testbeds that did not answer in time are cancelled, their threads end on their own
+        executor.shutdown(wait=False)
+    cancellation.check()
+    return result
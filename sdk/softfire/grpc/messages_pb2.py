@@ -1,3 +1,4 @@
+# -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: messages.proto
 
@@ -8,7 +9,6 @@ from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
 from google.protobuf import reflection as _reflection
 from google.protobuf import symbol_database as _symbol_database
-from google.protobuf import descriptor_pb2
 # @@protoc_insertion_point(imports)
 
 _sym_db = _symbol_database.Default()
@@ -20,9 +20,41 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='messages.proto',
   package='',
   syntax='proto3',
-  serialized_pb=_b('\n\x0emessages.proto\"F\n\x0fRegisterMessage\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\"3\n\x11UnregisterMessage\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x02 \x01(\t\"U\n\rStatusMessage\x12\x1c\n\tresources\x18\x01 \x03(\x0b\x32\t.Resource\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x14\n\x0cmanager_name\x18\x03 \x01(\t\"X\n\x0eRequestMessage\x12\x17\n\x06method\x18\x01 \x01(\x0e\x32\x07.Method\x12\x0f\n\x07payload\x18\x02 \x01(\t\x12\x1c\n\tuser_info\x18\x03 \x01(\x0b\x32\t.UserInfo\"\xe8\x01\n\x0fResponseMessage\x12\x17\n\x06result\x18\x01 \x01(\x0e\x32\x07.Result\x12.\n\rlist_resource\x18\x02 \x01(\x0b\x32\x15.ListResourceResponseH\x00\x12\x34\n\x10provide_resource\x18\x03 \x01(\x0b\x32\x18.ProvideResourceResponseH\x00\x12\x34\n\x10refresh_resource\x18\x04 \x01(\x0b\x32\x18.RefreshResourceResponseH\x00\x12\x15\n\rerror_message\x18\x05 \x01(\tB\t\n\x07message\"<\n\x14ListResourceResponse\x12$\n\tresources\x18\x01 \x03(\x0b\x32\x11.ResourceMetadata\"7\n\x17ProvideResourceResponse\x12\x1c\n\tresources\x18\x01 \x03(\x0b\x32\t.Resource\"?\n\x17RefreshResourceResponse\x12$\n\tresources\x18\x01 \x03(\x0b\x32\x11.ResourceMetadata\"\x7f\n\x10ResourceMetadata\x12\x13\n\x0bresource_id\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x13\n\x0b\x63\x61rdinality\x18\x03 \x01(\x05\x12\x19\n\x07testbed\x18\x04 \x01(\x0e\x32\x08.Testbed\x12\x11\n\tnode_type\x18\x05 \x01(\t\"\xbc\x01\n\x08UserInfo\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\x12\x15\n\rob_project_id\x18\x04 \x01(\t\x12\x36\n\x0ftestbed_tenants\x18\x05 \x03(\x0b\x32\x1d.UserInfo.TestbedTenantsEntry\x1a\x35\n\x13TestbedTenantsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\'\n\x08Resource\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\"\x07\n\x05\x45mpty*b\n\x06Method\x12\x12\n\x0eLIST_RESOURCES\x10\x00\x12\x15\n\x11PROVIDE_RESOURCES\x10\x01\x12\x15\n\x11RELEASE_RESOURCES\x10\x02\x12\x16\n\x12VALIDATE_RESOURCES\x10\x03*\x1b\n\x06Result\x12\x06\n\x02Ok\x10\x00\x12\t\n\x05\x45RROR\x10\x01*\x92\x01\n\x07Testbed\x12\n\n\x06SURREY\x10\x00\x12\t\n\x05\x46OKUS\x10\x01\x12\x06\n\x02\x44T\x10\x02\x12\x07\n\x03\x41\x44S\x10\x03\x12\x0c\n\x08\x45RICSSON\x10\x04\x12\x0e\n\nSURREY_DEV\x10\x05\x12\r\n\tFOKUS_DEV\x10\x06\x12\n\n\x06\x44T_DEV\x10\x07\x12\x0b\n\x07\x41\x44S_DEV\x10\x08\x12\x10\n\x0c\x45RICSSON_DEV\x10\t\x12\x07\n\x03\x41NY\x10\n2\xb2\x01\n\x13RegistrationService\x12\x30\n\x08register\x12\x10.RegisterMessage\x1a\x10.ResponseMessage\"\x00\x12\x34\n\nunregister\x12\x12.UnregisterMessage\x1a\x10.ResponseMessage\"\x00\x12\x33\n\rupdate_status\x12\x0e.StatusMessage\x1a\x10.ResponseMessage\"\x00\x32\xdc\x01\n\x0cManagerAgent\x12.\n\x07\x65xecute\x12\x0f.RequestMessage\x1a\x10.ResponseMessage\"\x00\x12\x32\n\x11refresh_resources\x12\t.UserInfo\x1a\x10.ResponseMessage\"\x00\x12%\n\x0b\x63reate_user\x12\t.UserInfo\x1a\t.UserInfo\"\x00\x12\"\n\x0b\x64\x65lete_user\x12\t.UserInfo\x1a\x06.Empty\"\x00\x12\x1d\n\theartbeat\x12\x06.Empty\x1a\x06.Empty\"\x00\x42\x02H\x03\x62\x06proto3')
+  serialized_options=_b('H\003'),
+  serialized_pb=_b('\n\x0emessages.proto\"F\n\x0fRegisterMessage\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\"3\n\x11UnregisterMessage\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x10\n\x08\x65ndpoint\x18\x02 \x01(\t\"U\n\rStatusMessage\x12\x1c\n\tresources\x18\x01 \x03(\x0b\x32\t.Resource\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x14\n\x0cmanager_name\x18\x03 \x01(\t\"|\n\x0eRequestMessage\x12\x17\n\x06method\x18\x01 \x01(\x0e\x32\x07.Method\x12\x0f\n\x07payload\x18\x02 \x01(\t\x12\x1c\n\tuser_info\x18\x03 \x01(\x0b\x32\t.UserInfo\x12\x12\n\nrequest_id\x18\x04 \x01(\t\x12\x0e\n\x06\x61s_job\x18\x05 \x01(\x08\"\x83\x02\n\x0fResponseMessage\x12\x17\n\x06result\x18\x01 \x01(\x0e\x32\x07.Result\x12.\n\rlist_resource\x18\x02 \x01(\x0b\x32\x15.ListResourceResponseH\x00\x12\x34\n\x10provide_resource\x18\x03 \x01(\x0b\x32\x18.ProvideResourceResponseH\x00\x12\x34\n\x10refresh_resource\x18\x04 \x01(\x0b\x32\x18.RefreshResourceResponseH\x00\x12\x19\n\x03job\x18\x06 \x01(\x0b\x32\n.JobStatusH\x00\x12\x15\n\rerror_message\x18\x05 \x01(\tB\t\n\x07message\"\x83\x01\n\tJobStatus\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x18\n\x05state\x18\x02 \x01(\x0e\x32\t.JobState\x12\x17\n\x06method\x18\x03 \x01(\x0e\x32\x07.Method\x12\x1c\n\tresources\x18\x04 \x03(\x0b\x32\t.Resource\x12\x15\n\rerror_message\x18\x05 \x01(\t\"\x1c\n\nJobRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"<\n\x14ListResourceResponse\x12$\n\tresources\x18\x01 \x03(\x0b\x32\x11.ResourceMetadata\"7\n\x17ProvideResourceResponse\x12\x1c\n\tresources\x18\x01 \x03(\x0b\x32\t.Resource\"?\n\x17RefreshResourceResponse\x12$\n\tresources\x18\x01 \x03(\x0b\x32\x11.ResourceMetadata\"\x7f\n\x10ResourceMetadata\x12\x13\n\x0bresource_id\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x13\n\x0b\x63\x61rdinality\x18\x03 \x01(\x05\x12\x19\n\x07testbed\x18\x04 \x01(\x0e\x32\x08.Testbed\x12\x11\n\tnode_type\x18\x05 \x01(\t\"\xbc\x01\n\x08UserInfo\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\x12\x15\n\rob_project_id\x18\x04 \x01(\t\x12\x36\n\x0ftestbed_tenants\x18\x05 \x03(\x0b\x32\x1d.UserInfo.TestbedTenantsEntry\x1a\x35\n\x13TestbedTenantsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\'\n\x08Resource\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\"\x07\n\x05\x45mpty\"f\n\nMethodLoad\x12\x0e\n\x06method\x18\x01 \x01(\t\x12\x11\n\tin_flight\x18\x02 \x01(\x05\x12\x0e\n\x06queued\x18\x03 \x01(\x05\x12\x10\n\x08\x63\x61pacity\x18\x04 \x01(\x05\x12\x13\n\x0bp99_latency\x18\x05 \x01(\x01\"z\n\x11HeartbeatResponse\x12\r\n\x05ready\x18\x01 \x01(\x08\x12\x11\n\tin_flight\x18\x02 \x01(\x05\x12\x13\n\x0bqueue_depth\x18\x03 \x01(\x05\x12\x10\n\x08\x63\x61pacity\x18\x04 \x01(\x05\x12\x1c\n\x07methods\x18\x05 \x03(\x0b\x32\x0b.MethodLoad*J\n\x08JobState\x12\x0f\n\x0bJOB_PENDING\x10\x00\x12\x0f\n\x0bJOB_RUNNING\x10\x01\x12\x0c\n\x08JOB_DONE\x10\x02\x12\x0e\n\nJOB_FAILED\x10\x03*b\n\x06Method\x12\x12\n\x0eLIST_RESOURCES\x10\x00\x12\x15\n\x11PROVIDE_RESOURCES\x10\x01\x12\x15\n\x11RELEASE_RESOURCES\x10\x02\x12\x16\n\x12VALIDATE_RESOURCES\x10\x03*\x1b\n\x06Result\x12\x06\n\x02Ok\x10\x00\x12\t\n\x05\x45RROR\x10\x01*\x92\x01\n\x07Testbed\x12\n\n\x06SURREY\x10\x00\x12\t\n\x05\x46OKUS\x10\x01\x12\x06\n\x02\x44T\x10\x02\x12\x07\n\x03\x41\x44S\x10\x03\x12\x0c\n\x08\x45RICSSON\x10\x04\x12\x0e\n\nSURREY_DEV\x10\x05\x12\r\n\tFOKUS_DEV\x10\x06\x12\n\n\x06\x44T_DEV\x10\x07\x12\x0b\n\x07\x41\x44S_DEV\x10\x08\x12\x10\n\x0c\x45RICSSON_DEV\x10\t\x12\x07\n\x03\x41NY\x10\n2\xf0\x01\n\x13RegistrationService\x12\x30\n\x08register\x12\x10.RegisterMessage\x1a\x10.ResponseMessage\"\x00\x12\x34\n\nunregister\x12\x12.UnregisterMessage\x1a\x10.ResponseMessage\"\x00\x12\x33\n\rupdate_status\x12\x0e.StatusMessage\x1a\x10.ResponseMessage\"\x00\x12<\n\x14update_status_stream\x12\x0e.StatusMessage\x1a\x10.ResponseMessage\"\x00(\x01\x32\xf4\x02\n\x0cManagerAgent\x12.\n\x07\x65xecute\x12\x0f.RequestMessage\x1a\x10.ResponseMessage\"\x00\x12\x32\n\x11refresh_resources\x12\t.UserInfo\x1a\x10.ResponseMessage\"\x00\x12%\n\x0b\x63reate_user\x12\t.UserInfo\x1a\t.UserInfo\"\x00\x12\"\n\x0b\x64\x65lete_user\x12\t.UserInfo\x1a\x06.Empty\"\x00\x12)\n\theartbeat\x12\x06.Empty\x1a\x12.HeartbeatResponse\"\x00\x12:\n\x18provide_resources_stream\x12\x0f.RequestMessage\x1a\t.Resource\"\x00\x30\x01\x12$\n\x07get_job\x12\x0b.JobRequest\x1a\n.JobStatus\"\x00\x12(\n\twatch_job\x12\x0b.JobRequest\x1a\n.JobStatus\"\x00\x30\x01\x42\x02H\x03\x62\x06proto3')
 )
 
+_JOBSTATE = _descriptor.EnumDescriptor(
+  name='JobState',
+  full_name='JobState',
+  filename=None,
+  file=DESCRIPTOR,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='JOB_PENDING', index=0, number=0,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='JOB_RUNNING', index=1, number=1,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='JOB_DONE', index=2, number=2,
+      serialized_options=None,
+      type=None),
+    _descriptor.EnumValueDescriptor(
+      name='JOB_FAILED', index=3, number=3,
+      serialized_options=None,
+      type=None),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=1564,
+  serialized_end=1638,
+)
+_sym_db.RegisterEnumDescriptor(_JOBSTATE)
+
+JobState = enum_type_wrapper.EnumTypeWrapper(_JOBSTATE)
 _METHOD = _descriptor.EnumDescriptor(
   name='Method',
   full_name='Method',
@@ -31,25 +63,25 @@ _METHOD = _descriptor.EnumDescriptor(
   values=[
     _descriptor.EnumValueDescriptor(
       name='LIST_RESOURCES', index=0, number=0,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='PROVIDE_RESOURCES', index=1, number=1,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='RELEASE_RESOURCES', index=2, number=2,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='VALIDATE_RESOURCES', index=3, number=3,
-      options=None,
+      serialized_options=None,
       type=None),
   ],
   containing_type=None,
-  options=None,
-  serialized_start=1109,
-  serialized_end=1207,
+  serialized_options=None,
+  serialized_start=1640,
+  serialized_end=1738,
 )
 _sym_db.RegisterEnumDescriptor(_METHOD)
 
@@ -62,17 +94,17 @@ _RESULT = _descriptor.EnumDescriptor(
   values=[
     _descriptor.EnumValueDescriptor(
       name='Ok', index=0, number=0,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='ERROR', index=1, number=1,
-      options=None,
+      serialized_options=None,
       type=None),
   ],
   containing_type=None,
-  options=None,
-  serialized_start=1209,
-  serialized_end=1236,
+  serialized_options=None,
+  serialized_start=1740,
+  serialized_end=1767,
 )
 _sym_db.RegisterEnumDescriptor(_RESULT)
 
@@ -85,57 +117,61 @@ _TESTBED = _descriptor.EnumDescriptor(
   values=[
     _descriptor.EnumValueDescriptor(
       name='SURREY', index=0, number=0,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='FOKUS', index=1, number=1,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='DT', index=2, number=2,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='ADS', index=3, number=3,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='ERICSSON', index=4, number=4,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='SURREY_DEV', index=5, number=5,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='FOKUS_DEV', index=6, number=6,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='DT_DEV', index=7, number=7,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='ADS_DEV', index=8, number=8,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='ERICSSON_DEV', index=9, number=9,
-      options=None,
+      serialized_options=None,
       type=None),
     _descriptor.EnumValueDescriptor(
       name='ANY', index=10, number=10,
-      options=None,
+      serialized_options=None,
       type=None),
   ],
   containing_type=None,
-  options=None,
-  serialized_start=1239,
-  serialized_end=1385,
+  serialized_options=None,
+  serialized_start=1770,
+  serialized_end=1916,
 )
 _sym_db.RegisterEnumDescriptor(_TESTBED)
 
 Testbed = enum_type_wrapper.EnumTypeWrapper(_TESTBED)
+JOB_PENDING = 0
+JOB_RUNNING = 1
+JOB_DONE = 2
+JOB_FAILED = 3
 LIST_RESOURCES = 0
 PROVIDE_RESOURCES = 1
 RELEASE_RESOURCES = 2
@@ -169,28 +205,28 @@ _REGISTERMESSAGE = _descriptor.Descriptor(
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='endpoint', full_name='RegisterMessage.endpoint', index=1,
       number=2, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='description', full_name='RegisterMessage.description', index=2,
       number=3, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
@@ -214,21 +250,21 @@ _UNREGISTERMESSAGE = _descriptor.Descriptor(
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='endpoint', full_name='UnregisterMessage.endpoint', index=1,
       number=2, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
@@ -252,28 +288,28 @@ _STATUSMESSAGE = _descriptor.Descriptor(
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='username', full_name='StatusMessage.username', index=1,
       number=2, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='manager_name', full_name='StatusMessage.manager_name', index=2,
       number=3, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
@@ -297,35 +333,49 @@ _REQUESTMESSAGE = _descriptor.Descriptor(
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='payload', full_name='RequestMessage.payload', index=1,
       number=2, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='user_info', full_name='RequestMessage.user_info', index=2,
       number=3, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='RequestMessage.request_id', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='as_job', full_name='RequestMessage.as_job', index=4,
+      number=5, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
   serialized_start=230,
-  serialized_end=318,
+  serialized_end=354,
 )
 
 
@@ -342,42 +392,49 @@ _RESPONSEMESSAGE = _descriptor.Descriptor(
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='list_resource', full_name='ResponseMessage.list_resource', index=1,
       number=2, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='provide_resource', full_name='ResponseMessage.provide_resource', index=2,
       number=3, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='refresh_resource', full_name='ResponseMessage.refresh_resource', index=3,
       number=4, type=11, cpp_type=10, label=1,
       has_default_value=False, default_value=None,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='job', full_name='ResponseMessage.job', index=4,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='error_message', full_name='ResponseMessage.error_message', index=4,
+      name='error_message', full_name='ResponseMessage.error_message', index=5,
       number=5, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
@@ -386,8 +443,98 @@ _RESPONSEMESSAGE = _descriptor.Descriptor(
       name='message', full_name='ResponseMessage.message',
       index=0, containing_type=None, fields=[]),
   ],
-  serialized_start=321,
-  serialized_end=553,
+  serialized_start=357,
+  serialized_end=616,
+)
+
+
+_JOBSTATUS = _descriptor.Descriptor(
+  name='JobStatus',
+  full_name='JobStatus',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='job_id', full_name='JobStatus.job_id', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='state', full_name='JobStatus.state', index=1,
+      number=2, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='method', full_name='JobStatus.method', index=2,
+      number=3, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='resources', full_name='JobStatus.resources', index=3,
+      number=4, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='error_message', full_name='JobStatus.error_message', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=619,
+  serialized_end=750,
+)
+
+
+_JOBREQUEST = _descriptor.Descriptor(
+  name='JobRequest',
+  full_name='JobRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='job_id', full_name='JobRequest.job_id', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=752,
+  serialized_end=780,
 )
 
 
@@ -404,21 +551,21 @@ _LISTRESOURCERESPONSE = _descriptor.Descriptor(
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=555,
-  serialized_end=615,
+  serialized_start=782,
+  serialized_end=842,
 )
 
 
@@ -435,21 +582,21 @@ _PROVIDERESOURCERESPONSE = _descriptor.Descriptor(
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=617,
-  serialized_end=672,
+  serialized_start=844,
+  serialized_end=899,
 )
 
 
@@ -466,21 +613,21 @@ _REFRESHRESOURCERESPONSE = _descriptor.Descriptor(
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=674,
-  serialized_end=737,
+  serialized_start=901,
+  serialized_end=964,
 )
 
 
@@ -497,49 +644,49 @@ _RESOURCEMETADATA = _descriptor.Descriptor(
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='description', full_name='ResourceMetadata.description', index=1,
       number=2, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='cardinality', full_name='ResourceMetadata.cardinality', index=2,
       number=3, type=5, cpp_type=1, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='testbed', full_name='ResourceMetadata.testbed', index=3,
       number=4, type=14, cpp_type=8, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='node_type', full_name='ResourceMetadata.node_type', index=4,
       number=5, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=739,
-  serialized_end=866,
+  serialized_start=966,
+  serialized_end=1093,
 )
 
 
@@ -556,28 +703,28 @@ _USERINFO_TESTBEDTENANTSENTRY = _descriptor.Descriptor(
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='value', full_name='UserInfo.TestbedTenantsEntry.value', index=1,
       number=2, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=_descriptor._ParseOptions(descriptor_pb2.MessageOptions(), _b('8\001')),
+  serialized_options=_b('8\001'),
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1004,
-  serialized_end=1057,
+  serialized_start=1231,
+  serialized_end=1284,
 )
 
 _USERINFO = _descriptor.Descriptor(
@@ -593,49 +740,49 @@ _USERINFO = _descriptor.Descriptor(
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='name', full_name='UserInfo.name', index=1,
       number=2, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='password', full_name='UserInfo.password', index=2,
       number=3, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='ob_project_id', full_name='UserInfo.ob_project_id', index=3,
       number=4, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='testbed_tenants', full_name='UserInfo.testbed_tenants', index=4,
       number=5, type=11, cpp_type=10, label=3,
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[_USERINFO_TESTBEDTENANTSENTRY, ],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=869,
-  serialized_end=1057,
+  serialized_start=1096,
+  serialized_end=1284,
 )
 
 
@@ -652,28 +799,28 @@ _RESOURCE = _descriptor.Descriptor(
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
       name='content', full_name='Resource.content', index=1,
       number=2, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None),
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1059,
-  serialized_end=1098,
+  serialized_start=1286,
+  serialized_end=1325,
 )
 
 
@@ -690,14 +837,132 @@ _EMPTY = _descriptor.Descriptor(
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1327,
+  serialized_end=1334,
+)
+
+
+_METHODLOAD = _descriptor.Descriptor(
+  name='MethodLoad',
+  full_name='MethodLoad',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='method', full_name='MethodLoad.method', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='in_flight', full_name='MethodLoad.in_flight', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='queued', full_name='MethodLoad.queued', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='capacity', full_name='MethodLoad.capacity', index=3,
+      number=4, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='p99_latency', full_name='MethodLoad.p99_latency', index=4,
+      number=5, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=1100,
-  serialized_end=1107,
+  serialized_start=1336,
+  serialized_end=1438,
+)
+
+
+_HEARTBEATRESPONSE = _descriptor.Descriptor(
+  name='HeartbeatResponse',
+  full_name='HeartbeatResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='ready', full_name='HeartbeatResponse.ready', index=0,
+      number=1, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='in_flight', full_name='HeartbeatResponse.in_flight', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='queue_depth', full_name='HeartbeatResponse.queue_depth', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='capacity', full_name='HeartbeatResponse.capacity', index=3,
+      number=4, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='methods', full_name='HeartbeatResponse.methods', index=4,
+      number=5, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1440,
+  serialized_end=1562,
 )
 
 _STATUSMESSAGE.fields_by_name['resources'].message_type = _RESOURCE
@@ -707,6 +972,7 @@ _RESPONSEMESSAGE.fields_by_name['result'].enum_type = _RESULT
 _RESPONSEMESSAGE.fields_by_name['list_resource'].message_type = _LISTRESOURCERESPONSE
 _RESPONSEMESSAGE.fields_by_name['provide_resource'].message_type = _PROVIDERESOURCERESPONSE
 _RESPONSEMESSAGE.fields_by_name['refresh_resource'].message_type = _REFRESHRESOURCERESPONSE
+_RESPONSEMESSAGE.fields_by_name['job'].message_type = _JOBSTATUS
 _RESPONSEMESSAGE.oneofs_by_name['message'].fields.append(
   _RESPONSEMESSAGE.fields_by_name['list_resource'])
 _RESPONSEMESSAGE.fields_by_name['list_resource'].containing_oneof = _RESPONSEMESSAGE.oneofs_by_name['message']
@@ -716,17 +982,26 @@ _RESPONSEMESSAGE.fields_by_name['provide_resource'].containing_oneof = _RESPONSE
 _RESPONSEMESSAGE.oneofs_by_name['message'].fields.append(
   _RESPONSEMESSAGE.fields_by_name['refresh_resource'])
 _RESPONSEMESSAGE.fields_by_name['refresh_resource'].containing_oneof = _RESPONSEMESSAGE.oneofs_by_name['message']
+_RESPONSEMESSAGE.oneofs_by_name['message'].fields.append(
+  _RESPONSEMESSAGE.fields_by_name['job'])
+_RESPONSEMESSAGE.fields_by_name['job'].containing_oneof = _RESPONSEMESSAGE.oneofs_by_name['message']
+_JOBSTATUS.fields_by_name['state'].enum_type = _JOBSTATE
+_JOBSTATUS.fields_by_name['method'].enum_type = _METHOD
+_JOBSTATUS.fields_by_name['resources'].message_type = _RESOURCE
 _LISTRESOURCERESPONSE.fields_by_name['resources'].message_type = _RESOURCEMETADATA
 _PROVIDERESOURCERESPONSE.fields_by_name['resources'].message_type = _RESOURCE
 _REFRESHRESOURCERESPONSE.fields_by_name['resources'].message_type = _RESOURCEMETADATA
 _RESOURCEMETADATA.fields_by_name['testbed'].enum_type = _TESTBED
 _USERINFO_TESTBEDTENANTSENTRY.containing_type = _USERINFO
 _USERINFO.fields_by_name['testbed_tenants'].message_type = _USERINFO_TESTBEDTENANTSENTRY
+_HEARTBEATRESPONSE.fields_by_name['methods'].message_type = _METHODLOAD
 DESCRIPTOR.message_types_by_name['RegisterMessage'] = _REGISTERMESSAGE
 DESCRIPTOR.message_types_by_name['UnregisterMessage'] = _UNREGISTERMESSAGE
 DESCRIPTOR.message_types_by_name['StatusMessage'] = _STATUSMESSAGE
 DESCRIPTOR.message_types_by_name['RequestMessage'] = _REQUESTMESSAGE
 DESCRIPTOR.message_types_by_name['ResponseMessage'] = _RESPONSEMESSAGE
+DESCRIPTOR.message_types_by_name['JobStatus'] = _JOBSTATUS
+DESCRIPTOR.message_types_by_name['JobRequest'] = _JOBREQUEST
 DESCRIPTOR.message_types_by_name['ListResourceResponse'] = _LISTRESOURCERESPONSE
 DESCRIPTOR.message_types_by_name['ProvideResourceResponse'] = _PROVIDERESOURCERESPONSE
 DESCRIPTOR.message_types_by_name['RefreshResourceResponse'] = _REFRESHRESOURCERESPONSE
@@ -734,526 +1009,273 @@ DESCRIPTOR.message_types_by_name['ResourceMetadata'] = _RESOURCEMETADATA
 DESCRIPTOR.message_types_by_name['UserInfo'] = _USERINFO
 DESCRIPTOR.message_types_by_name['Resource'] = _RESOURCE
 DESCRIPTOR.message_types_by_name['Empty'] = _EMPTY
+DESCRIPTOR.message_types_by_name['MethodLoad'] = _METHODLOAD
+DESCRIPTOR.message_types_by_name['HeartbeatResponse'] = _HEARTBEATRESPONSE
+DESCRIPTOR.enum_types_by_name['JobState'] = _JOBSTATE
 DESCRIPTOR.enum_types_by_name['Method'] = _METHOD
 DESCRIPTOR.enum_types_by_name['Result'] = _RESULT
 DESCRIPTOR.enum_types_by_name['Testbed'] = _TESTBED
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
-RegisterMessage = _reflection.GeneratedProtocolMessageType('RegisterMessage', (_message.Message,), dict(
-  DESCRIPTOR = _REGISTERMESSAGE,
-  __module__ = 'messages_pb2'
+RegisterMessage = _reflection.GeneratedProtocolMessageType('RegisterMessage', (_message.Message,), {
+  'DESCRIPTOR' : _REGISTERMESSAGE,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:RegisterMessage)
-  ))
+  })
 _sym_db.RegisterMessage(RegisterMessage)
 
-UnregisterMessage = _reflection.GeneratedProtocolMessageType('UnregisterMessage', (_message.Message,), dict(
-  DESCRIPTOR = _UNREGISTERMESSAGE,
-  __module__ = 'messages_pb2'
+UnregisterMessage = _reflection.GeneratedProtocolMessageType('UnregisterMessage', (_message.Message,), {
+  'DESCRIPTOR' : _UNREGISTERMESSAGE,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:UnregisterMessage)
-  ))
+  })
 _sym_db.RegisterMessage(UnregisterMessage)
 
-StatusMessage = _reflection.GeneratedProtocolMessageType('StatusMessage', (_message.Message,), dict(
-  DESCRIPTOR = _STATUSMESSAGE,
-  __module__ = 'messages_pb2'
+StatusMessage = _reflection.GeneratedProtocolMessageType('StatusMessage', (_message.Message,), {
+  'DESCRIPTOR' : _STATUSMESSAGE,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:StatusMessage)
-  ))
+  })
 _sym_db.RegisterMessage(StatusMessage)
 
-RequestMessage = _reflection.GeneratedProtocolMessageType('RequestMessage', (_message.Message,), dict(
-  DESCRIPTOR = _REQUESTMESSAGE,
-  __module__ = 'messages_pb2'
+RequestMessage = _reflection.GeneratedProtocolMessageType('RequestMessage', (_message.Message,), {
+  'DESCRIPTOR' : _REQUESTMESSAGE,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:RequestMessage)
-  ))
+  })
 _sym_db.RegisterMessage(RequestMessage)
 
-ResponseMessage = _reflection.GeneratedProtocolMessageType('ResponseMessage', (_message.Message,), dict(
-  DESCRIPTOR = _RESPONSEMESSAGE,
-  __module__ = 'messages_pb2'
+ResponseMessage = _reflection.GeneratedProtocolMessageType('ResponseMessage', (_message.Message,), {
+  'DESCRIPTOR' : _RESPONSEMESSAGE,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:ResponseMessage)
-  ))
+  })
 _sym_db.RegisterMessage(ResponseMessage)
 
-ListResourceResponse = _reflection.GeneratedProtocolMessageType('ListResourceResponse', (_message.Message,), dict(
-  DESCRIPTOR = _LISTRESOURCERESPONSE,
-  __module__ = 'messages_pb2'
+JobStatus = _reflection.GeneratedProtocolMessageType('JobStatus', (_message.Message,), {
+  'DESCRIPTOR' : _JOBSTATUS,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:JobStatus)
+  })
+_sym_db.RegisterMessage(JobStatus)
+
+JobRequest = _reflection.GeneratedProtocolMessageType('JobRequest', (_message.Message,), {
+  'DESCRIPTOR' : _JOBREQUEST,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:JobRequest)
+  })
+_sym_db.RegisterMessage(JobRequest)
+
+ListResourceResponse = _reflection.GeneratedProtocolMessageType('ListResourceResponse', (_message.Message,), {
+  'DESCRIPTOR' : _LISTRESOURCERESPONSE,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:ListResourceResponse)
-  ))
+  })
 _sym_db.RegisterMessage(ListResourceResponse)
 
-ProvideResourceResponse = _reflection.GeneratedProtocolMessageType('ProvideResourceResponse', (_message.Message,), dict(
-  DESCRIPTOR = _PROVIDERESOURCERESPONSE,
-  __module__ = 'messages_pb2'
+ProvideResourceResponse = _reflection.GeneratedProtocolMessageType('ProvideResourceResponse', (_message.Message,), {
+  'DESCRIPTOR' : _PROVIDERESOURCERESPONSE,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:ProvideResourceResponse)
-  ))
+  })
 _sym_db.RegisterMessage(ProvideResourceResponse)
 
-RefreshResourceResponse = _reflection.GeneratedProtocolMessageType('RefreshResourceResponse', (_message.Message,), dict(
-  DESCRIPTOR = _REFRESHRESOURCERESPONSE,
-  __module__ = 'messages_pb2'
+RefreshResourceResponse = _reflection.GeneratedProtocolMessageType('RefreshResourceResponse', (_message.Message,), {
+  'DESCRIPTOR' : _REFRESHRESOURCERESPONSE,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:RefreshResourceResponse)
-  ))
+  })
 _sym_db.RegisterMessage(RefreshResourceResponse)
 
-ResourceMetadata = _reflection.GeneratedProtocolMessageType('ResourceMetadata', (_message.Message,), dict(
-  DESCRIPTOR = _RESOURCEMETADATA,
-  __module__ = 'messages_pb2'
+ResourceMetadata = _reflection.GeneratedProtocolMessageType('ResourceMetadata', (_message.Message,), {
+  'DESCRIPTOR' : _RESOURCEMETADATA,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:ResourceMetadata)
-  ))
+  })
 _sym_db.RegisterMessage(ResourceMetadata)
 
-UserInfo = _reflection.GeneratedProtocolMessageType('UserInfo', (_message.Message,), dict(
+UserInfo = _reflection.GeneratedProtocolMessageType('UserInfo', (_message.Message,), {
 
-  TestbedTenantsEntry = _reflection.GeneratedProtocolMessageType('TestbedTenantsEntry', (_message.Message,), dict(
-    DESCRIPTOR = _USERINFO_TESTBEDTENANTSENTRY,
-    __module__ = 'messages_pb2'
+  'TestbedTenantsEntry' : _reflection.GeneratedProtocolMessageType('TestbedTenantsEntry', (_message.Message,), {
+    'DESCRIPTOR' : _USERINFO_TESTBEDTENANTSENTRY,
+    '__module__' : 'messages_pb2'
     # @@protoc_insertion_point(class_scope:UserInfo.TestbedTenantsEntry)
-    ))
+    })
   ,
-  DESCRIPTOR = _USERINFO,
-  __module__ = 'messages_pb2'
+  'DESCRIPTOR' : _USERINFO,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:UserInfo)
-  ))
+  })
 _sym_db.RegisterMessage(UserInfo)
 _sym_db.RegisterMessage(UserInfo.TestbedTenantsEntry)
 
-Resource = _reflection.GeneratedProtocolMessageType('Resource', (_message.Message,), dict(
-  DESCRIPTOR = _RESOURCE,
-  __module__ = 'messages_pb2'
+Resource = _reflection.GeneratedProtocolMessageType('Resource', (_message.Message,), {
+  'DESCRIPTOR' : _RESOURCE,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:Resource)
-  ))
+  })
 _sym_db.RegisterMessage(Resource)
 
-Empty = _reflection.GeneratedProtocolMessageType('Empty', (_message.Message,), dict(
-  DESCRIPTOR = _EMPTY,
-  __module__ = 'messages_pb2'
+Empty = _reflection.GeneratedProtocolMessageType('Empty', (_message.Message,), {
+  'DESCRIPTOR' : _EMPTY,
+  '__module__' : 'messages_pb2'
   # @@protoc_insertion_point(class_scope:Empty)
-  ))
+  })
 _sym_db.RegisterMessage(Empty)
 
+MethodLoad = _reflection.GeneratedProtocolMessageType('MethodLoad', (_message.Message,), {
+  'DESCRIPTOR' : _METHODLOAD,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:MethodLoad)
+  })
+_sym_db.RegisterMessage(MethodLoad)
+
+HeartbeatResponse = _reflection.GeneratedProtocolMessageType('HeartbeatResponse', (_message.Message,), {
+  'DESCRIPTOR' : _HEARTBEATRESPONSE,
+  '__module__' : 'messages_pb2'
+  # @@protoc_insertion_point(class_scope:HeartbeatResponse)
+  })
+_sym_db.RegisterMessage(HeartbeatResponse)
+
+
+DESCRIPTOR._options = None
+_USERINFO_TESTBEDTENANTSENTRY._options = None
+
+_REGISTRATIONSERVICE = _descriptor.ServiceDescriptor(
+  name='RegistrationService',
+  full_name='RegistrationService',
+  file=DESCRIPTOR,
+  index=0,
+  serialized_options=None,
+  serialized_start=1919,
+  serialized_end=2159,
+  methods=[
+  _descriptor.MethodDescriptor(
+    name='register',
+    full_name='RegistrationService.register',
+    index=0,
+    containing_service=None,
+    input_type=_REGISTERMESSAGE,
+    output_type=_RESPONSEMESSAGE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='unregister',
+    full_name='RegistrationService.unregister',
+    index=1,
+    containing_service=None,
+    input_type=_UNREGISTERMESSAGE,
+    output_type=_RESPONSEMESSAGE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='update_status',
+    full_name='RegistrationService.update_status',
+    index=2,
+    containing_service=None,
+    input_type=_STATUSMESSAGE,
+    output_type=_RESPONSEMESSAGE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='update_status_stream',
+    full_name='RegistrationService.update_status_stream',
+    index=3,
+    containing_service=None,
+    input_type=_STATUSMESSAGE,
+    output_type=_RESPONSEMESSAGE,
+    serialized_options=None,
+  ),
+])
+_sym_db.RegisterServiceDescriptor(_REGISTRATIONSERVICE)
+
+DESCRIPTOR.services_by_name['RegistrationService'] = _REGISTRATIONSERVICE
+
+
+_MANAGERAGENT = _descriptor.ServiceDescriptor(
+  name='ManagerAgent',
+  full_name='ManagerAgent',
+  file=DESCRIPTOR,
+  index=1,
+  serialized_options=None,
+  serialized_start=2162,
+  serialized_end=2534,
+  methods=[
+  _descriptor.MethodDescriptor(
+    name='execute',
+    full_name='ManagerAgent.execute',
+    index=0,
+    containing_service=None,
+    input_type=_REQUESTMESSAGE,
+    output_type=_RESPONSEMESSAGE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='refresh_resources',
+    full_name='ManagerAgent.refresh_resources',
+    index=1,
+    containing_service=None,
+    input_type=_USERINFO,
+    output_type=_RESPONSEMESSAGE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='create_user',
+    full_name='ManagerAgent.create_user',
+    index=2,
+    containing_service=None,
+    input_type=_USERINFO,
+    output_type=_USERINFO,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='delete_user',
+    full_name='ManagerAgent.delete_user',
+    index=3,
+    containing_service=None,
+    input_type=_USERINFO,
+    output_type=_EMPTY,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='heartbeat',
+    full_name='ManagerAgent.heartbeat',
+    index=4,
+    containing_service=None,
+    input_type=_EMPTY,
+    output_type=_HEARTBEATRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='provide_resources_stream',
+    full_name='ManagerAgent.provide_resources_stream',
+    index=5,
+    containing_service=None,
+    input_type=_REQUESTMESSAGE,
+    output_type=_RESOURCE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='get_job',
+    full_name='ManagerAgent.get_job',
+    index=6,
+    containing_service=None,
+    input_type=_JOBREQUEST,
+    output_type=_JOBSTATUS,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='watch_job',
+    full_name='ManagerAgent.watch_job',
+    index=7,
+    containing_service=None,
+    input_type=_JOBREQUEST,
+    output_type=_JOBSTATUS,
+    serialized_options=None,
+  ),
+])
+_sym_db.RegisterServiceDescriptor(_MANAGERAGENT)
+
+DESCRIPTOR.services_by_name['ManagerAgent'] = _MANAGERAGENT
 
-DESCRIPTOR.has_options = True
-DESCRIPTOR._options = _descriptor._ParseOptions(descriptor_pb2.FileOptions(), _b('H\003'))
-_USERINFO_TESTBEDTENANTSENTRY.has_options = True
-_USERINFO_TESTBEDTENANTSENTRY._options = _descriptor._ParseOptions(descriptor_pb2.MessageOptions(), _b('8\001'))
-try:
-  # THESE ELEMENTS WILL BE DEPRECATED.
-  # Please use the generated *_pb2_grpc.py files instead.
-  import grpc
-  from grpc.beta import implementations as beta_implementations
-  from grpc.beta import interfaces as beta_interfaces
-  from grpc.framework.common import cardinality
-  from grpc.framework.interfaces.face import utilities as face_utilities
-
-
-  class RegistrationServiceStub(object):
-    # missing associated documentation comment in .proto file
-    pass
-
-    def __init__(self, channel):
-      """Constructor.
-
-      Args:
-        channel: A grpc.Channel.
-      """
-      self.register = channel.unary_unary(
-          '/RegistrationService/register',
-          request_serializer=RegisterMessage.SerializeToString,
-          response_deserializer=ResponseMessage.FromString,
-          )
-      self.unregister = channel.unary_unary(
-          '/RegistrationService/unregister',
-          request_serializer=UnregisterMessage.SerializeToString,
-          response_deserializer=ResponseMessage.FromString,
-          )
-      self.update_status = channel.unary_unary(
-          '/RegistrationService/update_status',
-          request_serializer=StatusMessage.SerializeToString,
-          response_deserializer=ResponseMessage.FromString,
-          )
-
-
-  class RegistrationServiceServicer(object):
-    # missing associated documentation comment in .proto file
-    pass
-
-    def register(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-      context.set_details('Method not implemented!')
-      raise NotImplementedError('Method not implemented!')
-
-    def unregister(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-      context.set_details('Method not implemented!')
-      raise NotImplementedError('Method not implemented!')
-
-    def update_status(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-      context.set_details('Method not implemented!')
-      raise NotImplementedError('Method not implemented!')
-
-
-  def add_RegistrationServiceServicer_to_server(servicer, server):
-    rpc_method_handlers = {
-        'register': grpc.unary_unary_rpc_method_handler(
-            servicer.register,
-            request_deserializer=RegisterMessage.FromString,
-            response_serializer=ResponseMessage.SerializeToString,
-        ),
-        'unregister': grpc.unary_unary_rpc_method_handler(
-            servicer.unregister,
-            request_deserializer=UnregisterMessage.FromString,
-            response_serializer=ResponseMessage.SerializeToString,
-        ),
-        'update_status': grpc.unary_unary_rpc_method_handler(
-            servicer.update_status,
-            request_deserializer=StatusMessage.FromString,
-            response_serializer=ResponseMessage.SerializeToString,
-        ),
-    }
-    generic_handler = grpc.method_handlers_generic_handler(
-        'RegistrationService', rpc_method_handlers)
-    server.add_generic_rpc_handlers((generic_handler,))
-
-
-  class ManagerAgentStub(object):
-    # missing associated documentation comment in .proto file
-    pass
-
-    def __init__(self, channel):
-      """Constructor.
-
-      Args:
-        channel: A grpc.Channel.
-      """
-      self.execute = channel.unary_unary(
-          '/ManagerAgent/execute',
-          request_serializer=RequestMessage.SerializeToString,
-          response_deserializer=ResponseMessage.FromString,
-          )
-      self.refresh_resources = channel.unary_unary(
-          '/ManagerAgent/refresh_resources',
-          request_serializer=UserInfo.SerializeToString,
-          response_deserializer=ResponseMessage.FromString,
-          )
-      self.create_user = channel.unary_unary(
-          '/ManagerAgent/create_user',
-          request_serializer=UserInfo.SerializeToString,
-          response_deserializer=UserInfo.FromString,
-          )
-      self.delete_user = channel.unary_unary(
-          '/ManagerAgent/delete_user',
-          request_serializer=UserInfo.SerializeToString,
-          response_deserializer=Empty.FromString,
-          )
-      self.heartbeat = channel.unary_unary(
-          '/ManagerAgent/heartbeat',
-          request_serializer=Empty.SerializeToString,
-          response_deserializer=Empty.FromString,
-          )
-
-
-  class ManagerAgentServicer(object):
-    # missing associated documentation comment in .proto file
-    pass
-
-    def execute(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-      context.set_details('Method not implemented!')
-      raise NotImplementedError('Method not implemented!')
-
-    def refresh_resources(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-      context.set_details('Method not implemented!')
-      raise NotImplementedError('Method not implemented!')
-
-    def create_user(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-      context.set_details('Method not implemented!')
-      raise NotImplementedError('Method not implemented!')
-
-    def delete_user(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-      context.set_details('Method not implemented!')
-      raise NotImplementedError('Method not implemented!')
-
-    def heartbeat(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-      context.set_details('Method not implemented!')
-      raise NotImplementedError('Method not implemented!')
-
-
-  def add_ManagerAgentServicer_to_server(servicer, server):
-    rpc_method_handlers = {
-        'execute': grpc.unary_unary_rpc_method_handler(
-            servicer.execute,
-            request_deserializer=RequestMessage.FromString,
-            response_serializer=ResponseMessage.SerializeToString,
-        ),
-        'refresh_resources': grpc.unary_unary_rpc_method_handler(
-            servicer.refresh_resources,
-            request_deserializer=UserInfo.FromString,
-            response_serializer=ResponseMessage.SerializeToString,
-        ),
-        'create_user': grpc.unary_unary_rpc_method_handler(
-            servicer.create_user,
-            request_deserializer=UserInfo.FromString,
-            response_serializer=UserInfo.SerializeToString,
-        ),
-        'delete_user': grpc.unary_unary_rpc_method_handler(
-            servicer.delete_user,
-            request_deserializer=UserInfo.FromString,
-            response_serializer=Empty.SerializeToString,
-        ),
-        'heartbeat': grpc.unary_unary_rpc_method_handler(
-            servicer.heartbeat,
-            request_deserializer=Empty.FromString,
-            response_serializer=Empty.SerializeToString,
-        ),
-    }
-    generic_handler = grpc.method_handlers_generic_handler(
-        'ManagerAgent', rpc_method_handlers)
-    server.add_generic_rpc_handlers((generic_handler,))
-
-
-  class BetaRegistrationServiceServicer(object):
-    """The Beta API is deprecated for 0.15.0 and later.
-
-    It is recommended to use the GA API (classes and functions in this
-    file not marked beta) for all further purposes. This class was generated
-    only to ease transition from grpcio<0.15.0 to grpcio>=0.15.0."""
-    # missing associated documentation comment in .proto file
-    pass
-    def register(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
-    def unregister(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
-    def update_status(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
-
-
-  class BetaRegistrationServiceStub(object):
-    """The Beta API is deprecated for 0.15.0 and later.
-
-    It is recommended to use the GA API (classes and functions in this
-    file not marked beta) for all further purposes. This class was generated
-    only to ease transition from grpcio<0.15.0 to grpcio>=0.15.0."""
-    # missing associated documentation comment in .proto file
-    pass
-    def register(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-      # missing associated documentation comment in .proto file
-      pass
-      raise NotImplementedError()
-    register.future = None
-    def unregister(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-      # missing associated documentation comment in .proto file
-      pass
-      raise NotImplementedError()
-    unregister.future = None
-    def update_status(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-      # missing associated documentation comment in .proto file
-      pass
-      raise NotImplementedError()
-    update_status.future = None
-
-
-  def beta_create_RegistrationService_server(servicer, pool=None, pool_size=None, default_timeout=None, maximum_timeout=None):
-    """The Beta API is deprecated for 0.15.0 and later.
-
-    It is recommended to use the GA API (classes and functions in this
-    file not marked beta) for all further purposes. This function was
-    generated only to ease transition from grpcio<0.15.0 to grpcio>=0.15.0"""
-    request_deserializers = {
-      ('RegistrationService', 'register'): RegisterMessage.FromString,
-      ('RegistrationService', 'unregister'): UnregisterMessage.FromString,
-      ('RegistrationService', 'update_status'): StatusMessage.FromString,
-    }
-    response_serializers = {
-      ('RegistrationService', 'register'): ResponseMessage.SerializeToString,
-      ('RegistrationService', 'unregister'): ResponseMessage.SerializeToString,
-      ('RegistrationService', 'update_status'): ResponseMessage.SerializeToString,
-    }
-    method_implementations = {
-      ('RegistrationService', 'register'): face_utilities.unary_unary_inline(servicer.register),
-      ('RegistrationService', 'unregister'): face_utilities.unary_unary_inline(servicer.unregister),
-      ('RegistrationService', 'update_status'): face_utilities.unary_unary_inline(servicer.update_status),
-    }
-    server_options = beta_implementations.server_options(request_deserializers=request_deserializers, response_serializers=response_serializers, thread_pool=pool, thread_pool_size=pool_size, default_timeout=default_timeout, maximum_timeout=maximum_timeout)
-    return beta_implementations.server(method_implementations, options=server_options)
-
-
-  def beta_create_RegistrationService_stub(channel, host=None, metadata_transformer=None, pool=None, pool_size=None):
-    """The Beta API is deprecated for 0.15.0 and later.
-
-    It is recommended to use the GA API (classes and functions in this
-    file not marked beta) for all further purposes. This function was
-    generated only to ease transition from grpcio<0.15.0 to grpcio>=0.15.0"""
-    request_serializers = {
-      ('RegistrationService', 'register'): RegisterMessage.SerializeToString,
-      ('RegistrationService', 'unregister'): UnregisterMessage.SerializeToString,
-      ('RegistrationService', 'update_status'): StatusMessage.SerializeToString,
-    }
-    response_deserializers = {
-      ('RegistrationService', 'register'): ResponseMessage.FromString,
-      ('RegistrationService', 'unregister'): ResponseMessage.FromString,
-      ('RegistrationService', 'update_status'): ResponseMessage.FromString,
-    }
-    cardinalities = {
-      'register': cardinality.Cardinality.UNARY_UNARY,
-      'unregister': cardinality.Cardinality.UNARY_UNARY,
-      'update_status': cardinality.Cardinality.UNARY_UNARY,
-    }
-    stub_options = beta_implementations.stub_options(host=host, metadata_transformer=metadata_transformer, request_serializers=request_serializers, response_deserializers=response_deserializers, thread_pool=pool, thread_pool_size=pool_size)
-    return beta_implementations.dynamic_stub(channel, 'RegistrationService', cardinalities, options=stub_options)
-
-
-  class BetaManagerAgentServicer(object):
-    """The Beta API is deprecated for 0.15.0 and later.
-
-    It is recommended to use the GA API (classes and functions in this
-    file not marked beta) for all further purposes. This class was generated
-    only to ease transition from grpcio<0.15.0 to grpcio>=0.15.0."""
-    # missing associated documentation comment in .proto file
-    pass
-    def execute(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
-    def refresh_resources(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
-    def create_user(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
-    def delete_user(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
-    def heartbeat(self, request, context):
-      # missing associated documentation comment in .proto file
-      pass
-      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
-
-
-  class BetaManagerAgentStub(object):
-    """The Beta API is deprecated for 0.15.0 and later.
-
-    It is recommended to use the GA API (classes and functions in this
-    file not marked beta) for all further purposes. This class was generated
-    only to ease transition from grpcio<0.15.0 to grpcio>=0.15.0."""
-    # missing associated documentation comment in .proto file
-    pass
-    def execute(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-      # missing associated documentation comment in .proto file
-      pass
-      raise NotImplementedError()
-    execute.future = None
-    def refresh_resources(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-      # missing associated documentation comment in .proto file
-      pass
-      raise NotImplementedError()
-    refresh_resources.future = None
-    def create_user(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-      # missing associated documentation comment in .proto file
-      pass
-      raise NotImplementedError()
-    create_user.future = None
-    def delete_user(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-      # missing associated documentation comment in .proto file
-      pass
-      raise NotImplementedError()
-    delete_user.future = None
-    def heartbeat(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
-      # missing associated documentation comment in .proto file
-      pass
-      raise NotImplementedError()
-    heartbeat.future = None
-
-
-  def beta_create_ManagerAgent_server(servicer, pool=None, pool_size=None, default_timeout=None, maximum_timeout=None):
-    """The Beta API is deprecated for 0.15.0 and later.
-
-    It is recommended to use the GA API (classes and functions in this
-    file not marked beta) for all further purposes. This function was
-    generated only to ease transition from grpcio<0.15.0 to grpcio>=0.15.0"""
-    request_deserializers = {
-      ('ManagerAgent', 'create_user'): UserInfo.FromString,
-      ('ManagerAgent', 'delete_user'): UserInfo.FromString,
-      ('ManagerAgent', 'execute'): RequestMessage.FromString,
-      ('ManagerAgent', 'heartbeat'): Empty.FromString,
-      ('ManagerAgent', 'refresh_resources'): UserInfo.FromString,
-    }
-    response_serializers = {
-      ('ManagerAgent', 'create_user'): UserInfo.SerializeToString,
-      ('ManagerAgent', 'delete_user'): Empty.SerializeToString,
-      ('ManagerAgent', 'execute'): ResponseMessage.SerializeToString,
-      ('ManagerAgent', 'heartbeat'): Empty.SerializeToString,
-      ('ManagerAgent', 'refresh_resources'): ResponseMessage.SerializeToString,
-    }
-    method_implementations = {
-      ('ManagerAgent', 'create_user'): face_utilities.unary_unary_inline(servicer.create_user),
-      ('ManagerAgent', 'delete_user'): face_utilities.unary_unary_inline(servicer.delete_user),
-      ('ManagerAgent', 'execute'): face_utilities.unary_unary_inline(servicer.execute),
-      ('ManagerAgent', 'heartbeat'): face_utilities.unary_unary_inline(servicer.heartbeat),
-      ('ManagerAgent', 'refresh_resources'): face_utilities.unary_unary_inline(servicer.refresh_resources),
-    }
-    server_options = beta_implementations.server_options(request_deserializers=request_deserializers, response_serializers=response_serializers, thread_pool=pool, thread_pool_size=pool_size, default_timeout=default_timeout, maximum_timeout=maximum_timeout)
-    return beta_implementations.server(method_implementations, options=server_options)
-
-
-  def beta_create_ManagerAgent_stub(channel, host=None, metadata_transformer=None, pool=None, pool_size=None):
-    """The Beta API is deprecated for 0.15.0 and later.
-
-    It is recommended to use the GA API (classes and functions in this
-    file not marked beta) for all further purposes. This function was
-    generated only to ease transition from grpcio<0.15.0 to grpcio>=0.15.0"""
-    request_serializers = {
-      ('ManagerAgent', 'create_user'): UserInfo.SerializeToString,
-      ('ManagerAgent', 'delete_user'): UserInfo.SerializeToString,
-      ('ManagerAgent', 'execute'): RequestMessage.SerializeToString,
-      ('ManagerAgent', 'heartbeat'): Empty.SerializeToString,
-      ('ManagerAgent', 'refresh_resources'): UserInfo.SerializeToString,
-    }
-    response_deserializers = {
-      ('ManagerAgent', 'create_user'): UserInfo.FromString,
-      ('ManagerAgent', 'delete_user'): Empty.FromString,
-      ('ManagerAgent', 'execute'): ResponseMessage.FromString,
-      ('ManagerAgent', 'heartbeat'): Empty.FromString,
-      ('ManagerAgent', 'refresh_resources'): ResponseMessage.FromString,
-    }
-    cardinalities = {
-      'create_user': cardinality.Cardinality.UNARY_UNARY,
-      'delete_user': cardinality.Cardinality.UNARY_UNARY,
-      'execute': cardinality.Cardinality.UNARY_UNARY,
-      'heartbeat': cardinality.Cardinality.UNARY_UNARY,
-      'refresh_resources': cardinality.Cardinality.UNARY_UNARY,
-    }
-    stub_options = beta_implementations.stub_options(host=host, metadata_transformer=metadata_transformer, request_serializers=request_serializers, response_deserializers=response_deserializers, thread_pool=pool, thread_pool_size=pool_size)
-    return beta_implementations.dynamic_stub(channel, 'ManagerAgent', cardinalities, options=stub_options)
-except ImportError:
-  pass
 # @@protoc_insertion_point(module_scope)
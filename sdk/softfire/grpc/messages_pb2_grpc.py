@@ -29,6 +29,11 @@ class RegistrationServiceStub(object):
         request_serializer=messages__pb2.StatusMessage.SerializeToString,
         response_deserializer=messages__pb2.ResponseMessage.FromString,
         )
+    self.update_status_stream = channel.stream_unary(
+        '/RegistrationService/update_status_stream',
+        request_serializer=messages__pb2.StatusMessage.SerializeToString,
+        response_deserializer=messages__pb2.ResponseMessage.FromString,
+        )
 
 
 class RegistrationServiceServicer(object):
@@ -56,6 +61,13 @@ class RegistrationServiceServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def update_status_stream(self, request_iterator, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_RegistrationServiceServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -74,6 +86,11 @@ def add_RegistrationServiceServicer_to_server(servicer, server):
           request_deserializer=messages__pb2.StatusMessage.FromString,
           response_serializer=messages__pb2.ResponseMessage.SerializeToString,
       ),
+      'update_status_stream': grpc.stream_unary_rpc_method_handler(
+          servicer.update_status_stream,
+          request_deserializer=messages__pb2.StatusMessage.FromString,
+          response_serializer=messages__pb2.ResponseMessage.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'RegistrationService', rpc_method_handlers)
@@ -113,7 +130,22 @@ class ManagerAgentStub(object):
     self.heartbeat = channel.unary_unary(
         '/ManagerAgent/heartbeat',
         request_serializer=messages__pb2.Empty.SerializeToString,
-        response_deserializer=messages__pb2.Empty.FromString,
+        response_deserializer=messages__pb2.HeartbeatResponse.FromString,
+        )
+    self.provide_resources_stream = channel.unary_stream(
+        '/ManagerAgent/provide_resources_stream',
+        request_serializer=messages__pb2.RequestMessage.SerializeToString,
+        response_deserializer=messages__pb2.Resource.FromString,
+        )
+    self.get_job = channel.unary_unary(
+        '/ManagerAgent/get_job',
+        request_serializer=messages__pb2.JobRequest.SerializeToString,
+        response_deserializer=messages__pb2.JobStatus.FromString,
+        )
+    self.watch_job = channel.unary_stream(
+        '/ManagerAgent/watch_job',
+        request_serializer=messages__pb2.JobRequest.SerializeToString,
+        response_deserializer=messages__pb2.JobStatus.FromString,
         )
 
 
@@ -156,6 +188,27 @@ class ManagerAgentServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def provide_resources_stream(self, request, context):
+    """same as execute with PROVIDE_RESOURCES, but each Resource is sent as soon as it is deployed
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def get_job(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def watch_job(self, request, context):
+    # missing associated documentation comment in .proto file
+    pass
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_ManagerAgentServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -182,7 +235,22 @@ def add_ManagerAgentServicer_to_server(servicer, server):
       'heartbeat': grpc.unary_unary_rpc_method_handler(
           servicer.heartbeat,
           request_deserializer=messages__pb2.Empty.FromString,
-          response_serializer=messages__pb2.Empty.SerializeToString,
+          response_serializer=messages__pb2.HeartbeatResponse.SerializeToString,
+      ),
+      'provide_resources_stream': grpc.unary_stream_rpc_method_handler(
+          servicer.provide_resources_stream,
+          request_deserializer=messages__pb2.RequestMessage.FromString,
+          response_serializer=messages__pb2.Resource.SerializeToString,
+      ),
+      'get_job': grpc.unary_unary_rpc_method_handler(
+          servicer.get_job,
+          request_deserializer=messages__pb2.JobRequest.FromString,
+          response_serializer=messages__pb2.JobStatus.SerializeToString,
+      ),
+      'watch_job': grpc.unary_stream_rpc_method_handler(
+          servicer.watch_job,
+          request_deserializer=messages__pb2.JobRequest.FromString,
+          response_serializer=messages__pb2.JobStatus.SerializeToString,
       ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
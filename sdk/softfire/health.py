@@ -0,0 +1,42 @@
+from sdk.softfire import metrics
+from sdk.softfire.grpc import messages_pb2
+
+
+class LoadReporter(object):
+    def __init__(self, capacity=0, bulkheads=None):
+        """
+        Build the heartbeat response from the counters kept by the MetricsInterceptor and the bulkheads, without
+        touching the manager
+
+        :param capacity: the calls served at the same time by the server, 0 if not bounded
+        :param bulkheads: dict of method key -> Bulkhead, see get_bulkheads
+        """
+        self.capacity = capacity
+        self.bulkheads = bulkheads or {}
+        self.draining = False
+
+    def report(self):
+        """
+        :rtype: messages_pb2.HeartbeatResponse
+        """
+        in_flight = {}
+        for (rpc, method), value in metrics.REQUESTS_IN_FLIGHT.values().items():
+            if rpc != 'heartbeat':
+                in_flight[method] = in_flight.get(method, 0) + int(value)
+        methods = []
+        for method in sorted(set(in_flight) | set(metrics.RECENT_LATENCY.methods())):
+            if method == 'heartbeat':
+                continue
+            bulkhead = self.bulkheads.get(method)
+            methods.append(messages_pb2.MethodLoad(method=method,
+                                                   in_flight=in_flight.get(method, 0),
+                                                   queued=bulkhead.waiting if bulkhead else 0,
+                                                   capacity=bulkhead.max_concurrent if bulkhead else 0,
+                                                   p99_latency=metrics.RECENT_LATENCY.quantile(0.99, method)))
+        server_queue = int(metrics.EXECUTOR_QUEUE_DEPTH.get(pool='server'))
+        queue_depth = sum(int(value) for value in metrics.EXECUTOR_QUEUE_DEPTH.values().values())
+        return messages_pb2.HeartbeatResponse(ready=not self.draining and server_queue == 0,
+                                              in_flight=sum(in_flight.values()),
+                                              queue_depth=queue_depth,
+                                              capacity=self.capacity,
+                                              methods=methods)
@@ -0,0 +1,451 @@
+import contextvars
+import time
+
+import grpc
+
+from sdk.softfire import metrics
+from sdk.softfire.cancellation import CancellationToken, cancellation_scope
+from sdk.softfire.grpc import messages_pb2
+from sdk.softfire.utils import RateLimitedError, ServerBusyError, rpc_method_key
+
+
+def _wrap_handler(handler, unary_wrapper, stream_wrapper):
+    """
+    Return a copy of handler whose behavior is wrapped. Only the unary request types used by ManagerAgent are
+    wrapped, the others are returned as they are
+    """
+    if handler is None:
+        return None
+    if handler.unary_unary is not None:
+        return handler._replace(unary_unary=unary_wrapper(handler.unary_unary))
+    if handler.unary_stream is not None:
+        return handler._replace(unary_stream=stream_wrapper(handler.unary_stream))
+    return handler
+
+
+# the _CallRecord of the call being served, set by the metrics interceptors
+_current_record = contextvars.ContextVar('softfire_call_record', default=None)
+
+
+def _mark_rejected():
+    """
+    The call being served is rejected before any work: its duration is not a latency of its method
+    """
+    record = _current_record.get()
+    if record is not None:
+        record.rejected = True
+
+
+def _username(request):
+    user_info = getattr(request, 'user_info', request)
+    return getattr(user_info, 'name', '')
+
+
+def _rejection(controller, full_method, request, context):
+    """
+    Admit the call in controller, unless its deadline expires before the median duration of the recent calls of
+    its method
+
+    :return: None if admitted, otherwise the status code, the details and the seconds to wait before retrying
+    """
+    method = rpc_method_key(full_method, request)
+    remaining = context.time_remaining()
+    if remaining is not None and remaining < metrics.RECENT_LATENCY.quantile(0.5, method):
+        return grpc.StatusCode.DEADLINE_EXCEEDED, "%s would not complete before the deadline" % method, None
+    try:
+        controller.admit(method, _username(request))
+    except RateLimitedError as e:
+        metrics.REJECTED_CALLS.inc(method=method)
+        return grpc.StatusCode.RESOURCE_EXHAUSTED, e.message, e.retry_after
+    return None
+
+
+def _retry_after_metadata(retry_after):
+    return (('retry-after-ms', str(int(retry_after * 1000))),)
+
+
+class AdmissionInterceptor(grpc.ServerInterceptor):
+    def __init__(self, controller):
+        """
+        Reject the calls refused by the AdmissionController with RESOURCE_EXHAUSTED and a retry-after-ms trailing
+        metadata, and the calls that would not complete before their deadline with DEADLINE_EXCEEDED, before any
+        work starts. The heartbeat is always admitted
+        :param controller: the AdmissionController
+        """
+        self.controller = controller
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        full_method = handler_call_details.method
+        if self.controller is None or full_method.endswith('/heartbeat'):
+            return handler
+
+        def _admit(request, context):
+            rejection = _rejection(self.controller, full_method, request, context)
+            if rejection is not None:
+                _mark_rejected()
+                code, details, retry_after = rejection
+                if retry_after is not None:
+                    context.set_trailing_metadata(_retry_after_metadata(retry_after))
+                context.abort(code, details)
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                _admit(request, context)
+                try:
+                    return behavior(request, context)
+                finally:
+                    self.controller.release()
+
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                _admit(request, context)
+                try:
+                    yield from behavior(request, context)
+                finally:
+                    self.controller.release()
+
+            return wrapper
+
+        return _wrap_handler(handler, unary_wrapper, stream_wrapper)
+
+
+class AsyncAdmissionInterceptor(grpc.aio.ServerInterceptor):
+    """
+    AdmissionInterceptor for the asyncio server
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        full_method = handler_call_details.method
+        if self.controller is None or full_method.endswith('/heartbeat'):
+            return handler
+
+        async def _admit(request, context):
+            rejection = _rejection(self.controller, full_method, request, context)
+            if rejection is not None:
+                _mark_rejected()
+                code, details, retry_after = rejection
+                if retry_after is not None:
+                    context.set_trailing_metadata(_retry_after_metadata(retry_after))
+                await context.abort(code, details)
+
+        def unary_wrapper(behavior):
+            async def wrapper(request, context):
+                await _admit(request, context)
+                try:
+                    return await behavior(request, context)
+                finally:
+                    self.controller.release()
+
+            return wrapper
+
+        def stream_wrapper(behavior):
+            async def wrapper(request, context):
+                await _admit(request, context)
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                finally:
+                    self.controller.release()
+
+            return wrapper
+
+        return _wrap_handler(handler, unary_wrapper, stream_wrapper)
+
+
+class CancellationInterceptor(grpc.ServerInterceptor):
+    """
+    Serve each call within the cancellation_scope of a CancellationToken cancelled when the call terminates or its
+    deadline expires, so that the manager can stop working for a caller that went away
+    """
+
+    def intercept_service(self, continuation, handler_call_details):
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                with cancellation_scope(CancellationToken.from_context(context)):
+                    return behavior(request, context)
+
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                with cancellation_scope(CancellationToken.from_context(context)):
+                    yield from behavior(request, context)
+
+            return wrapper
+
+        return _wrap_handler(continuation(handler_call_details), unary_wrapper, stream_wrapper)
+
+
+class AsyncCancellationInterceptor(grpc.aio.ServerInterceptor):
+    """
+    CancellationInterceptor for the asyncio server
+    """
+
+    async def intercept_service(self, continuation, handler_call_details):
+        def unary_wrapper(behavior):
+            async def wrapper(request, context):
+                with cancellation_scope(CancellationToken.from_context(context)):
+                    return await behavior(request, context)
+
+            return wrapper
+
+        def stream_wrapper(behavior):
+            async def wrapper(request, context):
+                with cancellation_scope(CancellationToken.from_context(context)):
+                    async for response in behavior(request, context):
+                        yield response
+
+            return wrapper
+
+        return _wrap_handler(await continuation(handler_call_details), unary_wrapper, stream_wrapper)
+
+
+class BulkheadInterceptor(grpc.ServerInterceptor):
+    def __init__(self, bulkheads):
+        """
+        Run each call inside the Bulkhead of its method, calls are rejected with RESOURCE_EXHAUSTED when it is full
+        :param bulkheads: dict of method key -> Bulkhead
+        """
+        self.bulkheads = bulkheads
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if not self.bulkheads:
+            return handler
+        full_method = handler_call_details.method
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                bulkhead = self.bulkheads.get(rpc_method_key(full_method, request))
+                if bulkhead is None:
+                    return behavior(request, context)
+                try:
+                    bulkhead.acquire()
+                except ServerBusyError as e:
+                    _mark_rejected()
+                    metrics.REJECTED_CALLS.inc(method=bulkhead.name)
+                    context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, e.message)
+                try:
+                    return behavior(request, context)
+                finally:
+                    bulkhead.release()
+
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                bulkhead = self.bulkheads.get(rpc_method_key(full_method, request))
+                if bulkhead is None:
+                    yield from behavior(request, context)
+                    return
+                try:
+                    bulkhead.acquire()
+                except ServerBusyError as e:
+                    _mark_rejected()
+                    metrics.REJECTED_CALLS.inc(method=bulkhead.name)
+                    context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, e.message)
+                try:
+                    yield from behavior(request, context)
+                finally:
+                    bulkhead.release()
+
+            return wrapper
+
+        return _wrap_handler(handler, unary_wrapper, stream_wrapper)
+
+
+class AsyncBulkheadInterceptor(grpc.aio.ServerInterceptor):
+    def __init__(self, bulkheads):
+        """
+        BulkheadInterceptor for the asyncio server
+        :param bulkheads: dict of method key -> AsyncBulkhead
+        """
+        self.bulkheads = bulkheads
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if not self.bulkheads:
+            return handler
+        full_method = handler_call_details.method
+
+        async def _acquire(bulkhead, context):
+            try:
+                await bulkhead.acquire()
+            except ServerBusyError as e:
+                _mark_rejected()
+                metrics.REJECTED_CALLS.inc(method=bulkhead.name)
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, e.message)
+
+        def unary_wrapper(behavior):
+            async def wrapper(request, context):
+                bulkhead = self.bulkheads.get(rpc_method_key(full_method, request))
+                if bulkhead is None:
+                    return await behavior(request, context)
+                await _acquire(bulkhead, context)
+                try:
+                    return await behavior(request, context)
+                finally:
+                    await bulkhead.release()
+
+            return wrapper
+
+        def stream_wrapper(behavior):
+            async def wrapper(request, context):
+                bulkhead = self.bulkheads.get(rpc_method_key(full_method, request))
+                if bulkhead is None:
+                    async for response in behavior(request, context):
+                        yield response
+                    return
+                await _acquire(bulkhead, context)
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                finally:
+                    await bulkhead.release()
+
+            return wrapper
+
+        return _wrap_handler(handler, unary_wrapper, stream_wrapper)
+
+
+class ProfilerInterceptor(grpc.ServerInterceptor):
+    def __init__(self, profiler):
+        """
+        Run the calls under the RequestProfiler
+        :param profiler: the RequestProfiler
+        """
+        self.profiler = profiler
+
+    def intercept_service(self, continuation, handler_call_details):
+        full_method = handler_call_details.method
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                with self.profiler.profile(rpc_method_key(full_method, request), _username(request)):
+                    return behavior(request, context)
+
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                with self.profiler.profile(rpc_method_key(full_method, request), _username(request)):
+                    yield from behavior(request, context)
+
+            return wrapper
+
+        return _wrap_handler(continuation(handler_call_details), unary_wrapper, stream_wrapper)
+
+
+class _CallRecord(object):
+    def __init__(self, full_method, request):
+        self.rpc = full_method.rsplit('/', 1)[-1]
+        self.method = rpc_method_key(full_method, request)
+        self.error = False
+        self.rejected = False
+        self.start = time.monotonic()
+        metrics.REQUESTS_IN_FLIGHT.inc(rpc=self.rpc, method=self.method)
+
+    def check_response(self, response):
+        if isinstance(response, messages_pb2.ResponseMessage) and response.result == messages_pb2.ERROR:
+            self.error = True
+        return response
+
+    def finish(self):
+        metrics.REQUESTS_IN_FLIGHT.dec(rpc=self.rpc, method=self.method)
+        duration = time.monotonic() - self.start
+        metrics.REQUEST_DURATION.observe(duration, rpc=self.rpc, method=self.method)
+        if not self.rejected:
+            # the admission and the heartbeat rely on the latency of the calls served
+            metrics.RECENT_LATENCY.observe(duration, self.method)
+        if self.error:
+            metrics.REQUEST_ERRORS.inc(rpc=self.rpc, method=self.method)
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """
+    Record latency, in flight calls and errors per rpc and per messages_pb2.Method
+    """
+
+    def intercept_service(self, continuation, handler_call_details):
+        full_method = handler_call_details.method
+
+        def unary_wrapper(behavior):
+            def wrapper(request, context):
+                record = _CallRecord(full_method, request)
+                token = _current_record.set(record)
+                try:
+                    return record.check_response(behavior(request, context))
+                except BaseException:
+                    record.error = True
+                    raise
+                finally:
+                    _current_record.reset(token)
+                    record.finish()
+
+            return wrapper
+
+        def stream_wrapper(behavior):
+            def wrapper(request, context):
+                record = _CallRecord(full_method, request)
+                token = _current_record.set(record)
+                try:
+                    yield from behavior(request, context)
+                except BaseException:
+                    record.error = True
+                    raise
+                finally:
+                    _current_record.reset(token)
+                    record.finish()
+
+            return wrapper
+
+        return _wrap_handler(continuation(handler_call_details), unary_wrapper, stream_wrapper)
+
+
+class AsyncMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """
+    MetricsInterceptor for the asyncio server
+    """
+
+    async def intercept_service(self, continuation, handler_call_details):
+        full_method = handler_call_details.method
+
+        def unary_wrapper(behavior):
+            async def wrapper(request, context):
+                record = _CallRecord(full_method, request)
+                token = _current_record.set(record)
+                try:
+                    return record.check_response(await behavior(request, context))
+                except BaseException:
+                    record.error = True
+                    raise
+                finally:
+                    _current_record.reset(token)
+                    record.finish()
+
+            return wrapper
+
+        def stream_wrapper(behavior):
+            async def wrapper(request, context):
+                record = _CallRecord(full_method, request)
+                token = _current_record.set(record)
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                except BaseException:
+                    record.error = True
+                    raise
+                finally:
+                    _current_record.reset(token)
+                    record.finish()
+
+            return wrapper
+
+        return _wrap_handler(await continuation(handler_call_details), unary_wrapper, stream_wrapper)
@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent import futures
+
+from sdk.softfire import metrics
+from sdk.softfire.cancellation import CancellationToken, cancellation_scope
+from sdk.softfire.grpc import messages_pb2
+from sdk.softfire.utils import ServerBusyError
+
+logger = logging.getLogger(__name__)
+
+JOBS_FINISHED = metrics.REGISTRY.counter('softfire_manager_jobs_finished_total',
+                                         'Jobs done or failed', ('method', 'state'))
+JOBS_RUNNING = metrics.REGISTRY.gauge('softfire_manager_jobs_running', 'Jobs running in the job pool')
+
+
+class Job(object):
+    def __init__(self, method):
+        """
+        Thread safe state of a provide or release running in the JobManager
+
+        :param method: the messages_pb2.Method of the request
+        """
+        self.job_id = uuid.uuid4().hex
+        self.method = method
+        self.state = messages_pb2.JOB_PENDING
+        self.resources = []
+        self.error_message = ''
+        self.finished_at = None
+        # incremented at each change, so that watchers know when to send the status again
+        self.version = 0
+        self._changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.state in (messages_pb2.JOB_DONE, messages_pb2.JOB_FAILED)
+
+    def _update(self, state=None, resource=None, error_message=None):
+        with self._changed:
+            if state is not None:
+                self.state = state
+            if resource is not None:
+                self.resources.append(resource)
+            if error_message is not None:
+                self.error_message = error_message
+            if self.done:
+                self.finished_at = time.monotonic()
+            self.version += 1
+            self._changed.notify_all()
+
+    def start(self):
+        self._update(state=messages_pb2.JOB_RUNNING)
+
+    def add_resource(self, content):
+        """
+        Report the progress of the job: content is the JSON string of a deployed resource
+        """
+        self._update(resource=content)
+
+    def succeed(self):
+        self._update(state=messages_pb2.JOB_DONE)
+
+    def fail(self, error_message):
+        self._update(state=messages_pb2.JOB_FAILED, error_message=error_message or "No message available")
+
+    def status(self):
+        """
+        :rtype: messages_pb2.JobStatus
+        """
+        with self._changed:
+            return messages_pb2.JobStatus(job_id=self.job_id,
+                                          state=self.state,
+                                          method=self.method,
+                                          resources=[messages_pb2.Resource(content=r) for r in self.resources],
+                                          error_message=self.error_message)
+
+    def next_status(self, version, timeout=None):
+        """
+        Wait until the job changes after version
+
+        :param version: the version of the last status seen, None to get the current status at once
+        :return: the current version and status, or version and None if nothing changed within timeout
+        """
+        with self._changed:
+            if version is not None and not self._changed.wait_for(lambda: self.version != version, timeout):
+                return version, None
+            return self.version, self.status()
+
+
+class JobManager(object):
+    def __init__(self, max_workers=4, max_pending=100, max_jobs=1024, ttl=3600):
+        """
+        Run the jobs in a dedicated thread pool, so that long provides and releases hold neither a gRPC call nor a
+        server thread. Jobs are not cancelled when the call submitting them terminates
+
+        :param max_workers: the jobs running at the same time
+        :param max_pending: the jobs waiting for a thread, submit raises ServerBusyError beyond it
+        :param max_jobs: the max number of jobs remembered, the oldest finished ones are forgotten first
+        :param ttl: the seconds a finished job is remembered
+        """
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def __len__(self):
+        return len(self._jobs)
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, method, target):
+        """
+        Run target(job) in the pool. target reports the deployed resources with job.add_resource, the job is done
+        when it returns and failed when it raises
+
+        :param method: the messages_pb2.Method of the request
+        :rtype: Job
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ServerBusyError("Too many jobs waiting, %d" % self._pending)
+            self._prune()
+            job = Job(method)
+            self._jobs[job.job_id] = job
+            self._pending += 1
+        try:
+            self._executor.submit(self._run, job, target)
+        except RuntimeError:
+            # the pool is shut down
+            with self._lock:
+                self._pending -= 1
+            job.fail("The manager is shutting down")
+        return job
+
+    def get(self, job_id):
+        """
+        :return: the Job or None if unknown or forgotten
+        """
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        now = time.monotonic()
+        finished = [j for j in self._jobs.values() if j.finished_at is not None]
+        for job in finished:
+            if len(self._jobs) > self.max_jobs or job.finished_at + self.ttl < now:
+                del self._jobs[job.job_id]
+
+    def _run(self, job, target):
+        with self._lock:
+            self._pending -= 1
+        job.start()
+        JOBS_RUNNING.inc()
+        method = messages_pb2.Method.Name(job.method)
+        try:
+            with cancellation_scope(CancellationToken()):
+                target(job)
+            job.succeed()
+            logger.info("Job %s %s done" % (job.job_id, method))
+        except Exception as e:
+            logger.exception("Job %s %s failed" % (job.job_id, method))
+            job.fail(getattr(e, 'message', None) or str(e))
+        finally:
+            JOBS_RUNNING.dec()
+            JOBS_FINISHED.inc(method=method, state=messages_pb2.JobState.Name(job.state))
+
+    def shutdown(self, wait=False):
+        """
+        Stop accepting jobs; the jobs still waiting for a thread are failed
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            for job in self._jobs.values():
+                if job.state == messages_pb2.JOB_PENDING:
+                    job.fail("The manager is shutting down")
+
+
+def get_job_manager(manager_instance):
+    """
+    Create the JobManager configured in the system section by job_threads, job_queue_size, job_history and
+    job_ttl (seconds)
+
+    :param manager_instance: the AbstractManager
+    :rtype: JobManager
+    """
+    return JobManager(max_workers=manager_instance.get_config_int('system', 'job_threads', 4),
+                      max_pending=manager_instance.get_config_int('system', 'job_queue_size', 100),
+                      max_jobs=manager_instance.get_config_int('system', 'job_history', 1024),
+                      ttl=manager_instance.get_config_float('system', 'job_ttl', '3600'))
@@ -1,6 +1,11 @@
+import asyncio
+import contextvars
+import functools
 import logging
+import multiprocessing
 import os
-import socket
+import queue
+import signal
 import sys
 import threading
 import time
@@ -10,73 +15,450 @@ from threading import Thread
 
 import grpc
 
+from sdk.softfire import metrics
+from sdk.softfire.admission import get_admission_controller
+from sdk.softfire.bulkhead import AsyncBulkhead, get_bulkheads
+from sdk.softfire.cache import AsyncSingleFlight, SingleFlight, call_key, get_request_results, \
+    get_single_flight_methods
+from sdk.softfire.channels import close_channels, get_em_backoff, get_em_channel, get_em_target, \
+    get_em_timeout, get_registration_stub
 from sdk.softfire.grpc import messages_pb2_grpc, messages_pb2
 from sdk.softfire.grpc.messages_pb2 import Empty
-from sdk.softfire.utils import get_config
+from sdk.softfire.health import LoadReporter
+from sdk.softfire.interceptors import AdmissionInterceptor, AsyncAdmissionInterceptor, AsyncBulkheadInterceptor, \
+    AsyncCancellationInterceptor, AsyncMetricsInterceptor, BulkheadInterceptor, CancellationInterceptor, \
+    MetricsInterceptor, ProfilerInterceptor
+from sdk.softfire.jobs import get_job_manager
+from sdk.softfire.manager import AbstractManager, AsyncAbstractManager
+from sdk.softfire.profiling import RequestProfiler
+from sdk.softfire.publisher import StatusDigests
+from sdk.softfire.utils import Backoff, ServerBusyError, get_config, install_config_reload_handler
 
-_ONE_DAY_IN_SECONDS = 60 * 60 * 24
+_STREAM_END = object()
+# seconds between two checks of a job by watch_job on the asyncio server
+_WATCH_POLL_INTERVAL = 0.2
+_JOB_FINISHED = (messages_pb2.JOB_DONE, messages_pb2.JOB_FAILED)
+# seconds a worker must live for its restart to happen immediately
+_WORKER_MIN_UPTIME = 10
 
 
-def _receive_forever(manager_instance):
-    server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=int(manager_instance.get_config_value('system', 'server_threads', '5'))))
-    messages_pb2_grpc.add_ManagerAgentServicer_to_server(_ManagerAgent(manager_instance), server)
+def _get_shutdown_grace(manager_instance):
+    """
+    Seconds the running calls have to complete when the manager goes down
+    """
+    return manager_instance.get_config_float('system', 'shutdown_grace', '30')
+
+
+def _receive_forever(manager_instance, stop_event=None):
+    bulkheads = get_bulkheads(manager_instance)
+    # calls waiting in a bulkhead keep their server thread, so there are always server_threads threads left for
+    # the other methods and the heartbeat
+    max_workers = manager_instance.get_config_int('system', 'server_threads', 5) + sum(
+        b.capacity for b in set(bulkheads.values()))
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    metrics.EXECUTOR_QUEUE_DEPTH.set_function(executor._work_queue.qsize, pool='server')
+    for bulkhead in set(bulkheads.values()):
+        metrics.EXECUTOR_QUEUE_DEPTH.set_function(lambda b=bulkhead: b.waiting, pool=bulkhead.name)
+    server = grpc.server(executor, interceptors=[MetricsInterceptor(),
+                                                 AdmissionInterceptor(get_admission_controller(manager_instance)),
+                                                 CancellationInterceptor(),
+                                                 BulkheadInterceptor(bulkheads),
+                                                 ProfilerInterceptor(RequestProfiler(manager_instance))],
+                         options=_server_options(manager_instance))
+    load_reporter = LoadReporter(max_workers, bulkheads)
+    agent = _ManagerAgent(manager_instance, load_reporter)
+    metrics.EXECUTOR_QUEUE_DEPTH.set_function(lambda: agent.jobs.pending, pool='jobs')
+    messages_pb2_grpc.add_ManagerAgentServicer_to_server(agent, server)
     binding = '[::]:%s' % manager_instance.get_config_value('messaging', 'bind_port')
     logging.info("Start listening on %s" % binding)
     server.add_insecure_port(binding)
     server.start()
+    if stop_event is None:
+        stop_event = threading.Event()
     try:
+        stop_event.wait()
+    finally:
+        load_reporter.draining = True
+        grace = _get_shutdown_grace(manager_instance)
+        logging.info("Shutting down gRPC, waiting up to %s seconds for the running calls" % grace)
+        server.stop(grace).wait()
+        metrics.EXECUTOR_QUEUE_DEPTH.remove_function(pool='server')
+        for bulkhead in set(bulkheads.values()):
+            metrics.EXECUTOR_QUEUE_DEPTH.remove_function(pool=bulkhead.name)
+        metrics.EXECUTOR_QUEUE_DEPTH.remove_function(pool='jobs')
+        agent.jobs.shutdown()
+        logging.info("Finished serve forever...")
+
+
+def _get_workers(manager_instance):
+    return manager_instance.get_config_int('system', 'workers', '1')
+
+
+def _server_options(manager_instance):
+    """
+    The workers bind the same port, the kernel balances the connections among them
+    """
+    if _get_workers(manager_instance) > 1:
+        return [('grpc.so_reuseport', 1)]
+    return []
+
+
+class _ForwardingScheduler(object):
+    def __init__(self, events):
+        """
+        Stands for the StatusScheduler in a worker: the scheduler runs in the supervisor, which gets the pokes
+        """
+        self._events = events
+
+    def poke(self):
+        self._events.put(('poke', None))
+
+
+class _ForwardingDigests(StatusDigests):
+    def __init__(self, events, max_users=4096):
+        """
+        StatusDigests of a worker, forgetting a user forgets it also in the supervisor, which sends the status updates
+        """
+        super().__init__(max_users)
+        self._events = events
+
+    def forget(self, username=None):
+        super().forget(username)
+        self._events.put(('forget', username))
+
+
+def _relay_worker_events(manager_instance, events, timeout):
+    """
+    Apply in the supervisor the pokes and forgotten users of the workers, waiting at most timeout seconds for the
+    first one
+    """
+    try:
+        event = events.get(timeout=timeout)
         while True:
-            time.sleep(_ONE_DAY_IN_SECONDS)
+            kind, username = event
+            if kind == 'forget':
+                manager_instance.get_status_digests().forget(username)
+            elif _use_status_scheduler(manager_instance):
+                manager_instance.get_status_scheduler().poke()
+            event = events.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def _serve_worker(manager_instance, index=0, events=None):
+    """
+    Entry point of a worker process: serve until SIGTERM. ctrl-c is left to the supervisor, which stops the
+    workers with SIGTERM so that they drain the running calls. The metrics of worker index are served on
+    metrics_port + 1 + index, its pokes of the status scheduler and forgotten users are sent to the supervisor
+    through events
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    install_config_reload_handler()
+    stop_event = threading.Event()
+    _install_stop_handler(stop_event)
+    if events is not None:
+        # the worker may exit while the supervisor does not read the events anymore
+        events.cancel_join_thread()
+        manager_instance._status_scheduler = _ForwardingScheduler(events)
+        manager_instance._status_digests = _ForwardingDigests(
+            events, manager_instance.get_config_int('system', 'status_digest_users', '4096'))
+    metrics_port = manager_instance.get_config_int('system', 'metrics_port', '0')
+    if metrics_port > 0:
+        metrics.start_metrics_server(metrics_port + 1 + index,
+                                     manager_instance.get_config_value('system', 'metrics_ip', '127.0.0.1'))
+    if _use_async_server(manager_instance):
+        _receive_forever_async(manager_instance, stop_event)
+    else:
+        _receive_forever(manager_instance, stop_event)
+
+
+def _supervise_workers(manager_instance, stop_event, reload_event=None):
+    """
+    Run workers processes serving the ManagerAgent on the same bind_port and restart them when they die, until
+    stop_event is set. Workers dying right after the start are restarted with backoff
+
+    :param reload_event: when set, the workers are sent SIGHUP to reload their configuration
+    """
+    context = multiprocessing.get_context('spawn')
+    events = context.Queue()
+    workers = [None] * _get_workers(manager_instance)
+    started = [0.0] * len(workers)
+    restart_at = [0.0] * len(workers)
+    backoffs = [Backoff(initial=1, maximum=30) for _ in workers]
+    try:
+        while not stop_event.is_set():
+            for i, worker in enumerate(workers):
+                if worker is not None and worker.is_alive():
+                    continue
+                if worker is not None:
+                    uptime = time.monotonic() - started[i]
+                    if uptime > _WORKER_MIN_UPTIME:
+                        backoffs[i].reset()
+                    restart_at[i] = time.monotonic() + backoffs[i].next_delay()
+                    logging.warning("Worker %s died with exit code %s after %.1f seconds, restarting" % (
+                        worker.name, worker.exitcode, uptime))
+                    workers[i] = None
+                if time.monotonic() < restart_at[i]:
+                    continue
+                workers[i] = context.Process(target=_serve_worker, args=[manager_instance, i, events],
+                                             name='manager-worker-%d' % i)
+                workers[i].start()
+                started[i] = time.monotonic()
+                logging.info("Started worker %s with pid %s" % (workers[i].name, workers[i].pid))
+            if reload_event is not None and reload_event.is_set():
+                reload_event.clear()
+                for worker in workers:
+                    if worker is not None and worker.is_alive():
+                        os.kill(worker.pid, signal.SIGHUP)
+            _relay_worker_events(manager_instance, events, timeout=1)
+    finally:
+        workers = [worker for worker in workers if worker is not None]
+        for worker in workers:
+            worker.terminate()
+        deadline = time.monotonic() + _get_shutdown_grace(manager_instance) + 1
+        for worker in workers:
+            worker.join(timeout=max(0, deadline - time.monotonic()))
+            if worker.is_alive():
+                logging.warning("Worker %s did not stop in time, killing it" % worker.name)
+                worker.kill()
+                worker.join()
+
+
+def _use_async_server(manager_instance):
+    return isinstance(manager_instance, AsyncAbstractManager) or \
+           manager_instance.get_config_value('system', 'server_mode', 'sync').lower() == 'async'
+
+
+def _receive_forever_async(manager_instance, stop_event=None):
+    if stop_event is None:
+        stop_event = threading.Event()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(_serve_async(manager_instance, stop_event))
     except KeyboardInterrupt:
         logging.info("Shutting down gRPC")
-        server.stop(0)
-        return
-    except:
-        traceback.print_exc()
-        logging.warning("Did not receive ctrl-c...")
-        logging.debug("Stopping server")
-        server.stop(0)
-        _receive_forever(manager_instance)
     finally:
+        loop.close()
         logging.info("Finished serve forever...")
 
 
+async def _serve_async(manager_instance, stop_event):
+    # <method>_threads bound the coroutines running at the same time, waiting ones do not hold a thread
+    bulkheads = get_bulkheads(manager_instance, AsyncBulkhead)
+    for bulkhead in set(bulkheads.values()):
+        metrics.EXECUTOR_QUEUE_DEPTH.set_function(lambda b=bulkhead: b.waiting, pool=bulkhead.name)
+    server = grpc.aio.server(interceptors=[AsyncMetricsInterceptor(),
+                                           AsyncAdmissionInterceptor(get_admission_controller(manager_instance)),
+                                           AsyncCancellationInterceptor(),
+                                           AsyncBulkheadInterceptor(bulkheads)],
+                             options=_server_options(manager_instance))
+    # coroutines are bounded only by the bulkheads, plain AbstractManager methods run in the agent server_threads
+    load_reporter = LoadReporter(0 if isinstance(manager_instance, AsyncAbstractManager)
+                                 else manager_instance.get_config_int('system', 'server_threads', 5), bulkheads)
+    agent = _AsyncManagerAgent(manager_instance, load_reporter)
+    metrics.EXECUTOR_QUEUE_DEPTH.set_function(agent.executor._work_queue.qsize, pool='server')
+    metrics.EXECUTOR_QUEUE_DEPTH.set_function(lambda: agent.jobs.pending, pool='jobs')
+    messages_pb2_grpc.add_ManagerAgentServicer_to_server(agent, server)
+    binding = '[::]:%s' % manager_instance.get_config_value('messaging', 'bind_port')
+    logging.info("Start listening (asyncio) on %s" % binding)
+    server.add_insecure_port(binding)
+    await server.start()
+    try:
+        await asyncio.get_event_loop().run_in_executor(None, stop_event.wait)
+    finally:
+        load_reporter.draining = True
+        grace = _get_shutdown_grace(manager_instance)
+        logging.info("Shutting down gRPC, waiting up to %s seconds for the running calls" % grace)
+        await server.stop(grace)
+        metrics.EXECUTOR_QUEUE_DEPTH.remove_function(pool='server')
+        for bulkhead in set(bulkheads.values()):
+            metrics.EXECUTOR_QUEUE_DEPTH.remove_function(pool=bulkhead.name)
+        metrics.EXECUTOR_QUEUE_DEPTH.remove_function(pool='jobs')
+        agent.close()
+
+
+def _wait_for_em(config_file_path, stop_event):
+    """
+    Block until the experiment manager accepts connections or stop_event is set
+    :return: True if the experiment manager is ready
+    """
+    channel = get_em_channel(config_file_path)
+    while not stop_event.is_set():
+        ready_future = grpc.channel_ready_future(channel)
+        try:
+            ready_future.result(timeout=1)
+            return True
+        except grpc.FutureTimeoutError:
+            ready_future.cancel()
+            logging.debug("Waiting for the experiment manager on %s" % get_em_target(config_file_path))
+    return False
+
+
 def _register(config_file_path):
-    time.sleep(1)
-    channel = grpc.insecure_channel(
-        '%s:%s' % (get_config("system", "experiment_manager_ip", config_file_path),
-                   get_config("system", "experiment_manager_port", config_file_path)))
-    stub = messages_pb2_grpc.RegistrationServiceStub(channel)
-    response = stub.register(
+    response = get_registration_stub(config_file_path).register(
         messages_pb2.RegisterMessage(name=get_config("system", "name", config_file_path),
                                      endpoint="%s:%s" % (
                                          get_config("system", "ip", config_file_path),
                                          get_config("messaging", "bind_port", config_file_path)),
-                                     description=get_config("system", "description", config_file_path)))
+                                     description=get_config("system", "description", config_file_path)),
+        timeout=get_em_timeout(config_file_path))
     logging.debug("Manager received registration response: %s" % response.result)
 
 
+def _register_forever(config_file_path, stop_event, on_registered=None):
+    """
+    Register to the experiment manager as soon as the channel is ready, and again every time it gets ready after
+    a disconnection (i.e. the experiment manager restarted). Failed attempts are retried with jittered
+    exponential backoff
+
+    :param on_registered: called after each successful registration
+    """
+    start = time.monotonic()
+    channel = get_em_channel(config_file_path)
+    backoff = get_em_backoff(config_file_path)
+    ready = threading.Event()
+
+    def _on_connectivity_change(connectivity):
+        if connectivity == grpc.ChannelConnectivity.READY:
+            ready.set()
+
+    channel.subscribe(_on_connectivity_change, try_to_connect=True)
+    try:
+        while not stop_event.is_set():
+            if not ready.wait(timeout=0.5):
+                continue
+            ready.clear()
+            try:
+                _register(config_file_path)
+            except grpc.RpcError as e:
+                delay = backoff.next_delay()
+                logging.warning("Registration failed (%s), retrying in %.2f seconds" % (e.code(), delay))
+                if not stop_event.wait(delay):
+                    ready.set()
+                continue
+            backoff.reset()
+            metrics.REGISTRATIONS.inc()
+            if on_registered is not None:
+                on_registered()
+            if start is not None:
+                metrics.TIME_TO_REGISTERED.set(time.monotonic() - start)
+                logging.info("Registered to the experiment manager in %.3f seconds" % (time.monotonic() - start))
+                start = None
+    finally:
+        channel.unsubscribe(_on_connectivity_change)
+
+
+def _resend_status(manager_instance):
+    """
+    A restarted experiment manager knows no resource: send all of them again, not only the changed ones
+    """
+    manager_instance.forget_status()
+    if _use_status_scheduler(manager_instance):
+        manager_instance.get_status_scheduler().poke()
+
+
 def _unregister(config_file_path):
-    channel = grpc.insecure_channel(
-        '%s:%s' % (get_config("system", "experiment_manager_ip", config_file_path),
-                   get_config("system", "experiment_manager_port", config_file_path)))
-    stub = messages_pb2_grpc.RegistrationServiceStub(channel)
-    response = stub.unregister(
+    response = get_registration_stub(config_file_path).unregister(
         messages_pb2.UnregisterMessage(name=get_config("system", "name", config_file_path),
                                        endpoint="%s:%s" % (
                                            get_config("system", "ip", config_file_path),
-                                           get_config("messaging", "bind_port", config_file_path))))
+                                           get_config("messaging", "bind_port", config_file_path))),
+        timeout=get_em_timeout(config_file_path))
     logging.debug("Manager received unregistration response: %s" % response.result)
 
 
-def handle_error(e):
-    traceback.print_exc()
+def _error_message(e):
     if hasattr(e, "message"):
-        return messages_pb2.ResponseMessage(result=messages_pb2.ERROR, error_message=e.message)
+        return e.message
     if hasattr(e, "args"):
-        return messages_pb2.ResponseMessage(result=messages_pb2.ERROR, error_message=str(e.args))
-    return messages_pb2.ResponseMessage(result=messages_pb2.ERROR, error_message="No message available")
+        return str(e.args)
+    return "No message available"
+
+
+def _request_id(request, context):
+    """
+    :return: the request_id of the RequestMessage, or the request-id metadata of the call, '' if missing
+    """
+    if request.request_id or context is None:
+        return request.request_id
+    for key, value in context.invocation_metadata() or ():
+        if key == 'request-id':
+            return value
+    return ''
+
+
+def _call_in_loop(loop, method, *args, **kwargs):
+    """
+    Call method from a job thread: coroutine functions are run on the event loop of the asyncio server
+    """
+    if loop is not None and asyncio.iscoroutinefunction(method):
+        return asyncio.run_coroutine_threadsafe(method(*args, **kwargs), loop).result()
+    return method(*args, **kwargs)
+
+
+async def _drain(stream, consume):
+    async for item in stream:
+        consume(item)
+
+
+def _provide_job(abstract_manager, request, job, loop=None):
+    """
+    Body of a PROVIDE_RESOURCES job: each resource is added to the job as soon as it is deployed
+    """
+    try:
+        stream = abstract_manager.provide_resources_stream(user_info=request.user_info, payload=request.payload)
+        if hasattr(stream, '__aiter__'):
+            asyncio.run_coroutine_threadsafe(_drain(stream, job.add_resource), loop).result()
+        else:
+            for resource in stream:
+                job.add_resource(resource)
+    finally:
+        abstract_manager.invalidate_response_cache(request.user_info)
+        abstract_manager.get_status_scheduler().poke()
+
+
+def _release_job(abstract_manager, request, job, loop=None):
+    """
+    Body of a RELEASE_RESOURCES job
+    """
+    try:
+        _call_in_loop(loop, abstract_manager.release_resources, user_info=request.user_info,
+                      payload=request.payload)
+    finally:
+        abstract_manager.invalidate_response_cache(request.user_info)
+
+
+def _submit_job(jobs, abstract_manager, request, run, loop=None):
+    """
+    Run run(abstract_manager, request, job) in the JobManager and answer at once with the JobStatus
+    """
+    try:
+        job = jobs.submit(request.method, functools.partial(run, abstract_manager, request, loop=loop))
+    except ServerBusyError as e:
+        logging.warning(e.message)
+        return messages_pb2.ResponseMessage(result=messages_pb2.ERROR, error_message=e.message)
+    logging.info("Submitted job %s for %s" % (job.job_id, messages_pb2.Method.Name(request.method)))
+    return messages_pb2.ResponseMessage(result=messages_pb2.Ok, job=job.status())
+
+
+def handle_error(e):
+    traceback.print_exc()
+    metrics.HANDLED_ERRORS.inc()
+    return messages_pb2.ResponseMessage(result=messages_pb2.ERROR, error_message=_error_message(e))
+
+
+def _stream_error_details(e):
+    traceback.print_exc()
+    metrics.HANDLED_ERRORS.inc()
+    return _error_message(e) or "No message available"
+
+
+def handle_stream_error(e, context):
+    """
+    Streaming calls cannot answer with a ResponseMessage, the error is sent as gRPC status instead
+    """
+    context.abort(grpc.StatusCode.INTERNAL, _stream_error_details(e))
 
 
 class _ManagerAgent(messages_pb2_grpc.ManagerAgentServicer):
@@ -86,17 +468,56 @@ class _ManagerAgent(messages_pb2_grpc.ManagerAgentServicer):
             return Empty()
         except Exception as e:
             return handle_error(e)
+        finally:
+            self.abstract_manager.invalidate_response_cache(request)
+            self.abstract_manager.forget_status(request)
 
     def heartbeat(self, request, context):
-        return Empty()
+        return self.load_reporter.report()
 
-    def __init__(self, abstract_manager):
+    def __init__(self, abstract_manager, load_reporter=None):
         """
         create the ManagerAgent in charge of dealing with the dispatch of messages
         :param abstract_manager: the Implementation of AbstractManager
          :type abstract_manager: AbstractManager
+        :param load_reporter: answers the heartbeat
+         :type load_reporter: LoadReporter
         """
         self.abstract_manager = abstract_manager
+        self.load_reporter = load_reporter or LoadReporter()
+        self.response_cache = abstract_manager.get_response_cache()
+        self.single_flight = SingleFlight()
+        self.single_flight_methods = get_single_flight_methods(abstract_manager)
+        self.request_results = get_request_results(abstract_manager)
+        self.request_flight = SingleFlight()
+        self.jobs = get_job_manager(abstract_manager)
+        # each watch_job holds a server thread until its job finishes
+        self.job_watches = threading.BoundedSemaphore(abstract_manager.get_config_int('system', 'job_watchers', 2))
+
+    def _coalesced(self, method, user_info, payload, compute):
+        """
+        Compute the response, sharing the result with the identical calls running at the same time. The computation
+        is cancelled only when all these calls are
+        """
+        if method not in self.single_flight_methods:
+            return compute()
+        return self.single_flight.do(call_key(method, user_info, payload), compute, cancellable=True)
+
+    def _cached(self, method, user_info, payload, compute):
+        """
+        Return the cached response of the call, or compute it and cache it if Ok and the cache of the user was not
+        invalidated (i.e. by a provide_resources) while computing it
+        """
+        if self.response_cache is None:
+            return self._coalesced(method, user_info, payload, compute)
+        key = call_key(method, user_info, payload)
+        response = self.response_cache.get(key)
+        if response is None:
+            generation = self.response_cache.generation(key)
+            response = self._coalesced(method, user_info, payload, compute)
+            if response.result == messages_pb2.Ok:
+                self.response_cache.put_if_valid(key, response, generation)
+        return response
 
     def create_user(self, request, context):
         try:
@@ -105,6 +526,9 @@ class _ManagerAgent(messages_pb2_grpc.ManagerAgentServicer):
             return handle_error(e)
 
     def refresh_resources(self, request, context):
+        return self._cached('refresh_resources', request, None, lambda: self._refresh_resources(request))
+
+    def _refresh_resources(self, request):
         try:
             resources = self.abstract_manager.refresh_resources(user_info=request)
             response = messages_pb2.ListResourceResponse(resources=resources)
@@ -112,47 +536,334 @@ class _ManagerAgent(messages_pb2_grpc.ManagerAgentServicer):
         except Exception as e:
             return handle_error(e)
 
+    def provide_resources_stream(self, request, context):
+        try:
+            for resource in self.abstract_manager.provide_resources_stream(user_info=request.user_info,
+                                                                           payload=request.payload):
+                yield messages_pb2.Resource(content=resource)
+        except Exception as e:
+            handle_stream_error(e, context)
+        finally:
+            self.abstract_manager.invalidate_response_cache(request.user_info)
+            self.abstract_manager.get_status_scheduler().poke()
+
+    def _list_resources(self, request):
+        try:
+            return messages_pb2.ResponseMessage(result=messages_pb2.Ok,
+                                                list_resource=messages_pb2.ListResourceResponse(
+                                                    resources=self.abstract_manager.list_resources(
+                                                        user_info=request.user_info,
+                                                        payload=request.payload)))
+        except Exception as e:
+            return handle_error(e)
+
     def execute(self, request, context):
         if request.method == messages_pb2.LIST_RESOURCES:
-            try:
-                return messages_pb2.ResponseMessage(result=messages_pb2.Ok,
-                                                    list_resource=messages_pb2.ListResourceResponse(
-                                                        resources=self.abstract_manager.list_resources(
-                                                            user_info=request.user_info,
-                                                            payload=request.payload)))
-            except Exception as e:
-                return handle_error(e)
+            return self._cached('list_resources', request.user_info, request.payload,
+                                lambda: self._list_resources(request))
         if request.method == messages_pb2.PROVIDE_RESOURCES:
-            try:
-                return messages_pb2.ResponseMessage(result=messages_pb2.Ok,
-                                                    provide_resource=messages_pb2.ProvideResourceResponse(
-                                                        resources=[messages_pb2.Resource(content=r) for r in
-                                                                   self.abstract_manager.provide_resources(
-                                                                       user_info=request.user_info,
-                                                                       payload=request.payload)]))
-            except Exception as e:
-                return handle_error(e)
+            if request.as_job:
+                return self._idempotent('provide_resources', request, context,
+                                        lambda: _submit_job(self.jobs, self.abstract_manager, request, _provide_job))
+            return self._idempotent('provide_resources', request, context, lambda: self._provide_resources(request))
         if request.method == messages_pb2.RELEASE_RESOURCES:
-            try:
-                self.abstract_manager.release_resources(user_info=request.user_info, payload=request.payload)
-                return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
-            except Exception as e:
-                return handle_error(e)
+            if request.as_job:
+                return self._idempotent('release_resources', request, context,
+                                        lambda: _submit_job(self.jobs, self.abstract_manager, request, _release_job))
+            return self._idempotent('release_resources', request, context, lambda: self._release_resources(request))
 
         if request.method == messages_pb2.VALIDATE_RESOURCES:
-            try:
-                self.abstract_manager.validate_resources(user_info=request.user_info, payload=request.payload)
-                return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
-            except Exception as e:
-                return handle_error(e)
+            return self._coalesced('validate_resources', request.user_info, request.payload,
+                                   lambda: self._validate_resources(request))
+
+    def _idempotent(self, method, request, context, compute):
+        """
+        Return the response of the previous call with the same request id, or wait for it if still running.
+        Calls with a request id are not cancelled when their caller goes away, so that a retry gets the result
+        """
+        request_id = _request_id(request, context)
+        if not request_id or self.request_results is None:
+            return compute()
+        key = (method, request.user_info.name, request_id)
+        response = self.request_results.get(key)
+        if response is not None:
+            logging.info("Returning the response of the %s request %s" % (method, request_id))
+            return response
+
+        def run():
+            # runs within a token of its own, never cancelled
+            response = compute()
+            if response.result == messages_pb2.Ok:
+                self.request_results.put(key, response)
+            return response
+
+        return self.request_flight.do(key, run)
+
+    def _get_job(self, request, context):
+        job = self.jobs.get(request.job_id)
+        if job is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, "Job %s not found" % request.job_id)
+        return job
+
+    def get_job(self, request, context):
+        return self._get_job(request, context).status()
+
+    def watch_job(self, request, context):
+        job = self._get_job(request, context)
+        if not self.job_watches.acquire(blocking=False):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many jobs watched, poll with get_job")
+        try:
+            version = None
+            while context.is_active():
+                version, status = job.next_status(version, timeout=1)
+                if status is not None:
+                    yield status
+                    if status.state in _JOB_FINISHED:
+                        return
+        finally:
+            self.job_watches.release()
+
+    def _provide_resources(self, request):
+        try:
+            return messages_pb2.ResponseMessage(result=messages_pb2.Ok,
+                                                provide_resource=messages_pb2.ProvideResourceResponse(
+                                                    resources=[messages_pb2.Resource(content=r) for r in
+                                                               self.abstract_manager.provide_resources(
+                                                                   user_info=request.user_info,
+                                                                   payload=request.payload)]))
+        except Exception as e:
+            return handle_error(e)
+        finally:
+            self.abstract_manager.invalidate_response_cache(request.user_info)
+            self.abstract_manager.get_status_scheduler().poke()
+
+    def _release_resources(self, request):
+        try:
+            self.abstract_manager.release_resources(user_info=request.user_info, payload=request.payload)
+            return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
+        except Exception as e:
+            return handle_error(e)
+        finally:
+            self.abstract_manager.invalidate_response_cache(request.user_info)
+
+    def _validate_resources(self, request):
+        try:
+            self.abstract_manager.validate_resources(user_info=request.user_info, payload=request.payload)
+            return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
+        except Exception as e:
+            return handle_error(e)
+
+
+class _AsyncManagerAgent(messages_pb2_grpc.ManagerAgentServicer):
+    def __init__(self, abstract_manager, load_reporter=None):
+        """
+        create the ManagerAgent used by the asyncio server. Methods of abstract_manager that are not coroutines
+        (i.e. a plain AbstractManager) are run in a thread pool sized by server_threads
+        :param abstract_manager: the Implementation of AsyncAbstractManager or AbstractManager
+         :type abstract_manager: AbstractManager
+        :param load_reporter: answers the heartbeat
+         :type load_reporter: LoadReporter
+        """
+        self.abstract_manager = abstract_manager
+        self.load_reporter = load_reporter or LoadReporter()
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=abstract_manager.get_config_int('system', 'server_threads', 5))
+        self.response_cache = abstract_manager.get_response_cache()
+        self.single_flight = AsyncSingleFlight()
+        self.single_flight_methods = get_single_flight_methods(abstract_manager)
+        self.request_results = get_request_results(abstract_manager)
+        self.request_flight = AsyncSingleFlight()
+        self.jobs = get_job_manager(abstract_manager)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.jobs.shutdown()
+
+    async def _call(self, method, *args, **kwargs):
+        if asyncio.iscoroutinefunction(method):
+            return await method(*args, **kwargs)
+        # copy the context so that the thread sees the current_cancellation_token of the call
+        return await asyncio.get_event_loop().run_in_executor(self.executor,
+                                                              functools.partial(contextvars.copy_context().run,
+                                                                                method, *args, **kwargs))
+
+    async def _coalesced(self, method, user_info, payload, compute):
+        if method not in self.single_flight_methods:
+            return await compute()
+        return await self.single_flight.do(call_key(method, user_info, payload), compute, cancellable=True)
+
+    async def _cached(self, method, user_info, payload, compute):
+        if self.response_cache is None:
+            return await self._coalesced(method, user_info, payload, compute)
+        key = call_key(method, user_info, payload)
+        response = self.response_cache.get(key)
+        if response is None:
+            generation = self.response_cache.generation(key)
+            response = await self._coalesced(method, user_info, payload, compute)
+            if response.result == messages_pb2.Ok:
+                self.response_cache.put_if_valid(key, response, generation)
+        return response
+
+    async def delete_user(self, request, context):
+        try:
+            await self._call(self.abstract_manager.delete_user, request)
+            return Empty()
+        except Exception as e:
+            return handle_error(e)
+        finally:
+            self.abstract_manager.invalidate_response_cache(request)
+            self.abstract_manager.forget_status(request)
+
+    async def heartbeat(self, request, context):
+        return self.load_reporter.report()
+
+    async def create_user(self, request, context):
+        try:
+            return await self._call(self.abstract_manager.create_user, request)
+        except Exception as e:
+            return handle_error(e)
+
+    async def refresh_resources(self, request, context):
+        return await self._cached('refresh_resources', request, None, lambda: self._refresh_resources(request))
+
+    async def _refresh_resources(self, request):
+        try:
+            resources = await self._call(self.abstract_manager.refresh_resources, user_info=request)
+            response = messages_pb2.ListResourceResponse(resources=resources)
+            return messages_pb2.ResponseMessage(result=messages_pb2.Ok, list_resource=response)
+        except Exception as e:
+            return handle_error(e)
+
+    async def provide_resources_stream(self, request, context):
+        try:
+            stream = self.abstract_manager.provide_resources_stream(user_info=request.user_info,
+                                                                    payload=request.payload)
+            if hasattr(stream, '__aiter__'):
+                async for resource in stream:
+                    yield messages_pb2.Resource(content=resource)
+            else:
+                # a plain generator, each step may block so it is run in the executor
+                loop = asyncio.get_event_loop()
+                step = functools.partial(contextvars.copy_context().run, next, stream, _STREAM_END)
+                while True:
+                    resource = await loop.run_in_executor(self.executor, step)
+                    if resource is _STREAM_END:
+                        break
+                    yield messages_pb2.Resource(content=resource)
+        except Exception as e:
+            await context.abort(grpc.StatusCode.INTERNAL, _stream_error_details(e))
+        finally:
+            self.abstract_manager.invalidate_response_cache(request.user_info)
+            self.abstract_manager.get_status_scheduler().poke()
+
+    async def _list_resources(self, request):
+        try:
+            resources = await self._call(self.abstract_manager.list_resources,
+                                         user_info=request.user_info,
+                                         payload=request.payload)
+            return messages_pb2.ResponseMessage(result=messages_pb2.Ok,
+                                                list_resource=messages_pb2.ListResourceResponse(
+                                                    resources=resources))
+        except Exception as e:
+            return handle_error(e)
+
+    async def execute(self, request, context):
+        if request.method == messages_pb2.LIST_RESOURCES:
+            return await self._cached('list_resources', request.user_info, request.payload,
+                                      lambda: self._list_resources(request))
+        if request.method == messages_pb2.PROVIDE_RESOURCES:
+            if request.as_job:
+                return await self._idempotent('provide_resources', request, context,
+                                              lambda: self._submit_job(request, _provide_job))
+            return await self._idempotent('provide_resources', request, context,
+                                          lambda: self._provide_resources(request))
+        if request.method == messages_pb2.RELEASE_RESOURCES:
+            if request.as_job:
+                return await self._idempotent('release_resources', request, context,
+                                              lambda: self._submit_job(request, _release_job))
+            return await self._idempotent('release_resources', request, context,
+                                          lambda: self._release_resources(request))
+
+        if request.method == messages_pb2.VALIDATE_RESOURCES:
+            return await self._coalesced('validate_resources', request.user_info, request.payload,
+                                         lambda: self._validate_resources(request))
+
+    async def _idempotent(self, method, request, context, compute):
+        request_id = _request_id(request, context)
+        if not request_id or self.request_results is None:
+            return await compute()
+        key = (method, request.user_info.name, request_id)
+        response = self.request_results.get(key)
+        if response is not None:
+            logging.info("Returning the response of the %s request %s" % (method, request_id))
+            return response
+
+        async def run():
+            response = await compute()
+            if response.result == messages_pb2.Ok:
+                self.request_results.put(key, response)
+            return response
+
+        return await self.request_flight.do(key, run)
+
+    async def _submit_job(self, request, run):
+        return _submit_job(self.jobs, self.abstract_manager, request, run, loop=asyncio.get_event_loop())
 
+    async def _get_job(self, request, context):
+        job = self.jobs.get(request.job_id)
+        if job is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Job %s not found" % request.job_id)
+        return job
 
-def _is_ex_man__running(ex_man_bind_ip, ex_man_bind_port):
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(2)
-    result = sock.connect_ex((ex_man_bind_ip, int(ex_man_bind_port)))
-    sock.close()
-    return result == 0
+    async def get_job(self, request, context):
+        return (await self._get_job(request, context)).status()
+
+    async def watch_job(self, request, context):
+        job = await self._get_job(request, context)
+        version = None
+        while True:
+            version, status = job.next_status(version, timeout=0)
+            if status is None:
+                await asyncio.sleep(_WATCH_POLL_INTERVAL)
+                continue
+            yield status
+            if status.state in _JOB_FINISHED:
+                return
+
+    async def _provide_resources(self, request):
+        try:
+            resources = await self._call(self.abstract_manager.provide_resources,
+                                         user_info=request.user_info,
+                                         payload=request.payload)
+            return messages_pb2.ResponseMessage(result=messages_pb2.Ok,
+                                                provide_resource=messages_pb2.ProvideResourceResponse(
+                                                    resources=[messages_pb2.Resource(content=r) for r in
+                                                               resources]))
+        except Exception as e:
+            return handle_error(e)
+        finally:
+            self.abstract_manager.invalidate_response_cache(request.user_info)
+            self.abstract_manager.get_status_scheduler().poke()
+
+    async def _release_resources(self, request):
+        try:
+            await self._call(self.abstract_manager.release_resources,
+                             user_info=request.user_info,
+                             payload=request.payload)
+            return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
+        except Exception as e:
+            return handle_error(e)
+        finally:
+            self.abstract_manager.invalidate_response_cache(request.user_info)
+
+    async def _validate_resources(self, request):
+        try:
+            await self._call(self.abstract_manager.validate_resources,
+                             user_info=request.user_info,
+                             payload=request.payload)
+            return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
+        except Exception as e:
+            return handle_error(e)
 
 
 def __print_banner(banner_file_path):
@@ -164,51 +875,132 @@ def __print_banner(banner_file_path):
         print(banner)
 
 
-def start_manager(manager_instance):
+def _install_stop_handler(stop_event):
+    """
+    Set stop_event on SIGTERM. Signal handlers can only be installed from the main thread
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    def _handler(signum, frame):
+        logging.info("Received signal %s..." % signum)
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, _handler)
+
+
+def _install_reload_forwarder(reload_event):
     """
-    Start the ExperimentManager
+    Set reload_event on SIGHUP, after the configuration of this process is reloaded
+    """
+    if not hasattr(signal, 'SIGHUP') or threading.current_thread() is not threading.main_thread():
+        return
+    previous_handler = signal.getsignal(signal.SIGHUP)
+
+    def _handler(signum, frame):
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+        reload_event.set()
+
+    signal.signal(signal.SIGHUP, _handler)
+
+
+def start_manager(manager_instance, stop_event=None):
+    """
+    Start the ExperimentManager and block until it is stopped by ctrl-c, SIGTERM or stop_event
     :param manager_instance: the instance of the Manager
+    :param stop_event: optional threading.Event, set it to shut the manager down
     """
+    install_config_reload_handler()
+    if stop_event is None:
+        stop_event = threading.Event()
+    _install_stop_handler(stop_event)
     if manager_instance.get_config_value('system', 'banner-file', '') != '':
         __print_banner(manager_instance.get_config_value('system', 'banner-file', ''))
     logging.info("Starting %s Manager." % manager_instance.get_config_value('system', 'name'))
+    if manager_instance.get_config_int('system', 'metrics_port', '0') > 0:
+        metrics.start_metrics_server(manager_instance.get_config_int('system', 'metrics_port'),
+                                     manager_instance.get_config_value('system', 'metrics_ip', '127.0.0.1'))
+
+    listen_thread = register_thread = None
+    try:
+        if manager_instance.get_config_bool("system", "wait_for_em", True):
+            _wait_for_em(manager_instance.config_file_path, stop_event)
+        if stop_event.is_set():
+            return
 
-    if manager_instance.get_config_value("system", "wait_for_em", "true").lower() == "true":
-        while not _is_ex_man__running(manager_instance.get_config_value("system", "experiment_manager_ip", "localhost"),
-                                      manager_instance.get_config_value("system", "experiment_manager_port", "5051")):
-            time.sleep(2)
+        args = [manager_instance, stop_event]
+        if _get_workers(manager_instance) > 1:
+            serve = _supervise_workers
+            reload_event = threading.Event()
+            _install_reload_forwarder(reload_event)
+            args.append(reload_event)
+        elif _use_async_server(manager_instance):
+            serve = _receive_forever_async
+        else:
+            serve = _receive_forever
+        listen_thread = ExceptionHandlerThread(target=serve, args=args, event=stop_event)
+        register_thread = ExceptionHandlerThread(target=_register_forever,
+                                                 args=[manager_instance.config_file_path, stop_event,
+                                                       functools.partial(_resend_status, manager_instance)],
+                                                 event=stop_event)
 
-    event = threading.Event()
-    listen_thread = ExceptionHandlerThread(target=_receive_forever, args=[manager_instance], event=event)
-    register_thread = ExceptionHandlerThread(target=_register, args=[manager_instance.config_file_path], event=event)
+        listen_thread.start()
+        register_thread.start()
+        if _use_status_scheduler(manager_instance):
+            ExceptionHandlerThread(target=manager_instance.get_status_scheduler().run, args=[stop_event],
+                                   name='status-scheduler', event=stop_event, daemon=True).start()
 
-    listen_thread.start()
-    register_thread.start()
+        stop_event.wait()
+    except KeyboardInterrupt:
+        logging.info("Received ctrl-c...")
 
-    while True:
-        try:
-            time.sleep(30)
-            continue
-        except InterruptedError:
-            traceback.print_exc()
-            _going_down(event, listen_thread, register_thread)
-            break
-        except KeyboardInterrupt:
-            logging.info("Received ctrl-c...")
-            _unregister(manager_instance.config_file_path)
-            _going_down(event, listen_thread, register_thread)
-            break
+    if listen_thread is None:
+        stop_event.set()
+        return
+    _going_down(manager_instance, stop_event, listen_thread, register_thread)
 
-    return
 
+def _use_status_scheduler(manager_instance):
+    """
+    The status scheduler runs when enabled by status_scheduler, the manager implements _update_status and
+    status_interval is not 0. It is opt-in: managers running their own status loop would send every status twice
+    """
+    return manager_instance.get_config_bool('system', 'status_scheduler', False) \
+        and type(manager_instance)._update_status is not AbstractManager._update_status \
+        and manager_instance.get_config_float('system', 'status_interval', '30') > 0
 
-def _going_down(event, listen_thread, register_thread):
+
+def _unregister_quietly(config_file_path):
+    try:
+        _unregister(config_file_path)
+    except Exception:
+        logging.warning("Not able to unregister from the experiment manager")
+        traceback.print_exc()
+
+
+def _going_down(manager_instance, event, listen_thread, register_thread):
+    """
+    Unregister from the experiment manager while the server drains the running calls, in at most
+    shutdown_grace seconds plus the em_call_timeout, then send the queued status messages and close the channels
+    to the experiment manager
+    """
     logging.info("going down...")
     event.set()
-    if listen_thread.is_alive():
-        listen_thread.join(timeout=5)
-    if register_thread.is_alive():
-        register_thread.join(timeout=3)
+    if hasattr(manager_instance, '_status_scheduler'):
+        manager_instance.get_status_scheduler().stop()
+    unregister_thread = Thread(target=_unregister_quietly, args=[manager_instance.config_file_path],
+                               name='unregister', daemon=True)
+    unregister_thread.start()
+    grace = _get_shutdown_grace(manager_instance)
+    deadline = time.monotonic() + grace + get_em_timeout(manager_instance.config_file_path)
+    for thread in (unregister_thread, listen_thread, register_thread):
+        thread.join(timeout=max(0, deadline - time.monotonic()))
+        if thread.is_alive():
+            logging.warning("Thread %s did not stop in time" % thread.name)
+    if hasattr(manager_instance, '_status_publisher'):
+        manager_instance.get_status_publisher().stop(timeout=max(0, deadline - time.monotonic()))
+    close_channels()
 
 
 class ExceptionHandlerThread(Thread):
@@ -224,16 +1016,15 @@ class ExceptionHandlerThread(Thread):
         self._args = args
 
     def run(self):
-        while True:
-            if not self.event.is_set():
-                try:
-                    self._target(*self._args)
-                    return
-                except KeyboardInterrupt:
-                    logging.info("received ctrl-c")
-                    return
-                except:
-                    logging.error("Received exception in thread")
-                    traceback.print_exc()
-                    logging.debug("Trying to restart...")
-                    time.sleep(1)
+        while not self.event.is_set():
+            try:
+                self._target(*self._args)
+                return
+            except KeyboardInterrupt:
+                logging.info("received ctrl-c")
+                return
+            except:
+                logging.error("Received exception in thread")
+                traceback.print_exc()
+                logging.debug("Trying to restart...")
+                self.event.wait(1)
@@ -1,20 +1,89 @@
-import json
 from abc import ABCMeta, abstractmethod
 
-import grpc
-
-from sdk.softfire.grpc import messages_pb2_grpc, messages_pb2
+from sdk.softfire.cache import get_response_cache
+from sdk.softfire.cancellation import current_cancellation_token
+from sdk.softfire.grpc import messages_pb2
 from sdk.softfire.grpc.messages_pb2 import UserInfo
-from sdk.softfire.utils import get_config
+from sdk.softfire.publisher import StatusDigests, StatusPublisher
+from sdk.softfire.scheduler import StatusScheduler
+from sdk.softfire.utils import get_config, get_config_snapshot, to_bool
+
+# created at the first use, see __getstate__
+_RUNTIME_ATTRIBUTES = ('_response_cache', '_status_publisher', '_status_digests', '_status_scheduler', '_last_status')
 
 
 class AbstractManager(metaclass=ABCMeta):
     def __init__(self, config_file_path):
         self.config_file_path = config_file_path
 
+    def __getstate__(self):
+        """
+        The manager is pickled to start the worker processes (workers > 1): the caches, status publisher and
+        scheduler of the supervisor are not copied, the workers create their own
+        """
+        state = self.__dict__.copy()
+        for attribute in _RUNTIME_ATTRIBUTES:
+            state.pop(attribute, None)
+        return state
+
+    def get_cancellation_token(self):
+        """
+        Get the CancellationToken of the call being served: long operations should call check() between their steps,
+        or poll cancelled, and stop when the experiment manager cancelled the call or its deadline expired
+
+        :rtype: CancellationToken
+        """
+        return current_cancellation_token()
+
     def get_config_value(self, section, key, default=None):
         return get_config(section=section, key=key, default=default, config_file_path=self.config_file_path)
 
+    def get_config_snapshot(self):
+        """
+        Get the current parsed configuration of this manager
+
+        :return: the ConfigSnapshot
+         :rtype: ConfigSnapshot
+        """
+        config = get_config_snapshot(self.config_file_path)
+        if not config:
+            raise FileNotFoundError(self.config_file_path)
+        return config
+
+    def get_response_cache(self):
+        """
+        Get the cache of the list_resources and refresh_resources responses, configured by response_cache_ttl.
+        Entries of a user are dropped when that user provides or releases resources, call invalidate_response_cache
+        when the catalog changes for other reasons
+
+        :return: the ResponseCache or None if disabled
+         :rtype: ResponseCache
+        """
+        if not hasattr(self, '_response_cache'):
+            self._response_cache = get_response_cache(self)
+        return self._response_cache
+
+    def invalidate_response_cache(self, user_info: UserInfo = None):
+        """
+        Drop the cached responses of user_info, all of them if None
+        """
+        cache = self.get_response_cache()
+        if cache is None:
+            return
+        if user_info is None:
+            cache.invalidate()
+        else:
+            cache.invalidate_user(user_info)
+
+    def get_config_int(self, section, key, default=None):
+        return int(self.get_config_value(section, key, default))
+
+    def get_config_float(self, section, key, default=None):
+        return float(self.get_config_value(section, key, default))
+
+    def get_config_bool(self, section, key, default=None):
+        return to_bool(self.get_config_value(section, key, default))
+
     @abstractmethod
     def list_resources(self, user_info: UserInfo = None, payload: str = None) -> list:
         """
@@ -51,6 +120,18 @@ class AbstractManager(metaclass=ABCMeta):
         """
         pass
 
+    def provide_resources_stream(self, user_info: UserInfo, payload: str = None):
+        """
+        Deploy the specific resources yielding each of them as soon as it is ready.
+        Override it to stream the resources, by default the result of provide_resources is yielded
+
+        :param user_info:
+        :param payload: string representing the request
+         :type payload: str
+        :return: a generator of JSON string representing the deployed resources
+        """
+        yield from self.provide_resources(user_info=user_info, payload=payload)
+
     @abstractmethod
     def release_resources(self, user_info: UserInfo, payload: str = None) -> None:
         """
@@ -102,22 +183,163 @@ class AbstractManager(metaclass=ABCMeta):
         """
         return dict()
 
+    def get_status_publisher(self):
+        """
+        Get the StatusPublisher sending the status messages of send_update in background, its queue holds at most
+        status_queue_size users
+
+        :rtype: StatusPublisher
+        """
+        if not hasattr(self, '_status_publisher'):
+            self._status_publisher = StatusPublisher(self.config_file_path,
+                                                     self.get_config_int('system', 'status_queue_size', '1024'),
+                                                     self.get_status_digests())
+        return self._status_publisher
+
+    def get_status_digests(self):
+        """
+        Get the digests of the resources already sent by send_update, for at most status_digest_users users
+
+        :rtype: StatusDigests
+        """
+        if not hasattr(self, '_status_digests'):
+            self._status_digests = StatusDigests(self.get_config_int('system', 'status_digest_users', '4096'))
+        return self._status_digests
+
+    def forget_status(self, user_info: UserInfo = None):
+        """
+        Send again all the resources of user_info at the next send_update, of all the users if None
+        """
+        self.get_status_digests().forget(user_info.name if user_info is not None else None)
+
+    def get_status_scheduler(self):
+        """
+        Get the StatusScheduler calling send_update every status_interval seconds, adapted between
+        status_min_interval and status_max_interval
+
+        :rtype: StatusScheduler
+        """
+        if not hasattr(self, '_status_scheduler'):
+            self._status_scheduler = StatusScheduler(
+                self,
+                interval=self.get_config_float('system', 'status_interval', '30'),
+                min_interval=self.get_config_float('system', 'status_min_interval', '5'),
+                max_interval=self.get_config_float('system', 'status_max_interval', '300'),
+                jitter=self.get_config_float('system', 'status_jitter', '0.1'))
+        return self._status_scheduler
+
     def send_update(self):
+        """
+        Queue the status returned by _update_status, the StatusPublisher sends to the experiment manager only the
+        resources that changed since the last status sent, skipping the users without changes. Statuses of a user
+        still waiting are replaced by the new one
+
+        :return: True if the status is different from the one of the previous call
+        """
         resources_per_experimenter = self._update_status()
+        changed = resources_per_experimenter != getattr(self, '_last_status', None)
+        self._last_status = {username: list(resources) for username, resources in resources_per_experimenter.items()}
         if len(resources_per_experimenter):
-            target = '%s:%s' % (self.get_config_value("system", "experiment_manager_ip", "localhost"),
-                                self.get_config_value("system", "experiment_manager_port", "5051"))
-            channel = grpc.insecure_channel(
-                target)
-            stub = messages_pb2_grpc.RegistrationServiceStub(channel=channel)
+            publisher = self.get_status_publisher()
             manager_name = self.get_config_value('system', 'name')
             for username, resources in resources_per_experimenter.items():
-                rpc_res = []
-                for res in resources:
-                    rpc_res.append(messages_pb2.Resource(content=json.dumps(json.loads(res))))
-                status_message = messages_pb2.StatusMessage(
-                    resources=rpc_res,
+                publisher.publish(messages_pb2.StatusMessage(
+                    resources=[messages_pb2.Resource(content=res) for res in resources],
                     username=username,
                     manager_name=manager_name
-                )
-                stub.update_status(status_message)
+                ))
+        return changed
+
+
+class AsyncAbstractManager(AbstractManager):
+    """
+    AbstractManager whose methods are coroutines. It is served by the asyncio (grpc.aio) server, so that long
+    running calls (i.e. provide_resources) wait on the event loop instead of holding a server thread.
+    Blocking libraries must be called through loop.run_in_executor.
+    """
+
+    @abstractmethod
+    async def list_resources(self, user_info: UserInfo = None, payload: str = None) -> list:
+        """
+        List all available resources
+
+        :param user_info:
+        :param payload:
+        :return: a list of messages_pb2.ResourceMetadata
+        """
+        pass
+
+    @abstractmethod
+    async def validate_resources(self, user_info: UserInfo = None, payload: str = None) -> None:
+        """
+        Validate the resources
+
+        :param user_info:
+        :param payload:
+        :raise any exception for error
+        """
+        pass
+
+    @abstractmethod
+    async def provide_resources(self, user_info: UserInfo, payload: str = None) -> list:
+        """
+        Deploy the specific resources
+        Must return a list of JSON string representing the deployed resources
+
+        :param user_info:
+        :param payload: string representing the request
+         :type payload: str
+        :return: a list of JSON string representing the deployed resources
+         :rtype: list
+        """
+        pass
+
+    async def provide_resources_stream(self, user_info: UserInfo, payload: str = None):
+        """
+        Deploy the specific resources yielding each of them as soon as it is ready.
+        Override it to stream the resources, by default the result of provide_resources is yielded
+
+        :param user_info:
+        :param payload: string representing the request
+         :type payload: str
+        :return: an async generator of JSON string representing the deployed resources
+        """
+        for resource in await self.provide_resources(user_info=user_info, payload=payload):
+            yield resource
+
+    @abstractmethod
+    async def release_resources(self, user_info: UserInfo, payload: str = None) -> None:
+        """
+        Release resources of that user
+        :param user_info:
+        :param payload:
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    async def create_user(self, user_info: UserInfo) -> UserInfo:
+        """
+        Create user
+        :param user_info:
+        :return: UserInfo updated
+         :rtype UserInfo
+        """
+        pass
+
+    @abstractmethod
+    async def refresh_resources(self, user_info: UserInfo) -> list:
+        """
+        refresh the list of resources. Same as list resources
+        :param user_info: the User requesting
+        :return: list of ResourceMetadata
+        """
+        pass
+
+    async def delete_user(self, user_info: UserInfo):
+        """
+        Remove the state from the manager and from the southbound components related to the user_info
+        :param user_info: the user to be deleted
+         :type: UserInfo
+        """
+        pass
@@ -0,0 +1,296 @@
+import logging
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+logger = logging.getLogger(__name__)
+
+# seconds, provisioning calls can last several minutes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                             for k, v in pairs)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric(object):
+    metric_type = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.label_names)
+
+    def values(self):
+        """
+        :return: dict of label values tuple -> value
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = ['# HELP %s %s' % (self.name, self.documentation), '# TYPE %s %s' % (self.name, self.metric_type)]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return ['%s%s %s' % (self.name, _format_labels(self.label_names, k), _format_value(v)) for k, v in values]
+
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    metric_type = 'gauge'
+
+    def __init__(self, name, documentation, label_names=()):
+        super().__init__(name, documentation, label_names)
+        self._functions = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function, **labels):
+        """
+        Read the value calling function at every scrape
+        """
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    def remove_function(self, **labels):
+        with self._lock:
+            self._functions.pop(self._key(labels), None)
+
+    def get(self, **labels):
+        key = self._key(labels)
+        function = self._functions.get(key)
+        if function is not None:
+            return function()
+        return self._values.get(key, 0)
+
+    def values(self):
+        values = super().values()
+        with self._lock:
+            functions = list(self._functions.items())
+        for key, function in functions:
+            values[key] = function()
+        return values
+
+    def _samples(self):
+        samples = super()._samples()
+        with self._lock:
+            functions = list(self._functions.items())
+        for key, function in functions:
+            try:
+                value = function()
+            except Exception:
+                logger.exception("Error reading gauge %s" % self.name)
+                continue
+            samples.append('%s%s %s' % (self.name, _format_labels(self.label_names, key), _format_value(value)))
+        return samples
+
+
+class _HistogramValue(object):
+    def __init__(self, buckets):
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            histogram_value = self._values.get(key)
+            if histogram_value is None:
+                histogram_value = self._values[key] = _HistogramValue(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram_value.bucket_counts[i] += 1
+                    break
+            histogram_value.count += 1
+            histogram_value.sum += value
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            values = [(k, list(v.bucket_counts), v.count, v.sum) for k, v in self._values.items()]
+        for key, bucket_counts, count, total in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                samples.append('%s_bucket%s %d' % (self.name,
+                                                   _format_labels(self.label_names, key, ('le', _format_value(bound))),
+                                                   cumulative))
+            samples.append('%s_sum%s %s' % (self.name, _format_labels(self.label_names, key), _format_value(total)))
+            samples.append('%s_count%s %d' % (self.name, _format_labels(self.label_names, key), count))
+        return samples
+
+
+class RecentLatency(object):
+    def __init__(self, size=256):
+        """
+        Keep the durations of the last size calls of each method, to answer the heartbeat with recent percentiles
+        that the cumulative histogram cannot give
+        """
+        self.size = size
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, method):
+        with self._lock:
+            samples = self._samples.get(method)
+            if samples is None:
+                samples = self._samples[method] = deque(maxlen=self.size)
+            samples.append(value)
+
+    def methods(self):
+        with self._lock:
+            return list(self._samples)
+
+    def quantile(self, q, method):
+        """
+        :return: the q quantile (0 <= q <= 1) of the recent durations of method, 0 without calls
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(method, ()))
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class MetricsRegistry(object):
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name, documentation, label_names=()):
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets=buckets)
+
+    def render(self):
+        """
+        :return: all the metrics in the Prometheus text format
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_DURATION = REGISTRY.histogram('softfire_manager_request_duration_seconds',
+                                      'Duration of the ManagerAgent calls', ('rpc', 'method'))
+REQUESTS_IN_FLIGHT = REGISTRY.gauge('softfire_manager_requests_in_flight',
+                                    'ManagerAgent calls being served', ('rpc', 'method'))
+REQUEST_ERRORS = REGISTRY.counter('softfire_manager_request_errors_total',
+                                  'ManagerAgent calls failed or answered with result ERROR', ('rpc', 'method'))
+HANDLED_ERRORS = REGISTRY.counter('softfire_manager_handled_errors_total',
+                                  'Exceptions of the manager turned into an ERROR response or status by handle_error')
+EXECUTOR_QUEUE_DEPTH = REGISTRY.gauge('softfire_manager_executor_queue_depth',
+                                      'Calls waiting for a thread of the server pool, or for a slot of a bulkhead',
+                                      ('pool',))
+REJECTED_CALLS = REGISTRY.counter('softfire_manager_rejected_calls_total',
+                                  'ManagerAgent calls rejected by the admission control or a bulkhead', ('method',))
+RECENT_LATENCY = RecentLatency()
+
+TIME_TO_REGISTERED = REGISTRY.gauge('softfire_manager_time_to_registered_seconds',
+                                    'Seconds from the start of the registration to its success')
+REGISTRATIONS = REGISTRY.counter('softfire_manager_registrations_total',
+                                 'Successful registrations to the experiment manager')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s" % (self.address_string(), format % args))
+
+
+class _MetricsHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address, registry):
+        super().__init__(server_address, _MetricsHandler)
+        self.registry = registry
+
+
+def start_metrics_server(port, ip='127.0.0.1', registry=REGISTRY):
+    """
+    Serve the metrics in the Prometheus text format on http://ip:port/metrics from a daemon thread
+
+    :return: the HTTPServer, call shutdown() to stop it
+    """
+    server = _MetricsHTTPServer((ip, int(port)), registry)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    logger.info("Serving metrics on http://%s:%s/metrics" % (ip, port))
+    return server
@@ -1,9 +1,15 @@
+import contextlib
+import hashlib
+import json
 import logging
 import os
+import threading
+import time
 import traceback
 
 import keystoneclient
 import neutronclient
+import requests
 from glanceclient import Client as Glance
 from keystoneauth1 import session
 from keystoneauth1.exceptions.http import Conflict
@@ -12,17 +18,84 @@ from neutronclient.common.exceptions import IpAddressGenerationFailureClient
 from neutronclient.v2_0.client import Client as Neutron
 from novaclient.client import Client as Nova
 
-from sdk.softfire.utils import OpenstackClientError, get_testbed_name_from_id, get_openstack_credentials
+from sdk.softfire.cache import TTLCache
+from sdk.softfire.cancellation import CancellationToken, current_cancellation_token
+from sdk.softfire.fanout import fan_out
+from sdk.softfire.teardown import TeardownPlan, TeardownStep
+from sdk.softfire.utils import CancelledError, OpenstackClientError, get_testbed_name_from_id, \
+    get_openstack_credentials
 
 logger = logging.getLogger(__name__)
 
 NETWORKS = ["mgmt", "net_a", "net_b", "net_c", "net_d", "private", "softfire-internal"]
 sec_group_name = 'ob_sec_group'
+# objects per request of the iter_* generators
+PAGE_SIZE = 200
+
+# state of an OSClient changed by its methods, i.e. set_neutron for the project of the call
+_PER_CALL_ATTRIBUTES = ('tenant_name', 'project_id', 'os_tenant_id', 'nova', 'neutron', 'glance', 'keypair',
+                        'sec_group')
+
+# keystone auth shared by all the OSClients of the process, keyed by auth url, credentials and scope
+_SHARED_AUTHS = TTLCache(max_size=256, ttl=3600)
+# so that the OSClients created at the same time share one auth
+_SHARED_AUTHS_LOCK = threading.Lock()
+
+
+class _SharedAuth(object):
+    def __init__(self, auth):
+        """
+        Keystone auth plugin of one user and project with the caches that make it worth sharing: the plugin keeps
+        the scoped token until shortly before it expires, discovery_cache keeps the endpoint version discovery and
+        requests_session keeps the connections open
+
+        :param auth: the v2.Password or v3.Password plugin
+        """
+        self.auth = auth
+        self.discovery_cache = {}
+        self.requests_session = requests.Session()
+
+
+def _get_shared_auth(key, create_auth):
+    """
+    :param key: identifies the credentials and the scope of the auth
+    :param create_auth: creates the auth plugin if missing
+    :rtype: _SharedAuth
+    """
+    with _SHARED_AUTHS_LOCK:
+        shared = _SHARED_AUTHS.get(key)
+        if shared is None:
+            logger.debug("Creating keystone auth for %s on %s" % (key[2], key[1]))
+            shared = _SharedAuth(create_auth())
+            _SHARED_AUTHS.put(key, shared)
+        return shared
+
+
+def forget_keystone_sessions(auth_url=None):
+    """
+    Drop the shared keystone auths of auth_url, all of them if None, so that the next sessions authenticate again
+    """
+    _SHARED_AUTHS.invalidate(None if auth_url is None else lambda key: key[1] == auth_url)
+
+
+def _neutron_params(fields=None, **filters):
+    """
+    Query parameters of a neutron list: the filters, and the only attributes to return if fields is given
+    """
+    if fields:
+        filters['fields'] = list(fields)
+    return filters
 
 
 class OSClient(object):
-    def __init__(self, testbed_name, testbed, tenant_name=None, project_id=None):
+    def __init__(self, testbed_name, testbed, tenant_name=None, project_id=None, cancellation=None):
+        """
+        :param cancellation: stops the creation of resources early, and bounds the duration of each OpenStack
+         request, when cancelled; the CancellationToken of the call being served by default
+         :type cancellation: CancellationToken
+        """
         self.testbed_name = testbed_name
+        self.cancellation = cancellation or current_cancellation_token()
         self.tenant_name = None
         self.project_id = None
         self.testbed = testbed
@@ -49,6 +122,8 @@ class OSClient(object):
         self.keypair = None
         self.sec_group = None
         self.os_tenant_id = None
+        # the sessions of the clients, whose timeout is updated by bind
+        self._sessions = []
 
         # logger.debug("Log level is: %s and DEBUG is %s" % (logger.getEffectiveLevel(), logging.DEBUG))
         # if logger.getEffectiveLevel() == logging.DEBUG:
@@ -79,41 +154,73 @@ class OSClient(object):
             self.set_nova(self.os_tenant_id)
             self.set_neutron(self.os_tenant_id)
             self.set_glance(self.os_tenant_id)
+        # restored by bind: the clients created afterwards for some project are not reused by the next call
+        self._initial_state = {name: getattr(self, name) for name in _PER_CALL_ATTRIBUTES}
+        self._initial_sessions = len(self._sessions)
 
     def _create_keystone_client(self, project_id=None):
         if self.api_version == 3:
             return keystoneclient.v3.client.Client(session=self._get_session(project_id))
         elif self.api_version == 2:
-            if not project_id:
-                project_id = self.tenant_name or self.admin_tenant_name
-            return keystoneclient.v2_0.client.Client(username=self.username,
-                                                     password=self.password,
-                                                     tenant_name=project_id,
-                                                     auth_url=self.auth_url)
+            # the v2 scope is the tenant name, see _get_scope
+            return keystoneclient.v2_0.client.Client(session=self._get_session())
 
     def set_nova(self, os_tenant_id):
         self.nova = Nova('2.1', session=self._get_session(os_tenant_id))
 
-    def _get_session(self, tenant_id=None):
+    def _get_scope(self, tenant_id=None):
         if self.api_version == 2:
-            tenant_name = self.tenant_name or self.admin_tenant_name
-            auth = v2.Password(auth_url=self.auth_url,
-                               username=self.username,
-                               password=self.password,
-                               tenant_name=tenant_name)
+            return self.tenant_name or self.admin_tenant_name
         elif self.api_version == 3:
-            p_id = tenant_id or self.project_id or self.admin_project_id
-            auth = v3.Password(auth_url=self.auth_url,
+            return tenant_id or self.project_id or self.admin_project_id
+        msg = "Wrong api version: %s" % self.api_version
+        logger.error(msg)
+        raise OpenstackClientError(msg)
+
+    def _create_auth(self, scope):
+        if self.api_version == 2:
+            return v2.Password(auth_url=self.auth_url,
                                username=self.username,
                                password=self.password,
-                               project_id=p_id,
-                               project_domain_name=self.project_domain_name,
-                               user_domain_name=self.user_domain_name)
-        else:
-            msg = "Wrong api version: %s" % self.api_version
-            logger.error(msg)
-            raise OpenstackClientError(msg)
-        return session.Session(auth=auth)
+                               tenant_name=scope)
+        return v3.Password(auth_url=self.auth_url,
+                           username=self.username,
+                           password=self.password,
+                           project_id=scope,
+                           project_domain_name=self.project_domain_name,
+                           user_domain_name=self.user_domain_name)
+
+    def _get_session(self, tenant_id=None):
+        """
+        The sessions of the same user and project share the token and the endpoint discovery, only the timeout is
+        specific to this OSClient
+        """
+        scope = self._get_scope(tenant_id)
+        key = (self.api_version, self.auth_url, self.username,
+               hashlib.sha1((self.password or '').encode('utf-8')).hexdigest(), scope,
+               self.project_domain_name, self.user_domain_name)
+        shared = _get_shared_auth(key, lambda: self._create_auth(scope))
+        keystone_session = session.Session(auth=shared.auth,
+                                           session=shared.requests_session,
+                                           discovery_cache=shared.discovery_cache,
+                                           timeout=self.cancellation.request_timeout())
+        self._sessions.append(keystone_session)
+        return keystone_session
+
+    def bind(self, cancellation=None):
+        """
+        Use this OSClient for another call: it is brought back to its state after __init__, and its OpenStack
+        requests are bounded by the time remaining to cancellation instead of the one of the call that created it
+
+        :param cancellation: the CancellationToken of the call being served by default
+        """
+        self.cancellation = cancellation or current_cancellation_token()
+        for name, value in self._initial_state.items():
+            setattr(self, name, value)
+        del self._sessions[self._initial_sessions:]
+        timeout = self.cancellation.request_timeout()
+        for keystone_session in self._sessions:
+            keystone_session.timeout = timeout
 
     def set_neutron(self, os_tenant_id):
         # self.os_tenant_id = os_tenant_id
@@ -195,6 +302,7 @@ class OSClient(object):
             }
         }
         for i in range(fip_num):
+            self.cancellation.check()
             try:
                 self.neutron.create_floatingip(body=body)
             except IpAddressGenerationFailureClient as e:
@@ -212,6 +320,7 @@ class OSClient(object):
         networks.extend(network for network in exist_net if network['name'] in NETWORKS)
         index = 1
         for net in net_name_to_create:
+            self.cancellation.check()
             kwargs = {'network': {
                 'name': net,
                 'shared': False,
@@ -291,6 +400,7 @@ class OSClient(object):
         if len(sec_group) == 0:
             body = dict(security_group=dict(name=sec_g_name, description="openbaton security group"),
                         project_id=project_id, tenant_id=project_id)
+            self.cancellation.check()
             sec_group = self.neutron.create_security_group(body=body)
             self.create_rule(sec_group, 'tcp')
             self.create_rule(sec_group, 'udp')
@@ -298,12 +408,37 @@ class OSClient(object):
         self.sec_group = sec_group['security_group']
         return self.sec_group
 
-    def list_sec_group(self, os_project_id):
+    def _iter_neutron(self, list_method, collection, page_size, fields=None, **filters):
+        """
+        Yield the objects of collection requesting page_size of them at a time, neutron giving the marker of the
+        next page
+        """
+        if fields and 'id' not in fields:
+            # the marker of a page is the id of its last object
+            fields = list(fields) + ['id']
+        for page in list_method(retrieve_all=False, limit=page_size, **_neutron_params(fields, **filters)):
+            for item in page.get(collection) or []:
+                yield item
+
+    def _ensure_neutron(self, project_id):
+        if not self.neutron:
+            if not project_id:
+                raise OpenstackClientError("Missing project_id!")
+            self.set_neutron(project_id)
+
+    def iter_sec_groups(self, os_project_id, fields=None, page_size=PAGE_SIZE):
+        """
+        Yield the security groups of the project page by page, filtered by neutron
+
+        :param fields: the only attributes to get, i.e. ['id', 'name']
+        """
         if not self.neutron:
             self.set_neutron(os_project_id)
-        return [sec for sec in self.neutron.list_security_groups()['security_groups'] if
-                (sec.get('tenant_id') is not None and sec.get('tenant_id') == os_project_id) or (
-                    sec.get('project_id') is not None and sec.get('project_id') == os_project_id)]
+        return self._iter_neutron(self.neutron.list_security_groups, 'security_groups', page_size, fields,
+                                  tenant_id=os_project_id)
+
+    def list_sec_group(self, os_project_id, fields=None):
+        return list(self.iter_sec_groups(os_project_id, fields))
 
     def get_vim_instance(self, tenant_name, username=None, password=None):
         if username:
@@ -399,54 +534,77 @@ class OSClient(object):
     def list_users(self):
         return self.keystone.users.list()
 
-    def list_server(self, project_id):
+    def iter_servers(self, project_id, page_size=PAGE_SIZE):
+        """
+        Yield the servers of the project page by page, filtered by nova
+        """
         if not self.nova:
             self.set_nova(project_id)
-        all_servers = self.nova.servers.list(search_opts={'all_tenants': 1})
-        return [s for s in all_servers if (hasattr(s, 'project_id') and s.project_id == project_id) or (
-        hasattr(s, 'tenant_id') and s.tenant_id == project_id)]
-        # return self.nova.servers.list()
+        marker = None
+        while True:
+            page = self.nova.servers.list(search_opts={'all_tenants': 1, 'tenant_id': project_id}, marker=marker,
+                                          limit=page_size)
+            # nova shortens the pages to its osapi_max_limit: only an empty page is the last one
+            if not page:
+                return
+            for server in page:
+                # older nova ignore the tenant_id filter
+                if project_id in (getattr(server, 'tenant_id', None), getattr(server, 'project_id', None)):
+                    yield server
+            marker = page[-1].id
 
-    def list_networks(self, project_id=None):
-        if not self.neutron:
-            if not project_id:
-                raise OpenstackClientError("Missing project_id!")
-            self.set_neutron(project_id)
-        return [net for net in self.neutron.list_networks(retrieve_all=True).get("networks") if
-                (net.get('project_id') is not None and net.get('project_id') == project_id) or net.get(
-                    'shared') or net.get('router:external')]
-
-    def list_subnets(self, project_id):
-        if not self.neutron:
-            if not project_id:
-                raise OpenstackClientError("Missing project_id!")
-            self.set_neutron(project_id)
-        return self.neutron.list_subnets(tenant_id=project_id)
-
-    def list_floatingips(self, project_id):
-        if not self.neutron:
-            if not project_id:
-                raise OpenstackClientError("Missing project_id!")
-            self.set_neutron(project_id)
-        floatingips = self.neutron.list_floatingips(tenant_id=project_id)
+    def list_server(self, project_id):
+        return list(self.iter_servers(project_id))
+
+    def iter_networks(self, project_id=None, include_shared=True, fields=None, page_size=PAGE_SIZE):
+        """
+        Yield the networks of the project, and the shared and external ones if include_shared, page by page,
+        filtered by neutron
+
+        :param fields: the only attributes to get, i.e. ['id', 'name']
+        """
+        self._ensure_neutron(project_id)
+        queries = [{'tenant_id': project_id}] if project_id else []
+        if include_shared:
+            queries += [{'shared': True}, {'router:external': True}]
+        seen = set()
+        for filters in queries:
+            for network in self._iter_neutron(self.neutron.list_networks, 'networks', page_size, fields, **filters):
+                if network.get('id') not in seen:
+                    seen.add(network.get('id'))
+                    yield network
+
+    def list_networks(self, project_id=None, include_shared=True, fields=None):
+        return list(self.iter_networks(project_id, include_shared, fields))
+
+    def list_subnets(self, project_id, fields=None):
+        self._ensure_neutron(project_id)
+        return self.neutron.list_subnets(**_neutron_params(fields, tenant_id=project_id))
+
+    def list_floatingips(self, project_id, fields=None):
+        self._ensure_neutron(project_id)
+        floatingips = self.neutron.list_floatingips(**_neutron_params(fields, tenant_id=project_id))
         if floatingips:
             return floatingips.get("floatingips")
         else:
             return []
 
-    def list_routers(self, project_id):
-        if not self.neutron:
-            if not project_id:
-                raise OpenstackClientError("Missing project_id!")
-            self.set_neutron(project_id)
-        return self.neutron.list_routers(tenant_id=project_id)
+    def list_routers(self, project_id, fields=None):
+        self._ensure_neutron(project_id)
+        return self.neutron.list_routers(**_neutron_params(fields, tenant_id=project_id))
 
-    def list_ports(self, project_id):
-        if not self.neutron:
-            if not project_id:
-                raise OpenstackClientError("Missing project_id!")
-            self.set_neutron(project_id)
-        return self.neutron.list_ports(tenant_id=project_id)
+    def iter_ports(self, project_id, fields=None, page_size=PAGE_SIZE):
+        """
+        Yield the ports of the project page by page
+
+        :param fields: the only attributes to get, i.e. ['id']
+        """
+        self._ensure_neutron(project_id)
+        return self._iter_neutron(self.neutron.list_ports, 'ports', page_size, fields, tenant_id=project_id)
+
+    def list_ports(self, project_id, fields=None):
+        self._ensure_neutron(project_id)
+        return self.neutron.list_ports(**_neutron_params(fields, tenant_id=project_id))
 
     def list_keypairs(self, os_project_id=None):
         if not self.nova:
@@ -517,17 +675,20 @@ class OSClient(object):
         routers = self.list_routers(project_id).get('routers')
         subnets = self.list_subnets(project_id).get('subnets')
         for router in routers:
-            for subnet in subnets:
-                body_value = {
-                    'subnet_id': subnet.get('id'),
-                }
-                try:
-                    self.neutron.remove_interface_router(router.get('id'), body_value)
-                    break
-                except Exception as e:
-                    pass
-            else:
-                logger.warning('No subnet found that is associated to router {}'.format(router.get('id')))
+            self.remove_interface_router(router, subnets)
+
+    def remove_interface_router(self, router, subnets):
+        for subnet in subnets:
+            body_value = {
+                'subnet_id': subnet.get('id'),
+            }
+            try:
+                self.neutron.remove_interface_router(router.get('id'), body_value)
+                break
+            except Exception as e:
+                pass
+        else:
+            logger.warning('No subnet found that is associated to router {}'.format(router.get('id')))
 
     def delete_routers(self, project_id):
         routers = self.list_routers(project_id).get('routers')
@@ -545,124 +706,229 @@ class OSClient(object):
             self.neutron.delete_security_group(sec_group.get('id'))
 
 
-def _list_images_single_tenant(tenant_name, testbed, testbed_name):
-    os_client = OSClient(testbed_name, testbed, tenant_name)
+class OSClientRegistry(object):
+    def __init__(self, max_idle=64, idle_ttl=600):
+        """
+        Thread safe pool of the OSClients not in use, so that the module functions reuse clients already
+        authenticated instead of creating them for each call. A client is used by one call at a time
+
+        :param max_idle: the max number of idle clients kept, the least recently used ones are dropped first
+        :param idle_ttl: the seconds a client is kept unused
+        """
+        self.max_idle = max_idle
+        self.idle_ttl = idle_ttl
+        # list of (released at, key, OSClient), the most recently released last
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._idle)
+
+    @staticmethod
+    def _key(testbed_name, testbed, tenant_name, project_id):
+        # the credentials are part of the key: clients of changed credentials are never reused
+        credentials = hashlib.sha1(json.dumps(testbed, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return testbed_name, credentials, tenant_name, project_id
+
+    def _evict(self):
+        oldest = time.monotonic() - self.idle_ttl
+        self._idle = [entry for entry in self._idle if entry[0] >= oldest][-self.max_idle:]
+
+    def _take(self, key):
+        with self._lock:
+            self._evict()
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i][1] == key:
+                    return self._idle.pop(i)[2]
+        return None
+
+    def _release(self, key, os_client):
+        with self._lock:
+            self._idle.append((time.monotonic(), key, os_client))
+            self._evict()
+
+    @contextlib.contextmanager
+    def client(self, testbed_name, testbed, tenant_name=None, project_id=None, cancellation=None):
+        """
+        Context manager lending an OSClient, created with these arguments if there is no idle one. The client is
+        given back when the block completes, and dropped if it raises
+
+        :rtype: OSClient
+        """
+        key = self._key(testbed_name, testbed, tenant_name, project_id)
+        os_client = self._take(key)
+        if os_client is None:
+            os_client = OSClient(testbed_name, testbed, tenant_name, project_id, cancellation=cancellation)
+        else:
+            logger.debug("Reusing OSClient for testbed %s" % testbed_name)
+            os_client.bind(cancellation)
+        yield os_client
+        self._release(key, os_client)
+
+    def invalidate(self, testbed_name=None):
+        """
+        Drop the idle clients of testbed_name, all of them if None
+        """
+        with self._lock:
+            self._idle = [entry for entry in self._idle if testbed_name is not None and entry[1][0] != testbed_name]
+
+
+_CLIENTS = OSClientRegistry()
+
+
+def forget_os_clients(testbed_name=None):
+    """
+    Drop the idle OSClients of testbed_name, all of them if None, i.e. after its credentials changed
+    """
+    _CLIENTS.invalidate(testbed_name)
+
+
+def _list_images_single_tenant(tenant_name, testbed, testbed_name, cancellation=None):
     result = []
-    for image in os_client.list_images():
-        logger.debug("%s" % image.name)
-        result.append({
-            'name': image.name,
-            'testbed': testbed_name
-        })
+    with _CLIENTS.client(testbed_name, testbed, tenant_name, cancellation=cancellation) as os_client:
+        for image in os_client.list_images():
+            logger.debug("%s" % image.name)
+            result.append({
+                'name': image.name,
+                'testbed': testbed_name
+            })
     return result
 
 
-def list_images(openstack_credentials, tenant_name, testbed_name=None):
+def list_images(openstack_credentials, tenant_name, testbed_name=None, cancellation=None, testbed_timeout=None,
+                errors=None):
+    """
+    List the images of testbed_name, or of all the testbeds at the same time
+
+    :param testbed_timeout: seconds each testbed has when listing all of them, see fan_out
+    :param errors: dict filled with testbed name -> error message of the testbeds that failed
+    """
+    cancellation = cancellation or current_cancellation_token()
     images = []
     if not testbed_name:
-        for name, testbed in openstack_credentials.items():
+        def _list(name, testbed, token):
             logger.info("listing images for testbed %s" % name)
-            try:
-                images.extend(_list_images_single_tenant(tenant_name, testbed, name))
-            except Exception as e:
-                traceback.print_exc()
-                logger.error("Error listing images for testbed: %s" % name)
-                continue
+            return _list_images_single_tenant(tenant_name, testbed, name, token)
+
+        result = fan_out(openstack_credentials, _list, testbed_timeout, cancellation)
+        for name in openstack_credentials:
+            images.extend(result.results.get(name, []))
+        if errors is not None:
+            errors.update(result.errors)
     else:
-        images = _list_images_single_tenant(tenant_name, openstack_credentials.get(testbed_name), testbed_name)
+        images = _list_images_single_tenant(tenant_name, openstack_credentials.get(testbed_name), testbed_name,
+                                            cancellation)
     return images
 
 
-def create_os_project(openstack_credentials, username, password, tenant_name, testbed_name=None):
+def create_os_project(openstack_credentials, username, password, tenant_name, testbed_name=None, cancellation=None,
+                      testbed_timeout=None, errors=None):
+    """
+    Create the project of the user on testbed_name, or on all the testbeds at the same time
+
+    :param testbed_timeout: seconds each testbed has when creating on all of them, see fan_out
+    :param errors: dict filled with testbed name -> error message of the testbeds that failed
+    :return: dict of testbed name -> {'tenant_id': ..., 'vim_instance': ...}
+    """
+    cancellation = cancellation or current_cancellation_token()
     os_tenants = {}
     if not testbed_name:
-        for name, testbed in openstack_credentials.items():
-            try:
-                logger.info("Creating project on testbed: %s" % name)
-                os_tenant_id, vim_instance = _create_single_project(tenant_name, testbed, name, username, password)
-                logger.info("Created project %s on testbed: %s" % (os_tenant_id, name))
-                os_tenants[name] = {'tenant_id': os_tenant_id, 'vim_instance': vim_instance}
-            except:
-                logger.error("Not able to create project in testbed %s" % name)
-                traceback.print_exc()
-                continue
+        def _create(name, testbed, token):
+            logger.info("Creating project on testbed: %s" % name)
+            os_tenant_id, vim_instance = _create_single_project(tenant_name, testbed, name, username, password, token)
+            logger.info("Created project %s on testbed: %s" % (os_tenant_id, name))
+            return {'tenant_id': os_tenant_id, 'vim_instance': vim_instance}
+
+        result = fan_out(openstack_credentials, _create, testbed_timeout, cancellation)
+        os_tenants.update(result.results)
+        for name in result.errors:
+            logger.error("Not able to create project in testbed %s" % name)
+        if errors is not None:
+            errors.update(result.errors)
     else:
         os_tenant_id, vim_instance = _create_single_project(tenant_name,
                                                             openstack_credentials[testbed_name],
-                                                            testbed_name, username, password)
+                                                            testbed_name, username, password, cancellation)
         os_tenants[testbed_name] = {'tenant_id': os_tenant_id, 'vim_instance': vim_instance}
     return os_tenants
 
 
-def _create_single_project(tenant_name, testbed, testbed_name, username, password):
-    os_client = OSClient(testbed_name, testbed)
-    logger.info("Created OSClient for testbed %s" % testbed_name)
-    admin_user = os_client.get_user()
-
-    logger.debug("Got User %s" % admin_user)
-    admin_role = os_client.get_role('admin')
-    try:
-        user_role = os_client.get_role('_member_')
-    except:
-        user_role = os_client.get_role('member')
-
-    logger.debug("Got Role %s" % admin_role)
-    for tenant in os_client.list_tenants():
-        if tenant.name == tenant_name:
-            logger.warning("Tenant with name or id %s exists already! I assume a double registration i will not do "
-                           "anything :)" % tenant_name)
-            logger.warning("returning tenant id %s" % tenant.id)
-
-            exp_user = os_client.get_user(username)
-            if not exp_user:
-                exp_user = os_client.create_user(username, password)
-                os_client.add_user_role(user=exp_user, role=user_role, tenant=tenant.id)
-                os_client.add_user_role(user=admin_user, role=admin_role, tenant=tenant.id)
-            if os_client.api_version == 2:
-                vim_instance = os_client.get_vim_instance(tenant_name=tenant_name, username=username, password=password)
-            else:
-                vim_instance = os_client.get_vim_instance(tenant_name=tenant.id, username=username, password=password)
-            return tenant.id, vim_instance
-
-    tenant = os_client.create_tenant(tenant_name=tenant_name, description='softfire tenant for user %s' % tenant_name)
-    logger.debug("Created tenant %s" % tenant)
-    os_tenant_id = tenant.id
-    logger.info("Created tenant with id: %s" % os_tenant_id)
-
-    exp_user = os_client.create_user(username, password, os_tenant_id)
-    os_client.add_user_role(user=admin_user, role=admin_role, tenant=os_tenant_id)
-    os_client.add_user_role(user=exp_user, role=user_role, tenant=os_tenant_id)
-
-    os_client = OSClient(testbed_name, testbed, project_id=os_tenant_id, tenant_name=tenant_name)
-
-    try:
-        ext_net = os_client.get_ext_net(testbed.get('ext_net_name'))
-
-        if ext_net is None:
-            logger.error(
-                "A shared External Network called %s must exist! "
-                "Please create one in your openstack instance" % testbed.get('ext_net_name')
-            )
-            raise OpenstackClientError("A shared External Network called softfire-network must exist! "
-                                       "Please create one in your openstack instance")
-        # networks, subnets, router_id = os_client.create_networks_and_subnets(ext_net)
-        # logger.debug("Created Network %s, Subnet %s, Router %s" % (networks, subnets, router_id))
-
-        fips = testbed.get("allocate-fip")
-        if fips is not None and int(fips) > 0:
-            try:
-                os_client.allocate_floating_ips(ext_net, int(fips))
-            except OpenstackClientError as e:
-                logger.warning(e.args)
+def _create_single_project(tenant_name, testbed, testbed_name, username, password, cancellation=None):
+    with _CLIENTS.client(testbed_name, testbed, cancellation=cancellation) as os_client:
+        logger.info("Got OSClient for testbed %s" % testbed_name)
+        admin_user = os_client.get_user()
 
-    except:
-        logger.warning("Not able to get ext net")
+        logger.debug("Got User %s" % admin_user)
+        admin_role = os_client.get_role('admin')
+        try:
+            user_role = os_client.get_role('_member_')
+        except:
+            user_role = os_client.get_role('member')
 
-    os_client.create_security_group(os_tenant_id)
-    if os_client.api_version == 2:
-        vim_instance = os_client.get_vim_instance(tenant_name=tenant_name, username=username, password=password)
-    else:
-        vim_instance = os_client.get_vim_instance(tenant_name=tenant.id, username=username, password=password)
+        logger.debug("Got Role %s" % admin_role)
+        for tenant in os_client.list_tenants():
+            if tenant.name == tenant_name:
+                logger.warning("Tenant with name or id %s exists already! I assume a double registration i will not "
+                               "do anything :)" % tenant_name)
+                logger.warning("returning tenant id %s" % tenant.id)
+
+                exp_user = os_client.get_user(username)
+                if not exp_user:
+                    exp_user = os_client.create_user(username, password)
+                    os_client.add_user_role(user=exp_user, role=user_role, tenant=tenant.id)
+                    os_client.add_user_role(user=admin_user, role=admin_role, tenant=tenant.id)
+                if os_client.api_version == 2:
+                    vim_instance = os_client.get_vim_instance(tenant_name=tenant_name, username=username,
+                                                              password=password)
+                else:
+                    vim_instance = os_client.get_vim_instance(tenant_name=tenant.id, username=username,
+                                                              password=password)
+                return tenant.id, vim_instance
+
+        os_client.cancellation.check()
+        tenant = os_client.create_tenant(tenant_name=tenant_name,
+                                         description='softfire tenant for user %s' % tenant_name)
+        logger.debug("Created tenant %s" % tenant)
+        os_tenant_id = tenant.id
+        logger.info("Created tenant with id: %s" % os_tenant_id)
+
+        exp_user = os_client.create_user(username, password, os_tenant_id)
+        os_client.add_user_role(user=admin_user, role=admin_role, tenant=os_tenant_id)
+        os_client.add_user_role(user=exp_user, role=user_role, tenant=os_tenant_id)
+        cancellation = os_client.cancellation
+
+    with _CLIENTS.client(testbed_name, testbed, project_id=os_tenant_id, tenant_name=tenant_name,
+                         cancellation=cancellation) as os_client:
+        try:
+            ext_net = os_client.get_ext_net(testbed.get('ext_net_name'))
+
+            if ext_net is None:
+                logger.error(
+                    "A shared External Network called %s must exist! "
+                    "Please create one in your openstack instance" % testbed.get('ext_net_name')
+                )
+                raise OpenstackClientError("A shared External Network called softfire-network must exist! "
+                                           "Please create one in your openstack instance")
+            # networks, subnets, router_id = os_client.create_networks_and_subnets(ext_net)
+            # logger.debug("Created Network %s, Subnet %s, Router %s" % (networks, subnets, router_id))
+
+            fips = testbed.get("allocate-fip")
+            if fips is not None and int(fips) > 0:
+                try:
+                    os_client.allocate_floating_ips(ext_net, int(fips))
+                except OpenstackClientError as e:
+                    logger.warning(e.args)
+
+        except CancelledError:
+            raise
+        except:
+            logger.warning("Not able to get ext net")
+
+        os_client.create_security_group(os_tenant_id)
+        if os_client.api_version == 2:
+            vim_instance = os_client.get_vim_instance(tenant_name=tenant_name, username=username, password=password)
+        else:
+            vim_instance = os_client.get_vim_instance(tenant_name=tenant.id, username=username, password=password)
     return os_tenant_id, vim_instance
 
 
@@ -670,20 +936,87 @@ def get_username_hash(username):
     return abs(hash(username))
 
 
-def delete_tenant_and_user(openstack_credentials, username, testbed_tenants):
+def _teardown_plan(os_client, username, project_id):
+    """
+    Deletion of the project resources in dependency order: the floating ips before the router gateways, the
+    router interfaces before the ports, the ports before the networks and the security groups, everything before
+    the project. The user is deleted at the same time
+    """
+
+    def _routers():
+        return os_client.list_routers(project_id, fields=['id']).get('routers')
+
+    def _router_interfaces():
+        subnets = os_client.list_subnets(project_id, fields=['id']).get('subnets')
+        return [(router, subnets) for router in _routers()]
+
+    return TeardownPlan([
+        TeardownStep('floating_ips', lambda: os_client.list_floatingips(project_id, fields=['id']),
+                     lambda fip: os_client.neutron.delete_floatingip(fip.get('id'))),
+        TeardownStep('router_gateways', _routers,
+                     lambda router: os_client.neutron.remove_gateway_router(router.get('id')),
+                     after=['floating_ips']),
+        TeardownStep('router_interfaces', _router_interfaces,
+                     lambda item: os_client.remove_interface_router(*item),
+                     after=['floating_ips']),
+        TeardownStep('ports', lambda: list(os_client.iter_ports(project_id, fields=['id'])),
+                     lambda port: os_client.neutron.delete_port(port.get('id')),
+                     after=['router_interfaces'], ignore_errors=True),
+        TeardownStep('routers', _routers,
+                     lambda router: os_client.neutron.delete_router(router.get('id')),
+                     after=['router_gateways', 'router_interfaces']),
+        TeardownStep('security_groups', lambda: os_client.list_sec_group(project_id, fields=['id']),
+                     lambda sec_group: os_client.neutron.delete_security_group(sec_group.get('id')),
+                     after=['ports']),
+        TeardownStep('networks', lambda: os_client.list_networks(project_id, include_shared=False, fields=['id']),
+                     lambda network: os_client.neutron.delete_network(network.get('id')),
+                     after=['ports', 'routers']),
+        TeardownStep('user', lambda: [username], os_client.delete_user),
+        TeardownStep('project', lambda: [project_id], os_client.delete_project,
+                     after=['floating_ips', 'routers', 'security_groups', 'networks']),
+    ])
+
+
+def delete_tenant_and_user(openstack_credentials, username, testbed_tenants, max_concurrent=8, errors=None):
+    """
+    Delete the projects of the user on all its testbeds at the same time, see _teardown_plan. The teardown is not
+    cancelled with the call serving it nor by the timeout of a testbed, so that no project is left half deleted
+
+    :param testbed_tenants: dict of testbed id -> project id
+    :param max_concurrent: the objects deleted at the same time on a testbed, unless the credentials of the testbed
+     have teardown_concurrency
+    :param errors: dict filled with testbed name -> error message of the testbeds that failed
+    :return: dict of testbed name -> TeardownReport
+    :raise OpenstackClientError: if the teardown failed on a testbed, after all of them were torn down
+    """
+    projects = {}
     for testbed_id, project_id in testbed_tenants.items():
-        for testbed_name, credentials in openstack_credentials.items():
-            if get_testbed_name_from_id(testbed_id) == testbed_name:
-                os_client = OSClient(testbed_name, credentials)
-                os_client.delete_security_groups(project_id)
-                os_client.release_floating_ips(project_id)
-                os_client.remove_gateway_routers(project_id)
-                os_client.remove_interface_routers(project_id)
-                os_client.delete_ports(project_id)
-                os_client.delete_routers(project_id)
-                os_client.delete_networks(project_id)
-                os_client.delete_user(username)
-                os_client.delete_project(project_id)
+        testbed_name = get_testbed_name_from_id(testbed_id)
+        if testbed_name in openstack_credentials:
+            projects[testbed_name] = project_id
+
+    def _teardown(name, testbed, token):
+        with _CLIENTS.client(name, testbed, cancellation=token) as os_client:
+            report = _teardown_plan(os_client, username, projects[name]).run(
+                int(testbed.get('teardown_concurrency', max_concurrent)), token)
+        logger.info("Deleted project %s of %s on testbed %s:\n%s" % (projects[name], username, name,
+                                                                     report.summary()))
+        return report
+
+    result = fan_out({name: openstack_credentials[name] for name in projects}, _teardown,
+                     cancellation=CancellationToken(), testbed_timeouts=False)
+    failures = dict(result.errors)
+    for name, report in result.results.items():
+        if report.failed:
+            failures[name] = '; '.join(
+                "%s: %s" % (step.name, 'skipped' if step.skipped else ', '.join(step.errors))
+                for step in report.steps.values() if step.blocking)
+    if errors is not None:
+        errors.update(failures)
+    if failures:
+        raise OpenstackClientError("Not able to delete the projects of %s on %s" % (
+            username, ', '.join("%s (%s)" % (name, failures[name]) for name in sorted(failures))))
+    return result.results
 
 
 if __name__ == '__main__':
@@ -0,0 +1,65 @@
+import cProfile
+import itertools
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+class RequestProfiler(object):
+    def __init__(self, manager_instance):
+        """
+        Profile the calls with cProfile and write a .pstats file for the sampled or slow ones.
+        It is configured in the system section, which is read at each call, so it can be switched on and off
+        editing the config file (or sending SIGHUP) without restarting the manager:
+         * profile_every: profile one call every N, 0 disables sampling
+         * profile_threshold: seconds, profile every call and keep only the slower ones, 0 disables it
+         * profile_dir: where the .pstats files are written
+
+        :param manager_instance: the AbstractManager
+        """
+        self.manager_instance = manager_instance
+        self._calls = itertools.count(1)
+        self._dumps = itertools.count(1)
+
+    @contextmanager
+    def profile(self, method, username):
+        every = self.manager_instance.get_config_int('system', 'profile_every', '0')
+        threshold = self.manager_instance.get_config_float('system', 'profile_threshold', '0')
+        sampled = every > 0 and next(self._calls) % every == 0
+        if not sampled and threshold <= 0:
+            yield
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is active in this process
+            yield
+            return
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            duration = time.monotonic() - start
+            if sampled or duration >= threshold:
+                self._dump(profiler, method, username, duration)
+
+    def _dump(self, profiler, method, username, duration):
+        profile_dir = self.manager_instance.get_config_value('system', 'profile_dir', '/tmp/softfire-profiles')
+        file_name = '%s-%s-%dms-%d-%d.pstats' % (_UNSAFE_CHARS.sub('_', method),
+                                                 _UNSAFE_CHARS.sub('_', username or '-'),
+                                                 duration * 1000, time.time() * 1000, next(self._dumps))
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, file_name)
+            profiler.dump_stats(path)
+            logger.info("Profile of %s for %s (%.3f s) written to %s" % (method, username, duration, path))
+        except OSError:
+            logger.exception("Not able to write the profile in %s" % profile_dir)
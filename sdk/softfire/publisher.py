@@ -0,0 +1,242 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+import grpc
+
+from sdk.softfire import metrics
+from sdk.softfire.channels import get_em_backoff, get_em_timeout, get_registration_stub
+from sdk.softfire.grpc import messages_pb2
+
+logger = logging.getLogger(__name__)
+
+STATUS_UPDATES_SENT = metrics.REGISTRY.counter('softfire_manager_status_updates_sent_total',
+                                               'StatusMessages sent to the experiment manager')
+STATUS_UPDATES_COALESCED = metrics.REGISTRY.counter('softfire_manager_status_updates_coalesced_total',
+                                                    'StatusMessages replaced by a newer one of the same user '
+                                                    'before being sent')
+STATUS_UPDATES_UNCHANGED = metrics.REGISTRY.counter('softfire_manager_status_updates_unchanged_total',
+                                                    'StatusMessages not sent because no resource changed')
+STATUS_UPDATES_DROPPED = metrics.REGISTRY.counter('softfire_manager_status_updates_dropped_total',
+                                                  'StatusMessages dropped because the queue was full')
+
+
+class StatusDigests(object):
+    def __init__(self, max_users=4096):
+        """
+        Thread safe record of the blake2b digests of the resources last sent for each user, so that unchanged
+        resources are not sent again
+
+        :param max_users: the max number of users remembered, the least recently updated one is forgotten when full
+        """
+        self.max_users = max_users
+        self._digests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._digests)
+
+    @staticmethod
+    def digest(resource):
+        """
+        :param resource: the json content of a resource
+        :return: the content serialized as sent and its digest, independent of the order of the keys
+        """
+        content = json.loads(resource)
+        canonical = json.dumps(content, sort_keys=True, separators=(',', ':'))
+        return json.dumps(content), hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).digest()
+
+    def diff(self, username, resources):
+        """
+        :param resources: the json contents of the resources of username
+        :return: the contents, as sent, of the resources to send and the digests to record once they are sent. Only
+         the resources that changed or are new since the last record are sent, all of them (even none) when some
+         resource was removed, and None if nothing changed
+        """
+        digested = [self.digest(resource) for resource in resources]
+        digests = frozenset(digest for _, digest in digested)
+        with self._lock:
+            previous = self._digests.get(username, frozenset())
+        if digests == previous:
+            return None, digests
+        if previous - digests:
+            return [content for content, _ in digested], digests
+        return [content for content, digest in digested if digest not in previous], digests
+
+    def record(self, username, digests):
+        with self._lock:
+            self._digests.pop(username, None)
+            self._digests[username] = digests
+            while len(self._digests) > self.max_users:
+                self._digests.popitem(last=False)
+
+    def forget(self, username=None):
+        """
+        Forget the digests of username, of all the users if None, so that all its resources are sent again
+        """
+        with self._lock:
+            if username is None:
+                self._digests.clear()
+            else:
+                self._digests.pop(username, None)
+
+
+class StatusPublisher(object):
+    def __init__(self, config_file_path, max_size=1024, digests=None):
+        """
+        Send the StatusMessages to the experiment manager from a background thread. Only the latest message of
+        each user is kept while waiting, and all the waiting messages are sent on one update_status_stream call.
+        Experiment managers without update_status_stream get one update_status call per message
+
+        :param config_file_path: the configuration of the experiment manager to reach
+        :param max_size: the max number of users waiting, the oldest one is dropped when full
+        :param digests: if given, only the resources changed since the last message sent for the user are sent,
+         and users without changes are skipped
+         :type digests: StatusDigests
+        """
+        self.config_file_path = config_file_path
+        self.max_size = max_size
+        self.digests = digests
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._sending = 0
+        self._streaming = True
+        self._stopped = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def publish(self, status_message):
+        """
+        Queue status_message replacing the one of the same user still waiting, never blocks
+        """
+        with self._condition:
+            if self._stopped:
+                logger.warning("Status publisher stopped, dropping the status of %s" % status_message.username)
+                STATUS_UPDATES_DROPPED.inc()
+                return
+            if status_message.username in self._pending:
+                del self._pending[status_message.username]
+                STATUS_UPDATES_COALESCED.inc()
+            elif len(self._pending) >= self.max_size:
+                username, _ = self._pending.popitem(last=False)
+                logger.warning("Status queue full, dropping the status of %s" % username)
+                STATUS_UPDATES_DROPPED.inc()
+            self._pending[status_message.username] = status_message
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='status-publisher', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Wait until the queued messages are sent
+
+        :return: True if the queue is empty
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._sending, timeout)
+
+    def stop(self, timeout=None):
+        """
+        Send the queued messages, waiting at most timeout seconds, and stop the thread
+        """
+        flushed = self.flush(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if not flushed:
+            logger.warning("%d status messages not sent to the experiment manager" % len(self._pending))
+
+    def _take(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._stopped)
+            if self._stopped:
+                return None
+            batch = list(self._pending.values())
+            self._pending.clear()
+            self._sending = len(batch)
+            return batch
+
+    def _requeue(self, batch):
+        with self._condition:
+            for status_message in reversed(batch):
+                if status_message.username not in self._pending and len(self._pending) < self.max_size:
+                    self._pending[status_message.username] = status_message
+                    self._pending.move_to_end(status_message.username, last=False)
+
+    def _done(self):
+        with self._condition:
+            self._sending = 0
+            self._condition.notify_all()
+
+    def _deltas(self, batch):
+        """
+        :return: the (StatusMessage, digests) to send, only with the resources changed unless some were removed
+        """
+        if self.digests is None:
+            return [(status_message, None) for status_message in batch]
+        deltas = []
+        for status_message in batch:
+            try:
+                changed, digests = self.digests.diff(status_message.username,
+                                                     [resource.content for resource in status_message.resources])
+            except ValueError:
+                logger.exception("Invalid resources in the status of %s" % status_message.username)
+                continue
+            if changed is None:
+                STATUS_UPDATES_UNCHANGED.inc()
+                continue
+            deltas.append((messages_pb2.StatusMessage(resources=[messages_pb2.Resource(content=content)
+                                                                 for content in changed],
+                                                      username=status_message.username,
+                                                      manager_name=status_message.manager_name), digests))
+        return deltas
+
+    def _send(self, batch):
+        deltas = self._deltas(batch)
+        if not deltas:
+            return
+        stub = get_registration_stub(self.config_file_path)
+        timeout = get_em_timeout(self.config_file_path)
+        messages = [status_message for status_message, _ in deltas]
+        if self._streaming:
+            try:
+                stub.update_status_stream(iter(messages), timeout=timeout)
+                messages = []
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNIMPLEMENTED:
+                    raise
+                logger.info("The experiment manager does not implement update_status_stream, using update_status")
+                self._streaming = False
+        for status_message in messages:
+            stub.update_status(status_message, timeout=timeout)
+        STATUS_UPDATES_SENT.inc(len(deltas))
+        if self.digests is not None:
+            for status_message, digests in deltas:
+                self.digests.record(status_message.username, digests)
+
+    def _run(self):
+        backoff = get_em_backoff(self.config_file_path)
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            try:
+                self._send(batch)
+                backoff.reset()
+            except grpc.RpcError as e:
+                delay = backoff.next_delay()
+                logger.warning("Error sending %d status messages (%s), retrying in %.2f seconds"
+                               % (len(batch), e.code(), delay))
+                self._requeue(batch)
+                with self._condition:
+                    self._sending = 0
+                    self._condition.wait_for(lambda: self._stopped, delay)
+                continue
+            except Exception:
+                logger.exception("Error sending %d status messages" % len(batch))
+            self._done()
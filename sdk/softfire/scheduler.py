@@ -0,0 +1,97 @@
+import logging
+import random
+import threading
+import time
+
+from sdk.softfire import metrics
+
+logger = logging.getLogger(__name__)
+
+STATUS_SWEEP_DURATION = metrics.REGISTRY.histogram('softfire_manager_status_sweep_duration_seconds',
+                                                   'Duration of the send_update calls of the status scheduler')
+STATUS_SWEEP_INTERVAL = metrics.REGISTRY.gauge('softfire_manager_status_sweep_interval_seconds',
+                                               'Current interval between two send_update calls, without jitter')
+
+
+class StatusScheduler(object):
+    def __init__(self, manager, interval=30, min_interval=5, max_interval=300, jitter=0.1):
+        """
+        Call manager.send_update periodically from one thread, so two sweeps never overlap. The interval is
+        halved, down to min_interval, after a sweep finding changes and doubled, up to max_interval, after a
+        sweep without changes. poke() brings it down to min_interval, i.e. after resources are provided
+
+        :param manager: the AbstractManager
+        :param interval: the first interval in seconds
+        :param jitter: each wait is randomly shortened or lengthened by this fraction of the interval
+        """
+        self.manager = manager
+        self.interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.max_interval = max(max_interval, interval)
+        self.jitter = jitter
+        self._delay = interval
+        self._wakeup = threading.Event()
+        self._sweep_lock = threading.Lock()
+        self._stopped = False
+
+    def poke(self):
+        """
+        Sweep after min_interval seconds instead of the current interval
+        """
+        self._delay = self.min_interval
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def sweep(self):
+        """
+        Call send_update unless a sweep is already running
+
+        :return: True if the status changed, None if the sweep was skipped
+        """
+        if not self._sweep_lock.acquire(blocking=False):
+            logger.debug("Status sweep still running, skipping")
+            return None
+        start = time.monotonic()
+        try:
+            return bool(self.manager.send_update())
+        finally:
+            duration = time.monotonic() - start
+            self._sweep_lock.release()
+            STATUS_SWEEP_DURATION.observe(duration)
+            logger.debug("Status sweep done in %.3f seconds" % duration)
+
+    def _next_delay(self, changed):
+        if changed:
+            self._delay = max(self.min_interval, self._delay / 2)
+        elif changed is not None:
+            self._delay = min(self.max_interval, self._delay * 2)
+        STATUS_SWEEP_INTERVAL.set(self._delay)
+        return self._delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def run(self, stop_event):
+        """
+        Sweep until stop_event is set or stop() is called
+        """
+        self._stopped = False
+        wait = self._delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        while not stop_event.is_set() and not self._stopped:
+            deadline = time.monotonic() + wait
+            while not self._stopped and not stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if self._wakeup.wait(remaining):
+                    self._wakeup.clear()
+                    # poked: sweep min_interval seconds from now, if sooner
+                    deadline = min(deadline, time.monotonic() + self._delay)
+            if self._stopped or stop_event.is_set():
+                return
+            changed = None
+            try:
+                changed = self.sweep()
+            except Exception:
+                logger.exception("Error sending the status update")
+            wait = self._next_delay(changed)
@@ -0,0 +1,163 @@
+import logging
+import time
+from collections import OrderedDict
+from concurrent import futures
+
+from sdk.softfire.cancellation import current_cancellation_token
+
+logger = logging.getLogger(__name__)
+
+# marks the future listing the objects of a step
+_LIST = object()
+
+
+class TeardownStep(object):
+    def __init__(self, name, list_objects, delete_object, after=(), ignore_errors=False):
+        """
+        Delete a kind of objects, i.e. all the ports of a project
+
+        :param list_objects: callable returning the objects to delete
+        :param delete_object: callable deleting one of them, the objects are deleted concurrently
+        :param after: names of the steps that must be completed before this one starts
+        :param ignore_errors: the steps after this one run even if some objects could not be deleted
+        """
+        self.name = name
+        self.list_objects = list_objects
+        self.delete_object = delete_object
+        self.after = tuple(after)
+        self.ignore_errors = ignore_errors
+
+
+class StepReport(object):
+    def __init__(self, step):
+        self.name = step.name
+        self.ignore_errors = step.ignore_errors
+        self.deleted = 0
+        self.errors = []
+        self.skipped = False
+        self.duration = 0.0
+
+    @property
+    def blocking(self):
+        """
+        True if the steps after this one must be skipped
+        """
+        return self.skipped or (bool(self.errors) and not self.ignore_errors)
+
+
+class TeardownReport(object):
+    def __init__(self):
+        self.steps = OrderedDict()
+        self.duration = 0.0
+
+    @property
+    def failed(self):
+        """
+        True if a step was skipped or could not delete some objects, the steps ignoring errors apart
+        """
+        return any(step.blocking for step in self.steps.values())
+
+    def summary(self):
+        """
+        :return: one line per step with the objects deleted, the errors and the duration
+        """
+        lines = []
+        for step in self.steps.values():
+            if step.skipped:
+                lines.append("%-20s skipped" % step.name)
+            else:
+                lines.append("%-20s %4d deleted %4d errors %8.2fs" % (step.name, step.deleted, len(step.errors),
+                                                                      step.duration))
+        lines.append("%-20s %31.2fs" % ('total', self.duration))
+        return '\n'.join(lines)
+
+
+class TeardownPlan(object):
+    def __init__(self, steps):
+        """
+        Steps to run in dependency order: each step starts as soon as the steps it comes after are completed,
+        independent steps run at the same time. A step is skipped when a step it comes after failed
+
+        :param steps: list of TeardownStep
+        :raise ValueError: if a step comes after an unknown step, or the steps have a cycle
+        """
+        self.steps = OrderedDict((step.name, step) for step in steps)
+        self._check()
+
+    def _check(self):
+        for step in self.steps.values():
+            for name in step.after:
+                if name not in self.steps:
+                    raise ValueError("Step %s comes after unknown step %s" % (step.name, name))
+        ordered = set()
+        while len(ordered) < len(self.steps):
+            ready = [s.name for s in self.steps.values() if s.name not in ordered and set(s.after) <= ordered]
+            if not ready:
+                raise ValueError("Cycle among the steps %s" % sorted(set(self.steps) - ordered))
+            ordered.update(ready)
+
+    def run(self, max_workers=8, cancellation=None):
+        """
+        Run the steps, deleting at most max_workers objects at the same time. Errors are reported, not raised
+
+        :param cancellation: no object is deleted anymore once cancelled; the CancellationToken of the call being
+         served by default
+        :rtype: TeardownReport
+        :raise CancelledError: if cancellation is cancelled
+        """
+        cancellation = cancellation or current_cancellation_token()
+        report = TeardownReport()
+        start = time.monotonic()
+        waiting = OrderedDict(self.steps)
+        started = {}
+        # step name -> futures of the step not completed
+        remaining = {}
+        # future -> (step name, object or _LIST)
+        running = {}
+        completed = set()
+        with futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='teardown') as executor:
+            while True:
+                progress = True
+                while progress:
+                    progress = False
+                    for name, step in list(waiting.items()):
+                        if not set(step.after) <= completed:
+                            continue
+                        del waiting[name]
+                        step_report = report.steps[name] = StepReport(step)
+                        if cancellation.cancelled or any(report.steps[s].blocking for s in step.after):
+                            step_report.skipped = True
+                            completed.add(name)
+                            progress = True
+                            continue
+                        started[name] = time.monotonic()
+                        running[executor.submit(step.list_objects)] = (name, _LIST)
+                        remaining[name] = 1
+                if not running:
+                    break
+                done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    name, obj = running.pop(future)
+                    step = self.steps[name]
+                    step_report = report.steps[name]
+                    remaining[name] -= 1
+                    try:
+                        result = future.result()
+                        if obj is _LIST:
+                            for item in result or ():
+                                if cancellation.cancelled:
+                                    break
+                                running[executor.submit(step.delete_object, item)] = (name, item)
+                                remaining[name] += 1
+                        else:
+                            step_report.deleted += 1
+                    except Exception as e:
+                        message = getattr(e, 'message', None) or str(e) or e.__class__.__name__
+                        step_report.errors.append(message)
+                        logger.warning("Teardown step %s: %s" % (name, message))
+                    if remaining[name] == 0:
+                        step_report.duration = time.monotonic() - started[name]
+                        completed.add(name)
+        report.duration = time.monotonic() - start
+        cancellation.check()
+        return report
@@ -2,6 +2,11 @@ import configparser
 import json
 import logging
 import os
+import random
+import signal
+import threading
+import time
+from types import MappingProxyType
 
 from sdk.softfire.grpc import messages_pb2
 
@@ -35,19 +40,177 @@ def get_config_parser(config_file_path):
         return
 
 
+# seconds between two mtime checks of the same config file
+_CONFIG_CHECK_INTERVAL = 5
+
+_config_snapshots = {}
+_config_snapshots_lock = threading.Lock()
+
+
+class ConfigSnapshot(object):
+    """
+    Immutable, already parsed view of a configuration file.
+
+    Values are interpolated once when the snapshot is built, so every lookup is a plain dict access.
+    """
+
+    def __init__(self, config_file_path, sections, mtime):
+        self.config_file_path = config_file_path
+        self.mtime = mtime
+        self._sections = MappingProxyType(
+            {name: MappingProxyType(dict(options)) for name, options in sections.items()})
+        self._next_check = time.monotonic() + _CONFIG_CHECK_INTERVAL
+
+    @classmethod
+    def load(cls, config_file_path):
+        """
+        Parse the config file into a new snapshot
+
+        :param config_file_path: the path of the ini file
+        :return: the ConfigSnapshot or None if the file does not exist
+        """
+        config = get_config_parser(config_file_path)
+        if not config:
+            return None
+        sections = {}
+        for section in config.sections():
+            options = {}
+            for option in config.options(section):
+                try:
+                    options[option] = config.get(section, option)
+                except configparser.InterpolationError:
+                    # i.e. logging formatters, they are not meant to be interpolated
+                    options[option] = config.get(section, option, raw=True)
+            sections[section] = options
+        return cls(config_file_path, sections, os.path.getmtime(config_file_path))
+
+    def is_stale(self):
+        """
+        Check, at most once every _CONFIG_CHECK_INTERVAL seconds, if the file changed on disk
+
+        :return: True if the snapshot must be reloaded
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + _CONFIG_CHECK_INTERVAL
+        try:
+            return os.path.getmtime(self.config_file_path) != self.mtime
+        except OSError:
+            return True
+
+    def sections(self):
+        return list(self._sections.keys())
+
+    def has_option(self, section, key):
+        options = self._sections.get(section)
+        return options is not None and key.lower() in options
+
+    def get(self, section, key, default=None):
+        """
+        Get the value of key in section
+
+        :param section: the section name
+        :param key: the option name
+        :param default: the value returned if section or key are missing, if None an error is raised
+        :return: the value as str
+        """
+        options = self._sections.get(section)
+        if options is None:
+            if default is None:
+                raise configparser.NoSectionError(section)
+            return default
+        try:
+            return options[key.lower()]
+        except KeyError:
+            if default is None:
+                raise configparser.NoOptionError(key, section)
+            return default
+
+    def get_int(self, section, key, default=None):
+        return int(self.get(section, key, default))
+
+    def get_float(self, section, key, default=None):
+        return float(self.get(section, key, default))
+
+    def get_bool(self, section, key, default=None):
+        return to_bool(self.get(section, key, default))
+
+
+def to_bool(value):
+    """
+    Convert a config value to bool, accepting the same strings as ConfigParser.getboolean
+    """
+    if isinstance(value, bool):
+        return value
+    try:
+        return configparser.ConfigParser.BOOLEAN_STATES[str(value).lower()]
+    except KeyError:
+        raise ValueError("Not a boolean: %s" % value)
+
+
+def get_config_snapshot(config_file_path):
+    """
+    Get the cached ConfigSnapshot of config_file_path, parsing the file only the first time or when it changed
+
+    :param config_file_path: the path of the ini file
+    :return: the ConfigSnapshot or None if the file does not exist
+     :rtype: ConfigSnapshot
+    """
+    snapshot = _config_snapshots.get(config_file_path)
+    if snapshot is not None and not snapshot.is_stale():
+        return snapshot
+    with _config_snapshots_lock:
+        current = _config_snapshots.get(config_file_path)
+        if current is not None and current is not snapshot:
+            # reloaded by another thread meanwhile
+            return current
+        snapshot = ConfigSnapshot.load(config_file_path)
+        if snapshot is None:
+            _config_snapshots.pop(config_file_path, None)
+        else:
+            _config_snapshots[config_file_path] = snapshot
+        return snapshot
+
+
+def reload_config(config_file_path=None):
+    """
+    Drop the cached snapshots, they will be parsed again at the next access
+
+    :param config_file_path: the file to invalidate, all the files if None
+    """
+    with _config_snapshots_lock:
+        if config_file_path is None:
+            _config_snapshots.clear()
+        else:
+            _config_snapshots.pop(config_file_path, None)
+
+
+def install_config_reload_handler():
+    """
+    Reload all the config files on SIGHUP. Does nothing if not called from the main thread.
+    """
+    if not hasattr(signal, 'SIGHUP') or threading.current_thread() is not threading.main_thread():
+        return
+    previous_handler = signal.getsignal(signal.SIGHUP)
+
+    def _handler(signum, frame):
+        logging.info("Received SIGHUP, reloading configuration")
+        reload_config()
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+
+    signal.signal(signal.SIGHUP, _handler)
+
+
 def get_config(section, key, config_file_path, default=None):
-    config = get_config_parser(config_file_path)
+    config = get_config_snapshot(config_file_path)
     if not config:
         if default:
             return default
         else:
             raise FileNotFoundError()
-    if default is None:
-        return config.get(section=section, option=key)
-    try:
-        return config.get(section=section, option=key)
-    except configparser.NoOptionError:
-        return default
+    return config.get(section=section, key=key, default=default)
 
 
 class _BaseException(Exception):
@@ -64,6 +227,59 @@ class ExperimentManagerClientError(_BaseException):
     pass
 
 
+class ServerBusyError(_BaseException):
+    pass
+
+
+class CancelledError(_BaseException):
+    pass
+
+
+class RateLimitedError(ServerBusyError):
+    def __init__(self, message=None, retry_after=0.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Backoff(object):
+    def __init__(self, initial=0.1, maximum=5.0, multiplier=2.0):
+        """
+        Exponential backoff with full jitter: the n-th delay is random between initial and
+        min(maximum, initial * multiplier ** n) seconds
+
+        :param initial: the first delay in seconds
+        :param maximum: the max delay in seconds
+        :param multiplier: the growth factor
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.attempts = 0
+
+    def next_delay(self):
+        upper = min(self.maximum, self.initial * self.multiplier ** self.attempts)
+        self.attempts += 1
+        return random.uniform(self.initial, max(self.initial, upper))
+
+    def reset(self):
+        self.attempts = 0
+
+
+def rpc_method_key(full_method, request=None):
+    """
+    Get the name used in the configuration for an incoming call: execute calls are identified by their
+    messages_pb2.Method, i.e. provide_resources, all the others by the rpc name, i.e. heartbeat
+
+    :param full_method: the gRPC method, i.e. /ManagerAgent/execute
+    :param request: the request message
+    :return: the method key
+    """
+    name = full_method.rsplit('/', 1)[-1]
+    if name == 'execute' and request is not None:
+        return messages_pb2.Method.Name(request.method).lower()
+    return name
+
+
 def get_openstack_credentials(config_file_path):
     openstack_credential_file_path = get_config('system', 'openstack-credentials-file', config_file_path)
     # logger.debug("Openstack cred file is: %s" % openstack_credential_file_path)
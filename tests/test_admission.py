@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from concurrent import futures
+
+import grpc
+
+from sdk.softfire.admission import AdmissionController, TokenBucket, get_admission_controller
+from sdk.softfire import metrics
+from sdk.softfire.grpc import messages_pb2, messages_pb2_grpc
+from sdk.softfire.interceptors import AdmissionInterceptor, MetricsInterceptor
+from sdk.softfire.main import _ManagerAgent
+from sdk.softfire.utils import RateLimitedError
+from tests.test_server import DummyManager
+
+
+class AdmissionTestCase(unittest.TestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=0.5, burst=2)
+        self.assertEqual(bucket.take(), 0)
+        self.assertEqual(bucket.take(), 0)
+        self.assertAlmostEqual(bucket.take(), 2, places=1)
+
+    def test_per_user_and_method(self):
+        controller = AdmissionController({'refresh_resources': (0.1, 1)})
+        controller.admit('refresh_resources', 'a')
+        controller.admit('refresh_resources', 'b')
+        controller.admit('list_resources', 'a')
+        with self.assertRaises(RateLimitedError) as raised:
+            controller.admit('refresh_resources', 'a')
+        self.assertGreater(raised.exception.retry_after, 9)
+
+    def test_global_cap(self):
+        controller = AdmissionController(max_concurrent=1)
+        controller.admit('provide_resources', 'a')
+        self.assertRaises(RateLimitedError, controller.admit, 'list_resources', 'b')
+        controller.release()
+        controller.admit('list_resources', 'b')
+
+    def test_config(self):
+        fd, path = tempfile.mkstemp(suffix='.ini')
+        with os.fdopen(fd, 'w') as f:
+            f.write("[system]\nprovide_resources_rate = 2\nuser_rate = 5\nuser_burst = 10\n")
+        try:
+            self.assertIsNone(get_admission_controller(DummyManager('/nonexistent.ini')))
+            controller = get_admission_controller(DummyManager(path))
+            self.assertEqual(controller.method_rates, {'provide_resources': (2.0, 2.0)})
+            self.assertEqual(controller.user_rate, (5.0, 10.0))
+            self.assertEqual(controller.max_concurrent, 0)
+        finally:
+            os.remove(path)
+
+    def test_retry_after_metadata(self):
+        controller = AdmissionController({'refresh_resources': (0.1, 1)})
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2),
+                             interceptors=[AdmissionInterceptor(controller)])
+        messages_pb2_grpc.add_ManagerAgentServicer_to_server(_ManagerAgent(DummyManager('/nonexistent.ini')), server)
+        port = server.add_insecure_port('localhost:0')
+        server.start()
+        try:
+            with grpc.insecure_channel('localhost:%d' % port) as channel:
+                stub = messages_pb2_grpc.ManagerAgentStub(channel)
+                user_info = messages_pb2.UserInfo(name='user')
+                stub.refresh_resources(user_info, timeout=5)
+                with self.assertRaises(grpc.RpcError) as raised:
+                    stub.refresh_resources(user_info, timeout=5)
+                self.assertEqual(raised.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+                self.assertGreater(int(dict(raised.exception.trailing_metadata())['retry-after-ms']), 9000)
+                stub.heartbeat(messages_pb2.Empty(), timeout=5)
+            self.assertEqual(controller.running, 0)
+        finally:
+            server.stop(None)
+
+    def test_rejected_latency(self):
+        controller = AdmissionController({'refresh_resources': (0.1, 1)})
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2),
+                             interceptors=[MetricsInterceptor(), AdmissionInterceptor(controller)])
+        messages_pb2_grpc.add_ManagerAgentServicer_to_server(_ManagerAgent(DummyManager('/nonexistent.ini')), server)
+        port = server.add_insecure_port('localhost:0')
+        server.start()
+        latency = metrics.RECENT_LATENCY
+        metrics.RECENT_LATENCY = metrics.RecentLatency()
+        rejected = metrics.REJECTED_CALLS.get(method='refresh_resources')
+        try:
+            with grpc.insecure_channel('localhost:%d' % port) as channel:
+                stub = messages_pb2_grpc.ManagerAgentStub(channel)
+                user_info = messages_pb2.UserInfo(name='user')
+                stub.refresh_resources(user_info, timeout=5)
+                for _ in range(3):
+                    self.assertRaises(grpc.RpcError, stub.refresh_resources, user_info, timeout=5)
+            self.assertEqual(len(metrics.RECENT_LATENCY._samples['refresh_resources']), 1)
+            self.assertEqual(metrics.REJECTED_CALLS.get(method='refresh_resources'), rejected + 3)
+        finally:
+            metrics.RECENT_LATENCY = latency
+            server.stop(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
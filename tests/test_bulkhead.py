@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import unittest
+
+import grpc
+
+from sdk.softfire.bulkhead import AsyncBulkhead, Bulkhead
+from sdk.softfire.interceptors import AsyncBulkheadInterceptor
+from sdk.softfire.main import _AsyncManagerAgent
+from sdk.softfire.utils import ServerBusyError, rpc_method_key
+from sdk.softfire.grpc import messages_pb2, messages_pb2_grpc
+from tests.test_server import DummyAsyncManager
+
+
+class BulkheadTestCase(unittest.TestCase):
+    def test_reject_when_full(self):
+        bulkhead = Bulkhead('provide_resources', max_concurrent=1, max_queue=1)
+        bulkhead.acquire()
+        queued = threading.Thread(target=bulkhead.acquire)
+        queued.start()
+        while bulkhead.waiting == 0:
+            pass
+        with self.assertRaises(ServerBusyError):
+            bulkhead.acquire()
+        bulkhead.release()
+        queued.join(timeout=5)
+        self.assertFalse(queued.is_alive())
+        self.assertEqual(bulkhead.running, 1)
+        self.assertEqual(bulkhead.waiting, 0)
+
+    def test_slot(self):
+        bulkhead = Bulkhead('list_resources', max_concurrent=2, max_queue=0)
+        with bulkhead.slot():
+            with bulkhead.slot():
+                self.assertRaises(ServerBusyError, bulkhead.acquire)
+        self.assertEqual(bulkhead.running, 0)
+
+    def test_async_reject_when_full(self):
+        async def check():
+            bulkhead = AsyncBulkhead('provide_resources', max_concurrent=1, max_queue=1)
+            await bulkhead.acquire()
+            queued = asyncio.ensure_future(bulkhead.acquire())
+            while bulkhead.waiting == 0:
+                await asyncio.sleep(0)
+            with self.assertRaises(ServerBusyError):
+                await bulkhead.acquire()
+            await bulkhead.release()
+            await asyncio.wait_for(queued, 5)
+            self.assertEqual(bulkhead.running, 1)
+            self.assertEqual(bulkhead.waiting, 0)
+            await bulkhead.release()
+            async with bulkhead.slot():
+                self.assertEqual(bulkhead.running, 1)
+            self.assertEqual(bulkhead.running, 0)
+
+        asyncio.run(check())
+
+    def test_async_server(self):
+        class SlowManager(DummyAsyncManager):
+            async def provide_resources(self, user_info, payload=None):
+                started.set()
+                await release.wait()
+                return await super().provide_resources(user_info, payload)
+
+        async def check():
+            bulkhead = AsyncBulkhead('provide_resources', max_concurrent=1, max_queue=0)
+            server = grpc.aio.server(interceptors=[AsyncBulkheadInterceptor({'provide_resources': bulkhead})])
+            agent = _AsyncManagerAgent(SlowManager('/nonexistent.ini'))
+            messages_pb2_grpc.add_ManagerAgentServicer_to_server(agent, server)
+            port = server.add_insecure_port('localhost:0')
+            await server.start()
+            try:
+                async with grpc.aio.insecure_channel('localhost:%d' % port) as channel:
+                    stub = messages_pb2_grpc.ManagerAgentStub(channel)
+                    request = messages_pb2.RequestMessage(method=messages_pb2.PROVIDE_RESOURCES,
+                                                          user_info=messages_pb2.UserInfo(name='user'))
+                    running = asyncio.ensure_future(stub.execute(request, timeout=5))
+                    await asyncio.wait_for(started.wait(), 5)
+                    with self.assertRaises(grpc.RpcError) as raised:
+                        await stub.execute(request, timeout=5)
+                    self.assertEqual(raised.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+                    await stub.execute(messages_pb2.RequestMessage(method=messages_pb2.LIST_RESOURCES), timeout=5)
+                    release.set()
+                    self.assertEqual((await running).result, messages_pb2.Ok)
+                self.assertEqual(bulkhead.running, 0)
+            finally:
+                await server.stop(None)
+                agent.close()
+
+        started = asyncio.Event()
+        release = asyncio.Event()
+        asyncio.run(check())
+
+    def test_rpc_method_key(self):
+        request = messages_pb2.RequestMessage(method=messages_pb2.PROVIDE_RESOURCES)
+        self.assertEqual(rpc_method_key('/ManagerAgent/execute', request), 'provide_resources')
+        self.assertEqual(rpc_method_key('/ManagerAgent/heartbeat', messages_pb2.Empty()), 'heartbeat')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from sdk.softfire.cache import AsyncSingleFlight, ResponseCache, SingleFlight, TTLCache
+from sdk.softfire.cancellation import CancellationToken, cancellation_scope, current_cancellation_token
+from sdk.softfire.grpc import messages_pb2
+from sdk.softfire.utils import CancelledError
+
+
+class TTLCacheTestCase(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_expiration(self):
+        cache = TTLCache(max_size=2, ttl=-1)
+        cache.put('a', 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate_user(self):
+        cache = ResponseCache(max_size=10, ttl=60)
+        alice = messages_pb2.UserInfo(name='alice')
+        bob = messages_pb2.UserInfo(name='bob')
+        cache.put(cache.key('list_resources', alice, 'payload'), 1)
+        cache.put(cache.key('refresh_resources', alice), 2)
+        cache.put(cache.key('list_resources', bob, 'payload'), 3)
+        self.assertNotEqual(cache.key('list_resources', alice, 'payload'), cache.key('list_resources', alice, 'x'))
+        cache.invalidate_user(alice)
+        self.assertIsNone(cache.get(cache.key('list_resources', alice, 'payload')))
+        self.assertIsNone(cache.get(cache.key('refresh_resources', alice)))
+        self.assertEqual(cache.get(cache.key('list_resources', bob, 'payload')), 3)
+
+    def test_invalidated_while_computing(self):
+        cache = ResponseCache(max_size=10, ttl=60)
+        alice_key = cache.key('list_resources', messages_pb2.UserInfo(name='alice'), 'payload')
+        bob_key = cache.key('list_resources', messages_pb2.UserInfo(name='bob'), 'payload')
+        alice_generation = cache.generation(alice_key)
+        bob_generation = cache.generation(bob_key)
+        cache.invalidate_user(messages_pb2.UserInfo(name='alice'))
+        self.assertFalse(cache.put_if_valid(alice_key, 1, alice_generation))
+        self.assertIsNone(cache.get(alice_key))
+        self.assertTrue(cache.put_if_valid(bob_key, 2, bob_generation))
+        cache.invalidate()
+        self.assertFalse(cache.put_if_valid(bob_key, 2, bob_generation))
+        self.assertTrue(cache.put_if_valid(alice_key, 1, cache.generation(alice_key)))
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    def test_coalesce(self):
+        single_flight = SingleFlight()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'result'
+
+        threads = [threading.Thread(target=lambda: results.append(single_flight.do('key', compute)))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['result'] * 5)
+        self.assertEqual(single_flight.do('key', lambda: 'again'), 'again')
+
+    def test_error_is_shared(self):
+        def compute():
+            raise ValueError('boom')
+
+        self.assertRaises(ValueError, SingleFlight().do, 'key', compute)
+
+    def test_first_caller_cancelled(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        results = {}
+
+        def compute():
+            started.set()
+            token = current_cancellation_token()
+            token.wait(0.3)
+            token.check()
+            return 'result'
+
+        def call(name, token):
+            with cancellation_scope(token):
+                try:
+                    results[name] = single_flight.do('key', compute, cancellable=True)
+                except CancelledError:
+                    results[name] = 'cancelled'
+
+        first, second = CancellationToken(), CancellationToken()
+        threads = [threading.Thread(target=call, args=['first', first])]
+        threads[0].start()
+        started.wait(5)
+        threads.append(threading.Thread(target=call, args=['second', second]))
+        threads[1].start()
+        first.cancel()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, {'first': 'result', 'second': 'result'})
+
+        started.clear()
+        first, second = CancellationToken(), CancellationToken()
+        threads = [threading.Thread(target=call, args=['first', first])]
+        threads[0].start()
+        started.wait(5)
+        threads.append(threading.Thread(target=call, args=['second', second]))
+        threads[1].start()
+        time.sleep(0.05)
+        second.cancel()
+        first.cancel()
+        start = time.monotonic()
+        for t in threads:
+            t.join()
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertEqual(results, {'first': 'cancelled', 'second': 'cancelled'})
+
+    def test_async_coalesce(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def run():
+            return await asyncio.gather(*[single_flight.do('key', compute) for _ in range(5)])
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(loop.run_until_complete(run()), ['result'] * 5)
+        finally:
+            loop.close()
+        self.assertEqual(len(calls), 1)
+
+    def test_async_first_caller_cancelled(self):
+        single_flight = AsyncSingleFlight()
+        tokens = []
+
+        async def compute():
+            tokens.append(current_cancellation_token())
+            await asyncio.sleep(0.2)
+            current_cancellation_token().check()
+            return 'result'
+
+        async def run():
+            first = asyncio.ensure_future(single_flight.do('key', compute, cancellable=True))
+            second = asyncio.ensure_future(single_flight.do('key', compute, cancellable=True))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            result = await second
+            third = asyncio.ensure_future(single_flight.do('key', compute, cancellable=True))
+            await asyncio.sleep(0.05)
+            third.cancel()
+            await asyncio.sleep(0)
+            return first.cancelled(), result, third.cancelled()
+
+        self.assertEqual(asyncio.run(run()), (True, 'result', True))
+        self.assertEqual(len(tokens), 2)
+        self.assertFalse(tokens[0].cancelled)
+        self.assertTrue(tokens[1].cancelled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import threading
+import time
+import unittest
+from concurrent import futures
+
+import grpc
+
+from sdk.softfire.cancellation import CancellationToken, cancellation_scope, current_cancellation_token
+from sdk.softfire.grpc import messages_pb2, messages_pb2_grpc
+from sdk.softfire.interceptors import CancellationInterceptor
+from sdk.softfire.main import _ManagerAgent
+from sdk.softfire.utils import CancelledError
+from tests.test_server import DummyManager, _request
+
+
+class _SlowManager(DummyManager):
+    def __init__(self, config_file_path):
+        super().__init__(config_file_path)
+        self.stopped = threading.Event()
+
+    def provide_resources(self, user_info, payload=None):
+        token = self.get_cancellation_token()
+        while not token.wait(0.01):
+            pass
+        self.stopped.set()
+        token.check()
+
+
+class _TokenManager(DummyManager):
+    def provide_resources(self, user_info, payload=None):
+        self.token = self.get_cancellation_token()
+        self.timeout = self.token.request_timeout()
+        self.token.wait(0.01)
+        return []
+
+
+class _SharedListManager(DummyManager):
+    def list_resources(self, user_info=None, payload=None):
+        token = self.get_cancellation_token()
+        token.wait(0.5)
+        token.check()
+        return super().list_resources(user_info, payload)
+
+
+class CancellationTestCase(unittest.TestCase):
+    def test_token(self):
+        token = CancellationToken(timeout=60)
+        self.assertFalse(token.cancelled)
+        self.assertGreater(token.time_remaining(), 59)
+        token.cancel()
+        self.assertTrue(token.wait(60))
+        self.assertRaises(CancelledError, token.check)
+        self.assertTrue(CancellationToken(timeout=0).cancelled)
+        self.assertIsNone(CancellationToken().time_remaining())
+        called = []
+        token = CancellationToken()
+        token.add_callback(lambda: called.append(1))
+        token.cancel()
+        token.cancel()
+        token.add_callback(lambda: called.append(2))
+        self.assertEqual(called, [1, 2])
+
+    def test_child(self):
+        token = CancellationToken(timeout=60)
+        self.assertLessEqual(token.child(120).time_remaining(), 60)
+        self.assertLess(token.child(1).time_remaining(), 2)
+        child = token.child()
+        token.cancel()
+        self.assertTrue(child.cancelled)
+        self.assertTrue(token.child().cancelled)
+
+    def test_scope(self):
+        token = CancellationToken()
+        self.assertIsNot(current_cancellation_token(), token)
+        with cancellation_scope(token):
+            self.assertIs(current_cancellation_token(), token)
+        self.assertIsNot(current_cancellation_token(), token)
+
+    def test_deadline_reaches_manager(self):
+        manager = _SlowManager('/nonexistent.ini')
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2), interceptors=[CancellationInterceptor()])
+        messages_pb2_grpc.add_ManagerAgentServicer_to_server(_ManagerAgent(manager), server)
+        port = server.add_insecure_port('localhost:0')
+        server.start()
+        try:
+            with grpc.insecure_channel('localhost:%d' % port) as channel:
+                stub = messages_pb2_grpc.ManagerAgentStub(channel)
+                start = time.monotonic()
+                with self.assertRaises(grpc.RpcError):
+                    stub.execute(_request(messages_pb2.PROVIDE_RESOURCES), timeout=0.2)
+            self.assertTrue(manager.stopped.wait(5))
+            self.assertLess(time.monotonic() - start, 5)
+        finally:
+            server.stop(None)
+
+    def test_coalesced_first_caller_cancelled(self):
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2), interceptors=[CancellationInterceptor()])
+        messages_pb2_grpc.add_ManagerAgentServicer_to_server(_ManagerAgent(_SharedListManager('/nonexistent.ini')),
+                                                             server)
+        port = server.add_insecure_port('localhost:0')
+        server.start()
+        try:
+            with grpc.insecure_channel('localhost:%d' % port) as channel:
+                stub = messages_pb2_grpc.ManagerAgentStub(channel)
+                first = stub.execute.future(_request(messages_pb2.LIST_RESOURCES), timeout=0.2)
+                time.sleep(0.1)
+                second = stub.execute(_request(messages_pb2.LIST_RESOURCES), timeout=5)
+                self.assertEqual(first.exception().code(), grpc.StatusCode.DEADLINE_EXCEEDED)
+        finally:
+            server.stop(None)
+        self.assertEqual(second.result, messages_pb2.Ok)
+        self.assertEqual([r.resource_id for r in second.list_resource.resources], ['res'])
+
+    def test_call_without_deadline(self):
+        manager = _TokenManager('/nonexistent.ini')
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2), interceptors=[CancellationInterceptor()])
+        messages_pb2_grpc.add_ManagerAgentServicer_to_server(_ManagerAgent(manager), server)
+        port = server.add_insecure_port('localhost:0')
+        server.start()
+        try:
+            with grpc.insecure_channel('localhost:%d' % port) as channel:
+                response = messages_pb2_grpc.ManagerAgentStub(channel).execute(
+                    _request(messages_pb2.PROVIDE_RESOURCES))
+        finally:
+            server.stop(None)
+        self.assertEqual(response.result, messages_pb2.Ok)
+        self.assertIsNone(manager.token.deadline)
+        self.assertIsNone(manager.timeout)
+
+    def test_request_timeout(self):
+        self.assertRaises(CancelledError, CancellationToken(timeout=0).request_timeout)
+        self.assertGreater(CancellationToken(timeout=60).request_timeout(), 59)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import configparser
+import os
+import tempfile
+import unittest
+
+from sdk.softfire import utils
+from sdk.softfire.utils import get_config, get_config_snapshot, reload_config
+
+_INI = """
+[system]
+server_threads = 3
+name = test-manager
+wait_for_em = false
+timeout = 1.5
+
+[formatter_simpleFormatter]
+format = %(levelname)s: %(message)s
+"""
+
+
+class ConfigSnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.config_file_path = tempfile.mkstemp(suffix='.ini')
+        with os.fdopen(fd, 'w') as f:
+            f.write(_INI)
+        reload_config()
+
+    def tearDown(self):
+        reload_config()
+        os.remove(self.config_file_path)
+
+    def test_parsed_once(self):
+        first = get_config_snapshot(self.config_file_path)
+        self.assertIs(first, get_config_snapshot(self.config_file_path))
+
+    def test_typed_accessors(self):
+        config = get_config_snapshot(self.config_file_path)
+        self.assertEqual(config.get_int('system', 'server_threads'), 3)
+        self.assertEqual(config.get_float('system', 'timeout'), 1.5)
+        self.assertFalse(config.get_bool('system', 'wait_for_em'))
+        self.assertTrue(config.get_bool('system', 'missing', True))
+        self.assertEqual(config.get('formatter_simpleFormatter', 'format'), '%(levelname)s: %(message)s')
+
+    def test_get_config(self):
+        self.assertEqual(get_config('system', 'name', self.config_file_path), 'test-manager')
+        self.assertEqual(get_config('system', 'missing', self.config_file_path, 'x'), 'x')
+        with self.assertRaises(configparser.NoOptionError):
+            get_config('system', 'missing', self.config_file_path)
+        with self.assertRaises(FileNotFoundError):
+            get_config('system', 'name', self.config_file_path + '.missing')
+
+    def test_reload_on_mtime_change(self):
+        first = get_config_snapshot(self.config_file_path)
+        with open(self.config_file_path, 'w') as f:
+            f.write(_INI.replace("[system]", "[system]\nip = 10.0.0.1"))
+        os.utime(self.config_file_path, (first.mtime + 10, first.mtime + 10))
+        self.assertIs(first, get_config_snapshot(self.config_file_path))
+        first._next_check = 0
+        second = get_config_snapshot(self.config_file_path)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.get('system', 'ip'), '10.0.0.1')
+
+    def test_reload_config(self):
+        first = get_config_snapshot(self.config_file_path)
+        reload_config(self.config_file_path)
+        self.assertIsNot(first, get_config_snapshot(self.config_file_path))
+        self.assertNotIn(self.config_file_path + '.missing', utils._config_snapshots)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import threading
+import time
+import unittest
+
+from sdk.softfire.cancellation import CancellationToken
+from sdk.softfire.fanout import fan_out
+from sdk.softfire.utils import CancelledError
+
+_TESTBEDS = {'fokus': {}, 'surrey': {'timeout': '0.2'}, 'ads': {}}
+
+
+class _Context(object):
+    """
+    ServicerContext of a call without deadline
+    """
+
+    def time_remaining(self):
+        return 9.22e18
+
+    def add_callback(self, callback):
+        pass
+
+
+class FanOutTestCase(unittest.TestCase):
+    def test_partial_results(self):
+        stopped = threading.Event()
+
+        def call(name, testbed, cancellation):
+            if name == 'surrey':
+                cancellation.wait(5)
+                stopped.set()
+                cancellation.check()
+            if name == 'ads':
+                raise Exception("unreachable")
+            time.sleep(0.1)
+            return name.upper()
+
+        start = time.monotonic()
+        result = fan_out(_TESTBEDS, call)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(result.results, {'fokus': 'FOKUS'})
+        self.assertEqual(sorted(result.errors), ['ads', 'surrey'])
+        self.assertEqual(result.errors['ads'], 'unreachable')
+        self.assertEqual(sorted(result.durations), ['ads', 'fokus', 'surrey'])
+        self.assertTrue(stopped.wait(1))
+
+    def test_cancelled(self):
+        token = CancellationToken()
+        token.cancel()
+        self.assertRaises(CancelledError, fan_out, _TESTBEDS, lambda name, testbed, cancellation: name, None, token)
+
+    def test_ignore_testbed_timeouts(self):
+        def call(name, testbed, cancellation):
+            cancellation.wait(0.4)
+            cancellation.check()
+            return name
+
+        result = fan_out({'surrey': {'timeout': '0.2'}}, call, testbed_timeouts=False)
+        self.assertEqual(result.results, {'surrey': 'surrey'})
+
+    def test_call_without_deadline(self):
+        context = _Context()
+        result = fan_out({'dt': {}, 'fokus': {'timeout': '30'}}, lambda name, testbed, cancellation: name, None,
+                         CancellationToken.from_context(context))
+        self.assertEqual(result.results, {'dt': 'dt', 'fokus': 'fokus'})
+        self.assertEqual(result.errors, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from sdk.softfire import metrics
+from sdk.softfire.bulkhead import Bulkhead
+from sdk.softfire.health import LoadReporter
+from sdk.softfire.main import _ManagerAgent
+from tests.test_server import DummyManager
+
+
+class LoadReporterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.bulkhead = Bulkhead('provide_resources', 3, 5)
+        self.reporter = LoadReporter(8, {'provide_resources': self.bulkhead})
+
+    def tearDown(self):
+        metrics.REQUESTS_IN_FLIGHT.set(0, rpc='execute', method='provide_resources')
+
+    def test_report(self):
+        metrics.REQUESTS_IN_FLIGHT.set(2, rpc='execute', method='provide_resources')
+        metrics.REQUESTS_IN_FLIGHT.set(1, rpc='heartbeat', method='heartbeat')
+        for duration in range(1, 101):
+            metrics.RECENT_LATENCY.observe(duration / 100.0, 'provide_resources')
+        self.bulkhead.waiting = 4
+        response = self.reporter.report()
+        self.assertTrue(response.ready)
+        self.assertEqual(response.capacity, 8)
+        self.assertGreaterEqual(response.in_flight, 2)
+        load = {method.method: method for method in response.methods}['provide_resources']
+        self.assertEqual((load.in_flight, load.queued, load.capacity), (2, 4, 3))
+        self.assertAlmostEqual(load.p99_latency, 1.0)
+        self.assertNotIn('heartbeat', [method.method for method in response.methods])
+
+    def test_draining(self):
+        self.reporter.draining = True
+        self.assertFalse(self.reporter.report().ready)
+
+    def test_agent_heartbeat(self):
+        response = _ManagerAgent(DummyManager('/nonexistent.ini'), self.reporter).heartbeat(None, None)
+        self.assertEqual(response.capacity, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
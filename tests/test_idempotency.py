@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import unittest
+
+import grpc
+
+from sdk.softfire.grpc import messages_pb2, messages_pb2_grpc
+from sdk.softfire.interceptors import AsyncCancellationInterceptor
+from sdk.softfire.main import _AsyncManagerAgent, _ManagerAgent
+from tests.test_server import DummyAsyncManager, DummyManager, _request
+
+
+class _CountingManager(DummyManager):
+    def __init__(self, config_file_path):
+        super().__init__(config_file_path)
+        self.provided = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def provide_resources(self, user_info, payload=None):
+        self.provided += 1
+        self.gate.wait()
+        return ['{"n": %d}' % self.provided]
+
+
+class _SlowAsyncManager(DummyAsyncManager):
+    def __init__(self, config_file_path):
+        super().__init__(config_file_path)
+        self.provided = 0
+
+    async def provide_resources(self, user_info, payload=None):
+        self.provided += 1
+        await asyncio.sleep(0.6)
+        return ['{"n": %d}' % self.provided]
+
+
+class _Context(object):
+    def __init__(self, metadata=()):
+        self.metadata = metadata
+
+    def invocation_metadata(self):
+        return self.metadata
+
+
+def _provide(request_id=''):
+    request = _request(messages_pb2.PROVIDE_RESOURCES)
+    request.request_id = request_id
+    return request
+
+
+class IdempotencyTestCase(unittest.TestCase):
+    def test_completed_request(self):
+        manager = _CountingManager('/nonexistent.ini')
+        agent = _ManagerAgent(manager)
+        first = agent.execute(_provide('r1'), None)
+        self.assertEqual(agent.execute(_provide('r1'), None), first)
+        self.assertEqual(agent.execute(_provide(), _Context((('request-id', 'r1'),))), first)
+        self.assertEqual(manager.provided, 1)
+        agent.execute(_provide('r2'), None)
+        agent.execute(_provide(), None)
+        self.assertEqual(manager.provided, 3)
+
+    def test_in_flight_request(self):
+        manager = _CountingManager('/nonexistent.ini')
+        manager.gate.clear()
+        agent = _ManagerAgent(manager)
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(agent.execute(_provide('r1'), None)))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while not manager.provided:
+            manager.gate.wait(0.01)
+        manager.gate.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(manager.provided, 1)
+        self.assertEqual(len(responses), 3)
+        self.assertTrue(all(response == responses[0] for response in responses))
+
+    def test_async_completed_request(self):
+        async def provide_twice():
+            agent = _AsyncManagerAgent(DummyAsyncManager('/nonexistent.ini'))
+            try:
+                first = await agent.execute(_provide('r1'), None)
+                return first, await agent.execute(_provide('r1'), None), len(agent.request_results)
+            finally:
+                agent.close()
+
+        first, second, results = asyncio.run(provide_twice())
+        self.assertEqual(first, second)
+        self.assertEqual(results, 1)
+
+    def test_async_retry_after_deadline(self):
+        manager = _SlowAsyncManager('/nonexistent.ini')
+
+        async def timeout_then_retry():
+            server = grpc.aio.server(interceptors=[AsyncCancellationInterceptor()])
+            agent = _AsyncManagerAgent(manager)
+            messages_pb2_grpc.add_ManagerAgentServicer_to_server(agent, server)
+            port = server.add_insecure_port('localhost:0')
+            await server.start()
+            try:
+                async with grpc.aio.insecure_channel('localhost:%d' % port) as channel:
+                    stub = messages_pb2_grpc.ManagerAgentStub(channel)
+                    with self.assertRaises(grpc.RpcError) as raised:
+                        await stub.execute(_provide('r1'), timeout=0.3)
+                    self.assertEqual(raised.exception.code(), grpc.StatusCode.DEADLINE_EXCEEDED)
+                    return await stub.execute(_provide('r1'), timeout=5)
+            finally:
+                await server.stop(None)
+                agent.close()
+
+        response = asyncio.run(timeout_then_retry())
+        self.assertEqual(response.result, messages_pb2.Ok)
+        self.assertEqual(manager.provided, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
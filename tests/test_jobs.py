@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import unittest
+
+from sdk.softfire.grpc import messages_pb2
+from sdk.softfire.jobs import JobManager
+from sdk.softfire.main import _AsyncManagerAgent, _ManagerAgent
+from sdk.softfire.utils import ServerBusyError
+from tests.test_server import DummyAsyncManager, DummyManager, _request
+
+
+class _Aborted(Exception):
+    pass
+
+
+class _Context(object):
+    def is_active(self):
+        return True
+
+    def abort(self, code, details):
+        raise _Aborted(code)
+
+
+def _job_request(method, payload='x'):
+    request = _request(method, payload)
+    request.as_job = True
+    return request
+
+
+class JobManagerTestCase(unittest.TestCase):
+    def test_bounded_pool(self):
+        jobs = JobManager(max_workers=1, max_pending=1)
+        gate = threading.Event()
+        try:
+            first = jobs.submit(messages_pb2.PROVIDE_RESOURCES, lambda job: gate.wait(5))
+            while first.state == messages_pb2.JOB_PENDING:
+                gate.wait(0.01)
+            second = jobs.submit(messages_pb2.PROVIDE_RESOURCES, lambda job: job.add_resource('{}'))
+            self.assertEqual(second.state, messages_pb2.JOB_PENDING)
+            self.assertRaises(ServerBusyError, jobs.submit, messages_pb2.PROVIDE_RESOURCES, lambda job: None)
+            gate.set()
+            version, status = second.next_status(None)
+            while status.state != messages_pb2.JOB_DONE:
+                version, status = second.next_status(version, timeout=5)
+            self.assertEqual([r.content for r in status.resources], ['{}'])
+        finally:
+            gate.set()
+            jobs.shutdown(wait=True)
+
+    def test_failed_job_expires(self):
+        jobs = JobManager(max_workers=1, ttl=0)
+
+        def fail(job):
+            raise Exception("deploy failed")
+
+        job = jobs.submit(messages_pb2.RELEASE_RESOURCES, fail)
+        jobs.shutdown(wait=True)
+        self.assertEqual(job.state, messages_pb2.JOB_FAILED)
+        self.assertEqual(job.status().error_message, "deploy failed")
+        self.assertIsNone(jobs.get(job.job_id))
+
+
+class JobAgentTestCase(unittest.TestCase):
+    def test_sync_agent(self):
+        agent = _ManagerAgent(DummyManager('/nonexistent.ini'))
+        try:
+            response = agent.execute(_job_request(messages_pb2.PROVIDE_RESOURCES, payload='p'), None)
+            self.assertEqual(response.result, messages_pb2.Ok)
+            statuses = list(agent.watch_job(messages_pb2.JobRequest(job_id=response.job.job_id), _Context()))
+            self.assertEqual(statuses[-1].state, messages_pb2.JOB_DONE)
+            self.assertEqual([r.content for r in statuses[-1].resources], ['{"payload": "p"}'])
+            response = agent.execute(_job_request(messages_pb2.RELEASE_RESOURCES), None)
+            statuses = list(agent.watch_job(messages_pb2.JobRequest(job_id=response.job.job_id), _Context()))
+            self.assertEqual(statuses[-1].state, messages_pb2.JOB_FAILED)
+            self.assertEqual(agent.get_job(messages_pb2.JobRequest(job_id=response.job.job_id), None),
+                             statuses[-1])
+        finally:
+            agent.jobs.shutdown(wait=True)
+
+    def test_watchers_bounded(self):
+        manager = DummyManager('/nonexistent.ini')
+        gate = threading.Event()
+
+        def provide_resources(user_info, payload=None):
+            gate.wait(5)
+            return []
+
+        manager.provide_resources = provide_resources
+        agent = _ManagerAgent(manager)
+        agent.job_watches = threading.BoundedSemaphore(1)
+        try:
+            response = agent.execute(_job_request(messages_pb2.PROVIDE_RESOURCES), None)
+            request = messages_pb2.JobRequest(job_id=response.job.job_id)
+            watch = agent.watch_job(request, _Context())
+            next(watch)
+            self.assertRaises(_Aborted, next, agent.watch_job(request, _Context()))
+            gate.set()
+            self.assertEqual(list(watch)[-1].state, messages_pb2.JOB_DONE)
+            self.assertEqual(list(agent.watch_job(request, _Context()))[-1].state, messages_pb2.JOB_DONE)
+        finally:
+            gate.set()
+            agent.jobs.shutdown(wait=True)
+
+    def test_async_agent(self):
+        async def provide(agent):
+            response = await agent.execute(_job_request(messages_pb2.PROVIDE_RESOURCES, payload='p'), None)
+            request = messages_pb2.JobRequest(job_id=response.job.job_id)
+            return [status async for status in agent.watch_job(request, None)]
+
+        for manager in (DummyManager('/nonexistent.ini'), DummyAsyncManager('/nonexistent.ini')):
+            agent = _AsyncManagerAgent(manager)
+            try:
+                statuses = asyncio.run(provide(agent))
+            finally:
+                agent.close()
+            self.assertEqual(statuses[-1].state, messages_pb2.JOB_DONE)
+            self.assertEqual([r.content for r in statuses[-1].resources], ['{"payload": "p"}'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import urllib.request
+
+from sdk.softfire.metrics import MetricsRegistry, start_metrics_server
+
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge(self):
+        counter = self.registry.counter('calls_total', 'Calls', ('method',))
+        counter.inc(method='list_resources')
+        counter.inc(2, method='list_resources')
+        self.assertEqual(counter.get(method='list_resources'), 3)
+        gauge = self.registry.gauge('queue_depth', 'Queue', ('pool',))
+        gauge.set_function(lambda: 7, pool='server')
+        self.assertEqual(gauge.get(pool='server'), 7)
+        text = self.registry.render()
+        self.assertIn('# TYPE calls_total counter', text)
+        self.assertIn('calls_total{method="list_resources"} 3.0', text)
+        self.assertIn('queue_depth{pool="server"} 7.0', text)
+
+    def test_histogram(self):
+        histogram = self.registry.histogram('duration_seconds', 'Duration', ('method',), buckets=(0.1, 1))
+        histogram.observe(0.05, method='m')
+        histogram.observe(0.5, method='m')
+        histogram.observe(5, method='m')
+        text = self.registry.render()
+        self.assertIn('duration_seconds_bucket{method="m",le="0.1"} 1', text)
+        self.assertIn('duration_seconds_bucket{method="m",le="1.0"} 2', text)
+        self.assertIn('duration_seconds_bucket{method="m",le="+Inf"} 3', text)
+        self.assertIn('duration_seconds_count{method="m"} 3', text)
+
+    def test_http_endpoint(self):
+        self.registry.counter('calls_total', 'Calls').inc()
+        server = start_metrics_server(0, registry=self.registry)
+        try:
+            port = server.server_address[1]
+            body = urllib.request.urlopen('http://127.0.0.1:%d/metrics' % port, timeout=5).read().decode('utf-8')
+            self.assertIn('calls_total 1.0', body)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
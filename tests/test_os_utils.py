@@ -0,0 +1,324 @@
+import threading
+import time
+import unittest
+
+from sdk.softfire.cancellation import CancellationToken
+from sdk.softfire.grpc import messages_pb2
+from sdk.softfire.teardown import TeardownPlan, TeardownStep
+
+try:
+    from keystoneauth1.exceptions.http import Unauthorized
+    from sdk.softfire import os_utils
+except ImportError:
+    os_utils = None
+
+_TESTBED = {'username': 'admin', 'password': 'secret', 'auth_url': 'http://keystone:5000/v3', 'api_version': 3}
+
+
+class _Session(object):
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+
+class _FakeOSClient(object):
+    """
+    OSClient without OpenStack: counts the clients created
+    """
+    created = 0
+
+    def __init__(self, testbed_name, testbed, tenant_name=None, project_id=None, cancellation=None):
+        _FakeOSClient.created += 1
+        self.testbed_name = testbed_name
+        self.cancellation = cancellation
+
+    def bind(self, cancellation=None):
+        self.cancellation = cancellation
+
+
+class _Server(object):
+    def __init__(self, server_id, tenant_id):
+        self.id = server_id
+        self.tenant_id = tenant_id
+
+
+class _FakeServers(object):
+    """
+    nova servers API shortening the pages to max_limit, as osapi_max_limit does
+    """
+
+    def __init__(self, servers, max_limit):
+        self.servers = servers
+        self.max_limit = max_limit
+        self.markers = []
+
+    def list(self, search_opts=None, marker=None, limit=None):
+        self.markers.append(marker)
+        start = 0 if marker is None else [s.id for s in self.servers].index(marker) + 1
+        return self.servers[start:start + min(limit, self.max_limit)]
+
+
+class _FakeNeutron(object):
+    """
+    neutron client listing pages of page_size objects when retrieve_all is False
+    """
+
+    def __init__(self, **collections):
+        self.collections = collections
+        self.params = []
+
+    def _list(self, collection, retrieve_all=True, limit=None, **params):
+        self.params.append((collection, limit, params))
+        objects = [o for o in self.collections[collection]
+                   if all(o.get(key) == value for key, value in params.items() if key != 'fields')]
+        for start in range(0, len(objects), limit):
+            yield {collection: objects[start:start + limit]}
+
+    def list_networks(self, **params):
+        return self._list('networks', **params)
+
+    def list_ports(self, **params):
+        return self._list('ports', **params)
+
+    def list_security_groups(self, **params):
+        return self._list('security_groups', **params)
+
+
+@unittest.skipUnless(os_utils, "the OpenStack clients are not installed")
+class SharedAuthTestCase(unittest.TestCase):
+    def tearDown(self):
+        os_utils.forget_keystone_sessions()
+
+    def _os_client(self, api_version=3, auth_url='http://keystone:5000/v3', password='secret', tenant_name=None):
+        # the attributes _get_session reads, without authenticating
+        os_client = os_utils.OSClient.__new__(os_utils.OSClient)
+        os_client.__dict__.update(api_version=api_version, auth_url=auth_url, username='admin', password=password,
+                                  tenant_name=tenant_name, project_id=None, admin_tenant_name='admin',
+                                  admin_project_id='admin', project_domain_name='Default',
+                                  user_domain_name='Default', cancellation=CancellationToken(), _sessions=[])
+        return os_client
+
+    def test_shared_per_auth_url_and_project(self):
+        first, second = self._os_client(), self._os_client()
+        session = first._get_session('p1')
+        self.assertIs(second._get_session('p1').auth, session.auth)
+        self.assertIs(second._get_session('p1').session, session.session)
+        self.assertIsNot(first._get_session('p2').auth, session.auth)
+        self.assertIsNot(self._os_client(password='changed')._get_session('p1').auth, session.auth)
+        self.assertIsNot(self._os_client(auth_url='http://other:5000/v3')._get_session('p1').auth, session.auth)
+        self.assertEqual(len(first._sessions), 2)
+
+    def test_forget_auth_url(self):
+        session = self._os_client()._get_session('p1')
+        other = self._os_client(auth_url='http://other:5000/v3')._get_session('p1')
+        os_utils.forget_keystone_sessions('http://keystone:5000/v3')
+        self.assertIsNot(self._os_client()._get_session('p1').auth, session.auth)
+        self.assertIs(self._os_client(auth_url='http://other:5000/v3')._get_session('p1').auth, other.auth)
+        os_utils.forget_keystone_sessions()
+        self.assertIsNot(self._os_client(auth_url='http://other:5000/v3')._get_session('p1').auth, other.auth)
+
+    def test_concurrent_creation(self):
+        created = []
+
+        def create_auth():
+            created.append(1)
+            time.sleep(0.05)
+            return object()
+
+        auths = []
+
+        def get_auth():
+            auths.append(os_utils._get_shared_auth(('key',) * 3, create_auth).auth)
+
+        threads = [threading.Thread(target=get_auth) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(created), 1)
+        self.assertEqual(len(set(map(id, auths))), 1)
+
+    def test_v2_keystone_client(self):
+        os_client = self._os_client(api_version=2, auth_url='http://keystone:5000/v2.0', tenant_name='tenant')
+        keystone = os_client._create_keystone_client('tenant')
+        self.assertIs(keystone.session.auth, os_client._get_session().auth)
+        self.assertEqual(keystone.session.auth.tenant_name, 'tenant')
+
+
+@unittest.skipUnless(os_utils, "the OpenStack clients are not installed")
+class OSClientRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.os_client_class = os_utils.OSClient
+        os_utils.OSClient = _FakeOSClient
+        _FakeOSClient.created = 0
+        self.registry = os_utils.OSClientRegistry()
+
+    def tearDown(self):
+        os_utils.OSClient = self.os_client_class
+
+    def test_reuse_per_key(self):
+        with self.registry.client('fokus', _TESTBED, project_id='p1') as first:
+            pass
+        with self.registry.client('fokus', _TESTBED, project_id='p1') as second:
+            self.assertIs(second, first)
+            with self.registry.client('fokus', _TESTBED, project_id='p1') as concurrent:
+                self.assertIsNot(concurrent, first)
+        with self.registry.client('fokus', _TESTBED, project_id='p2') as other_project:
+            self.assertIsNot(other_project, first)
+        with self.registry.client('fokus', dict(_TESTBED, password='changed'), project_id='p1') as other_password:
+            self.assertIsNot(other_password, first)
+        self.assertEqual(_FakeOSClient.created, 4)
+        self.assertEqual(len(self.registry), 4)
+
+    def test_bind_cancellation(self):
+        first_token, second_token = CancellationToken(), CancellationToken()
+        with self.registry.client('fokus', _TESTBED, cancellation=first_token) as os_client:
+            self.assertIs(os_client.cancellation, first_token)
+        with self.registry.client('fokus', _TESTBED, cancellation=second_token) as reused:
+            self.assertIs(reused, os_client)
+            self.assertIs(reused.cancellation, second_token)
+        first_token.cancel()
+        self.assertFalse(reused.cancellation.cancelled)
+
+    def test_evict_after_auth_failure(self):
+        with self.assertRaises(Unauthorized):
+            with self.registry.client('fokus', _TESTBED) as os_client:
+                raise Unauthorized()
+        self.assertEqual(len(self.registry), 0)
+        with self.registry.client('fokus', _TESTBED) as other:
+            self.assertIsNot(other, os_client)
+        self.assertEqual(_FakeOSClient.created, 2)
+
+    def test_idle_ttl(self):
+        self.registry.idle_ttl = 0
+        with self.registry.client('fokus', _TESTBED) as os_client:
+            pass
+        with self.registry.client('fokus', _TESTBED) as other:
+            self.assertIsNot(other, os_client)
+
+    def test_invalidate(self):
+        with self.registry.client('fokus', _TESTBED):
+            pass
+        with self.registry.client('surrey', _TESTBED):
+            pass
+        self.registry.invalidate('fokus')
+        self.assertEqual(len(self.registry), 1)
+        self.registry.invalidate()
+        self.assertEqual(len(self.registry), 0)
+
+
+@unittest.skipUnless(os_utils, "the OpenStack clients are not installed")
+class OSClientBindTestCase(unittest.TestCase):
+    def _os_client(self, cancellation):
+        # the state of an OSClient after __init__, without authenticating
+        os_client = os_utils.OSClient.__new__(os_utils.OSClient)
+        os_client.cancellation = cancellation
+        for name in os_utils._PER_CALL_ATTRIBUTES:
+            setattr(os_client, name, None)
+        os_client.project_id = os_client.os_tenant_id = 'p1'
+        os_client._sessions = [_Session(cancellation.time_remaining())]
+        os_client._initial_state = {name: getattr(os_client, name) for name in os_utils._PER_CALL_ATTRIBUTES}
+        os_client._initial_sessions = 1
+        return os_client
+
+    def test_bind_restores_state(self):
+        first_token = CancellationToken(timeout=60)
+        os_client = self._os_client(first_token)
+        os_client.neutron = object()
+        os_client.os_tenant_id = 'p2'
+        os_client._sessions.append(_Session(first_token.time_remaining()))
+        second_token = CancellationToken(timeout=5)
+        os_client.bind(second_token)
+        self.assertIs(os_client.cancellation, second_token)
+        self.assertIsNone(os_client.neutron)
+        self.assertEqual(os_client.os_tenant_id, 'p1')
+        self.assertEqual(len(os_client._sessions), 1)
+        self.assertLessEqual(os_client._sessions[0].timeout, 5)
+        first_token.cancel()
+        self.assertFalse(os_client.cancellation.cancelled)
+
+    def test_bind_without_deadline(self):
+        os_client = self._os_client(CancellationToken(timeout=60))
+        os_client.bind(CancellationToken())
+        self.assertIsNone(os_client._sessions[0].timeout)
+
+
+@unittest.skipUnless(os_utils, "the OpenStack clients are not installed")
+class OSClientListTestCase(unittest.TestCase):
+    def _os_client(self, nova=None, neutron=None):
+        os_client = os_utils.OSClient.__new__(os_utils.OSClient)
+        os_client.nova = nova
+        os_client.neutron = neutron
+        return os_client
+
+    def test_neutron_params(self):
+        self.assertEqual(os_utils._neutron_params(tenant_id='p1'), {'tenant_id': 'p1'})
+        self.assertEqual(os_utils._neutron_params(('id', 'name'), tenant_id='p1'),
+                         {'tenant_id': 'p1', 'fields': ['id', 'name']})
+
+    def test_iter_servers(self):
+        servers = [_Server('s%d' % i, 'p1' if i % 2 else 'p2') for i in range(7)]
+        nova_servers = _FakeServers(servers, max_limit=2)
+        os_client = self._os_client(nova=type('Nova', (), {'servers': nova_servers})())
+        self.assertEqual([s.id for s in os_client.iter_servers('p1', page_size=3)], ['s1', 's3', 's5'])
+        # pages shortened by nova do not stop the paging, the empty page after the last partial one does
+        self.assertEqual(nova_servers.markers, [None, 's1', 's3', 's5', 's6'])
+
+    def test_iter_ports(self):
+        neutron = _FakeNeutron(ports=[{'id': str(i), 'tenant_id': 'p1' if i < 5 else 'p2'} for i in range(7)])
+        os_client = self._os_client(neutron=neutron)
+        pages = list(os_client._iter_neutron(neutron.list_ports, 'ports', 2, tenant_id='p1'))
+        self.assertEqual([p['id'] for p in pages], ['0', '1', '2', '3', '4'])
+        self.assertEqual([p['id'] for p in os_client.iter_ports('p1', fields=['status'], page_size=3)],
+                         ['0', '1', '2', '3', '4'])
+        self.assertEqual(neutron.params[-1], ('ports', 3, {'tenant_id': 'p1', 'fields': ['status', 'id']}))
+
+    def test_iter_networks(self):
+        neutron = _FakeNeutron(networks=[{'id': 'n1', 'tenant_id': 'p1'},
+                                         {'id': 'n2', 'tenant_id': 'p1', 'shared': True},
+                                         {'id': 'n3', 'tenant_id': 'admin', 'shared': True},
+                                         {'id': 'n4', 'tenant_id': 'admin', 'router:external': True},
+                                         {'id': 'n5', 'tenant_id': 'p2'}])
+        os_client = self._os_client(neutron=neutron)
+        self.assertEqual([n['id'] for n in os_client.iter_networks('p1', page_size=1)], ['n1', 'n2', 'n3', 'n4'])
+        self.assertEqual([n['id'] for n in os_client.iter_networks('p1', include_shared=False)], ['n1', 'n2'])
+
+    def test_iter_sec_groups(self):
+        neutron = _FakeNeutron(security_groups=[{'id': 'g%d' % i, 'tenant_id': 'p1'} for i in range(5)])
+        os_client = self._os_client(neutron=neutron)
+        self.assertEqual(len(list(os_client.iter_sec_groups('p1', fields=['id'], page_size=2))), 5)
+        self.assertEqual(neutron.params[-1], ('security_groups', 2, {'tenant_id': 'p1', 'fields': ['id']}))
+
+
+@unittest.skipUnless(os_utils, "the OpenStack clients are not installed")
+class DeleteTenantTestCase(unittest.TestCase):
+    def setUp(self):
+        self.os_client_class = os_utils.OSClient
+        self.teardown_plan = os_utils._teardown_plan
+        os_utils.OSClient = _FakeOSClient
+        self.deleted = []
+
+        def teardown_plan(os_client, username, project_id):
+            def list_servers():
+                time.sleep(0.3)
+                return ['server']
+
+            return TeardownPlan([TeardownStep('servers', list_servers, self.deleted.append),
+                                 TeardownStep('project', lambda: [project_id], self.deleted.append,
+                                              after=['servers'])])
+
+        os_utils._teardown_plan = teardown_plan
+
+    def tearDown(self):
+        os_utils.OSClient = self.os_client_class
+        os_utils._teardown_plan = self.teardown_plan
+        os_utils.forget_os_clients()
+
+    def test_testbed_timeout(self):
+        reports = os_utils.delete_tenant_and_user({'fokus': dict(_TESTBED, timeout='0.1')}, 'alice',
+                                                  {messages_pb2.FOKUS: 'p1'})
+        self.assertFalse(reports['fokus'].failed)
+        self.assertEqual(self.deleted, ['server', 'p1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
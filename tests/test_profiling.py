@@ -0,0 +1,60 @@
+import os
+import pstats
+import shutil
+import tempfile
+import time
+import unittest
+
+from sdk.softfire.profiling import RequestProfiler
+from sdk.softfire.utils import reload_config
+from tests.test_server import DummyManager
+
+
+class RequestProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        fd, self.config_file_path = tempfile.mkstemp(suffix='.ini')
+        os.close(fd)
+        reload_config()
+
+    def tearDown(self):
+        reload_config()
+        os.remove(self.config_file_path)
+        shutil.rmtree(self.profile_dir)
+
+    def _configure(self, every, threshold):
+        with open(self.config_file_path, 'w') as f:
+            f.write("[system]\nprofile_every = %s\nprofile_threshold = %s\nprofile_dir = %s\n" % (
+                every, threshold, self.profile_dir))
+        reload_config()
+        return RequestProfiler(DummyManager(self.config_file_path))
+
+    def test_sampling(self):
+        profiler = self._configure(every=2, threshold=0)
+        for _ in range(4):
+            with profiler.profile('list_resources', 'user'):
+                pass
+        files = os.listdir(self.profile_dir)
+        self.assertEqual(len(files), 2)
+        self.assertTrue(files[0].startswith('list_resources-user-'))
+        pstats.Stats(os.path.join(self.profile_dir, files[0]))
+
+    def test_threshold(self):
+        profiler = self._configure(every=0, threshold=0.05)
+        with profiler.profile('provide_resources', 'fast'):
+            pass
+        with profiler.profile('provide_resources', 'slow/user'):
+            time.sleep(0.1)
+        files = os.listdir(self.profile_dir)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].startswith('provide_resources-slow_user-'))
+
+    def test_disabled(self):
+        profiler = self._configure(every=0, threshold=0)
+        with profiler.profile('list_resources', 'user'):
+            pass
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
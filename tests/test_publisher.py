@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent import futures
+
+import grpc
+
+from sdk.softfire.channels import close_channels
+from sdk.softfire.grpc import messages_pb2, messages_pb2_grpc
+from sdk.softfire.publisher import StatusDigests, StatusPublisher
+
+
+class _StatusService(messages_pb2_grpc.RegistrationServiceServicer):
+    def __init__(self):
+        self.calls = []
+        self.resources = {}
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def update_status(self, request, context):
+        self.gate.wait()
+        self.calls.append([request.username])
+        return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
+
+    def update_status_stream(self, request_iterator, context):
+        self.gate.wait()
+        requests = list(request_iterator)
+        for request in requests:
+            self.resources[request.username] = [resource.content for resource in request.resources]
+        self.calls.append([request.username for request in requests])
+        return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
+
+
+class _UnaryStatusService(_StatusService):
+    update_status_stream = messages_pb2_grpc.RegistrationServiceServicer.update_status_stream
+
+
+def _status(username, *contents):
+    return messages_pb2.StatusMessage(username=username, manager_name='test',
+                                      resources=[messages_pb2.Resource(content=content)
+                                                 for content in contents or ('{}',)])
+
+
+class StatusPublisherTestCase(unittest.TestCase):
+    def _start(self, service):
+        self.service = service
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        messages_pb2_grpc.add_RegistrationServiceServicer_to_server(service, self.server)
+        port = self.server.add_insecure_port('localhost:0')
+        self.server.start()
+        fd, self.config_file_path = tempfile.mkstemp(suffix='.ini')
+        with os.fdopen(fd, 'w') as f:
+            f.write("[system]\nexperiment_manager_ip = localhost\nexperiment_manager_port = %d\n" % port)
+
+    def tearDown(self):
+        close_channels()
+        self.server.stop(None)
+        os.remove(self.config_file_path)
+
+    def test_coalesce_and_stream(self):
+        self._start(_StatusService())
+        self.service.gate.clear()
+        publisher = StatusPublisher(self.config_file_path)
+        publisher.publish(_status('first'))
+        # wait for the first batch to be in flight, then queue while the experiment manager is busy
+        while len(publisher):
+            time.sleep(0.01)
+        for i in range(3):
+            publisher.publish(_status('a', '{"v": %d}' % i))
+            publisher.publish(_status('b', '{"v": %d}' % i))
+        self.assertEqual(len(publisher), 2)
+        self.service.gate.set()
+        self.assertTrue(publisher.flush(5))
+        publisher.stop()
+        self.assertEqual(self.service.calls, [['first'], ['a', 'b']])
+
+    def test_fallback_to_unary(self):
+        self._start(_UnaryStatusService())
+        publisher = StatusPublisher(self.config_file_path)
+        publisher.publish(_status('a'))
+        self.assertTrue(publisher.flush(5))
+        publisher.publish(_status('b'))
+        self.assertTrue(publisher.flush(5))
+        publisher.stop()
+        self.assertEqual(self.service.calls, [['a'], ['b']])
+
+    def test_bounded(self):
+        self._start(_StatusService())
+        self.service.gate.clear()
+        publisher = StatusPublisher(self.config_file_path, max_size=2)
+        publisher.publish(_status('first'))
+        while len(publisher):
+            time.sleep(0.01)
+        for username in ('a', 'b', 'c'):
+            publisher.publish(_status(username))
+        self.service.gate.set()
+        self.assertTrue(publisher.flush(5))
+        publisher.stop()
+        self.assertEqual(self.service.calls, [['first'], ['b', 'c']])
+
+    def test_delta(self):
+        self._start(_StatusService())
+        digests = StatusDigests()
+        publisher = StatusPublisher(self.config_file_path, digests=digests)
+        publisher.publish(_status('a', '{"id": 1, "s": "ok"}', '{"id": 2, "s": "ok"}'))
+        publisher.publish(_status('b', '{"id": 3}'))
+        self.assertTrue(publisher.flush(5))
+        publisher.publish(_status('a', '{"s": "ok", "id": 1}', '{"id": 2, "s": "ok"}', '{"id": 4}'))
+        publisher.publish(_status('b', '{"id": 3}'))
+        self.assertTrue(publisher.flush(5))
+        digests.forget('b')
+        publisher.publish(_status('b', '{"id": 3}'))
+        self.assertTrue(publisher.flush(5))
+        publisher.stop()
+        self.assertEqual(self.service.calls, [['a', 'b'], ['a'], ['b']])
+        self.assertEqual(self.service.resources['a'], ['{"id": 4}'])
+
+    def test_removed_resources(self):
+        self._start(_StatusService())
+        digests = StatusDigests()
+        publisher = StatusPublisher(self.config_file_path, digests=digests)
+        publisher.publish(_status('a', '{"id": 1}', '{"id": 2}'))
+        self.assertTrue(publisher.flush(5))
+        publisher.publish(_status('a', '{"id": 1}'))
+        self.assertTrue(publisher.flush(5))
+        self.assertEqual(self.service.resources['a'], ['{"id": 1}'])
+        publisher.publish(_status('a', '{"id": 1}', '{"id": 2, "s": "error"}'))
+        self.assertTrue(publisher.flush(5))
+        publisher.publish(_status('a', '{"id": 1}', '{"id": 2, "s": "ok"}'))
+        self.assertTrue(publisher.flush(5))
+        self.assertEqual(self.service.resources['a'], ['{"id": 1}', '{"id": 2, "s": "ok"}'])
+        publisher.publish(messages_pb2.StatusMessage(username='a', manager_name='test'))
+        self.assertTrue(publisher.flush(5))
+        publisher.publish(messages_pb2.StatusMessage(username='a', manager_name='test'))
+        self.assertTrue(publisher.flush(5))
+        publisher.stop()
+        self.assertEqual(self.service.calls, [['a']] * 5)
+        self.assertEqual(self.service.resources['a'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
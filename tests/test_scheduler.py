@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+
+from sdk.softfire.scheduler import StatusScheduler
+
+
+class _Manager(object):
+    def __init__(self, changes=()):
+        self.changes = list(changes)
+        self.calls = 0
+        self.running = 0
+        self.overlapped = False
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def send_update(self):
+        self.running += 1
+        self.overlapped |= self.running > 1
+        self.gate.wait()
+        self.calls += 1
+        self.running -= 1
+        return self.changes.pop(0) if self.changes else False
+
+
+class StatusSchedulerTestCase(unittest.TestCase):
+    def test_adapt_interval(self):
+        scheduler = StatusScheduler(_Manager(), interval=4, min_interval=1, max_interval=16, jitter=0)
+        self.assertEqual(scheduler._next_delay(False), 8)
+        self.assertEqual(scheduler._next_delay(False), 16)
+        self.assertEqual(scheduler._next_delay(False), 16)
+        self.assertEqual(scheduler._next_delay(True), 8)
+        self.assertEqual(scheduler._next_delay(None), 8)
+        scheduler.poke()
+        self.assertEqual(scheduler._next_delay(True), 1)
+
+    def test_no_overlap(self):
+        manager = _Manager()
+        manager.gate.clear()
+        scheduler = StatusScheduler(manager)
+        thread = threading.Thread(target=scheduler.sweep)
+        thread.start()
+        while not manager.running:
+            time.sleep(0.01)
+        self.assertIsNone(scheduler.sweep())
+        manager.gate.set()
+        thread.join()
+        self.assertFalse(manager.overlapped)
+        self.assertEqual(manager.calls, 1)
+
+    def test_poke_and_stop(self):
+        manager = _Manager()
+        scheduler = StatusScheduler(manager, interval=60, min_interval=0.05, jitter=0)
+        stop_event = threading.Event()
+        thread = threading.Thread(target=scheduler.run, args=[stop_event])
+        thread.start()
+        time.sleep(0.1)
+        self.assertEqual(manager.calls, 0)
+        scheduler.poke()
+        time.sleep(0.3)
+        self.assertGreaterEqual(manager.calls, 1)
+        scheduler.stop()
+        thread.join(timeout=1)
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,335 @@
+import asyncio
+import functools
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from concurrent import futures
+
+import grpc
+
+from sdk.softfire import metrics
+from sdk.softfire.grpc import messages_pb2, messages_pb2_grpc
+from sdk.softfire.channels import close_channels, get_em_channel_options, get_registration_stub
+from sdk.softfire.main import _AsyncManagerAgent, _ForwardingDigests, _ForwardingScheduler, _ManagerAgent, \
+    _register_forever, _relay_worker_events, _resend_status, _unregister, _use_async_server, _use_status_scheduler, \
+    start_manager
+from sdk.softfire.manager import AbstractManager, AsyncAbstractManager
+from sdk.softfire.utils import reload_config
+
+_INI = """
+[system]
+server_threads = 2
+name = test-manager
+"""
+
+
+class DummyManager(AbstractManager):
+    def list_resources(self, user_info=None, payload=None):
+        return [messages_pb2.ResourceMetadata(resource_id='res')]
+
+    def validate_resources(self, user_info=None, payload=None):
+        pass
+
+    def provide_resources(self, user_info, payload=None):
+        return ['{"payload": "%s"}' % payload]
+
+    def release_resources(self, user_info, payload=None):
+        raise Exception("release failed")
+
+    def create_user(self, user_info):
+        return user_info
+
+    def refresh_resources(self, user_info):
+        return self.list_resources(user_info)
+
+
+class DummyAsyncManager(AsyncAbstractManager):
+    async def list_resources(self, user_info=None, payload=None):
+        return [messages_pb2.ResourceMetadata(resource_id='res')]
+
+    async def validate_resources(self, user_info=None, payload=None):
+        pass
+
+    async def provide_resources(self, user_info, payload=None):
+        await asyncio.sleep(0)
+        return ['{"payload": "%s"}' % payload]
+
+    async def release_resources(self, user_info, payload=None):
+        raise Exception("release failed")
+
+    async def create_user(self, user_info):
+        return user_info
+
+    async def refresh_resources(self, user_info):
+        return await self.list_resources(user_info)
+
+
+def _request(method, payload='x', username='user'):
+    return messages_pb2.RequestMessage(method=method, payload=payload,
+                                       user_info=messages_pb2.UserInfo(name=username))
+
+
+class ServerTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.config_file_path = tempfile.mkstemp(suffix='.ini')
+        with os.fdopen(fd, 'w') as f:
+            f.write(_INI)
+
+    def tearDown(self):
+        os.remove(self.config_file_path)
+
+    def _check_responses(self, call):
+        response = call('execute', _request(messages_pb2.LIST_RESOURCES))
+        self.assertEqual(response.list_resource.resources[0].resource_id, 'res')
+        response = call('execute', _request(messages_pb2.PROVIDE_RESOURCES, payload='p'))
+        self.assertEqual(response.provide_resource.resources[0].content, '{"payload": "p"}')
+        response = call('execute', _request(messages_pb2.RELEASE_RESOURCES))
+        self.assertEqual(response.result, messages_pb2.ERROR)
+        response = call('create_user', messages_pb2.UserInfo(name='user'))
+        self.assertEqual(response.name, 'user')
+        response = call('refresh_resources', messages_pb2.UserInfo(name='user'))
+        self.assertEqual(response.list_resource.resources[0].resource_id, 'res')
+
+    def test_response_cache(self):
+        with open(self.config_file_path, 'a') as f:
+            f.write("response_cache_ttl = 60\n")
+        manager = DummyManager(self.config_file_path)
+        calls = []
+        manager.list_resources = lambda user_info=None, payload=None: calls.append(payload) or []
+        agent = _ManagerAgent(manager)
+        agent.execute(_request(messages_pb2.LIST_RESOURCES), None)
+        agent.execute(_request(messages_pb2.LIST_RESOURCES), None)
+        agent.execute(_request(messages_pb2.LIST_RESOURCES, payload='y'), None)
+        self.assertEqual(calls, ['x', 'y'])
+        agent.execute(_request(messages_pb2.PROVIDE_RESOURCES), None)
+        agent.execute(_request(messages_pb2.LIST_RESOURCES), None)
+        self.assertEqual(calls, ['x', 'y', 'x'])
+
+    def test_sync_agent_stream(self):
+        agent = _ManagerAgent(DummyManager(self.config_file_path))
+        resources = list(agent.provide_resources_stream(_request(messages_pb2.PROVIDE_RESOURCES, payload='p'), None))
+        self.assertEqual([r.content for r in resources], ['{"payload": "p"}'])
+
+    def test_stream_error(self):
+        class _Aborted(Exception):
+            pass
+
+        class _Context(object):
+            def abort(self, code, details):
+                raise _Aborted(details)
+
+        class _AsyncContext(object):
+            async def abort(self, code, details):
+                raise _Aborted(details)
+
+        async def collect(agent):
+            request = _request(messages_pb2.PROVIDE_RESOURCES, payload='p')
+            return [r async for r in agent.provide_resources_stream(request, _AsyncContext())]
+
+        def fail(user_info, payload=None):
+            raise Exception("stream failed")
+
+        manager = DummyManager(self.config_file_path)
+        manager.provide_resources_stream = fail
+        errors = metrics.HANDLED_ERRORS.get()
+        agent = _ManagerAgent(manager)
+        with self.assertRaisesRegex(_Aborted, 'stream failed'):
+            list(agent.provide_resources_stream(_request(messages_pb2.PROVIDE_RESOURCES), _Context()))
+        self.assertEqual(metrics.HANDLED_ERRORS.get(), errors + 1)
+        agent = _AsyncManagerAgent(manager)
+        loop = asyncio.new_event_loop()
+        try:
+            with self.assertRaisesRegex(_Aborted, 'stream failed'):
+                loop.run_until_complete(collect(agent))
+        finally:
+            loop.close()
+            agent.close()
+        self.assertEqual(metrics.HANDLED_ERRORS.get(), errors + 2)
+
+    def test_async_agent_stream(self):
+        async def collect(agent):
+            request = _request(messages_pb2.PROVIDE_RESOURCES, payload='p')
+            return [r.content async for r in agent.provide_resources_stream(request, None)]
+
+        for manager in (DummyManager(self.config_file_path), DummyAsyncManager(self.config_file_path)):
+            agent = _AsyncManagerAgent(manager)
+            loop = asyncio.new_event_loop()
+            try:
+                self.assertEqual(loop.run_until_complete(collect(agent)), ['{"payload": "p"}'])
+            finally:
+                loop.close()
+                agent.close()
+
+    def test_sync_agent(self):
+        agent = _ManagerAgent(DummyManager(self.config_file_path))
+        self.assertFalse(_use_async_server(agent.abstract_manager))
+        self._check_responses(lambda name, request: getattr(agent, name)(request, None))
+
+    def _check_async_agent(self, manager):
+        agent = _AsyncManagerAgent(manager)
+        loop = asyncio.new_event_loop()
+        try:
+            self._check_responses(lambda name, request: loop.run_until_complete(getattr(agent, name)(request, None)))
+        finally:
+            loop.close()
+            agent.close()
+
+    def test_async_agent(self):
+        manager = DummyAsyncManager(self.config_file_path)
+        self.assertTrue(_use_async_server(manager))
+        self._check_async_agent(manager)
+
+    def test_async_agent_thread_adapter(self):
+        self._check_async_agent(DummyManager(self.config_file_path))
+
+
+class LifecycleTestCase(unittest.TestCase):
+    def setUp(self):
+        fd, self.config_file_path = tempfile.mkstemp(suffix='.ini')
+        with os.fdopen(fd, 'w') as f:
+            f.write(_INI + "wait_for_em = false\nexperiment_manager_ip = localhost\nexperiment_manager_port = 1\n"
+                           "ip = localhost\ndescription = test\nshutdown_grace = 1\n[messaging]\nbind_port = 0\n")
+
+    def tearDown(self):
+        os.remove(self.config_file_path)
+
+    def _check_stop(self, manager):
+        stop_event = threading.Event()
+        thread = threading.Thread(target=start_manager, args=[manager, stop_event])
+        thread.start()
+        time.sleep(0.5)
+        start = time.monotonic()
+        stop_event.set()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_stop_event(self):
+        self._check_stop(DummyManager(self.config_file_path))
+
+    def test_stop_event_async(self):
+        self._check_stop(DummyAsyncManager(self.config_file_path))
+
+    def test_workers(self):
+        with socket.socket() as probe:
+            probe.bind(('localhost', 0))
+            port = probe.getsockname()[1]
+        with open(self.config_file_path) as f:
+            ini = f.read().replace('bind_port = 0', 'bind_port = %d' % port)
+        ini = ini.replace('[messaging]', 'workers = 2\n[messaging]')
+        with open(self.config_file_path, 'w') as f:
+            f.write(ini)
+        stop_event = threading.Event()
+        thread = threading.Thread(target=start_manager, args=[DummyManager(self.config_file_path), stop_event])
+        thread.start()
+        try:
+            with grpc.insecure_channel('localhost:%d' % port) as channel:
+                grpc.channel_ready_future(channel).result(timeout=30)
+                response = messages_pb2_grpc.ManagerAgentStub(channel).heartbeat(messages_pb2.Empty(), timeout=5)
+                self.assertTrue(response.ready)
+        finally:
+            stop_event.set()
+            thread.join(timeout=15)
+        self.assertFalse(thread.is_alive())
+
+    def test_worker_events(self):
+        class StatusManager(DummyManager):
+            def _update_status(self):
+                return {}
+
+        manager = StatusManager(self.config_file_path)
+        self.assertFalse(_use_status_scheduler(manager))
+        with open(self.config_file_path) as f:
+            ini = f.read().replace('[messaging]', 'status_scheduler = true\n[messaging]')
+        with open(self.config_file_path, 'w') as f:
+            f.write(ini)
+        reload_config()
+        self.assertTrue(_use_status_scheduler(manager))
+        manager.get_status_digests().record('alice', frozenset([b'digest']))
+        scheduler = manager.get_status_scheduler()
+        scheduler._delay = scheduler.max_interval
+        events = queue.Queue()
+        digests = _ForwardingDigests(events)
+        digests.record('alice', frozenset([b'digest']))
+        digests.forget('alice')
+        _ForwardingScheduler(events).poke()
+        self.assertEqual(len(digests), 0)
+        _relay_worker_events(manager, events, timeout=1)
+        self.assertEqual(len(manager.get_status_digests()), 0)
+        self.assertEqual(scheduler._delay, scheduler.min_interval)
+        self.assertTrue(events.empty())
+
+
+class _FakeRegistrationService(messages_pb2_grpc.RegistrationServiceServicer):
+    def __init__(self):
+        self.registered = threading.Event()
+        self.failures = 1
+
+    def register(self, request, context):
+        if self.failures:
+            self.failures -= 1
+            context.abort(grpc.StatusCode.UNAVAILABLE, 'not yet')
+        self.registered.set()
+        return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
+
+    def unregister(self, request, context):
+        self.registered.clear()
+        return messages_pb2.ResponseMessage(result=messages_pb2.Ok)
+
+
+class RegistrationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.service = _FakeRegistrationService()
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        messages_pb2_grpc.add_RegistrationServiceServicer_to_server(self.service, self.server)
+        port = self.server.add_insecure_port('localhost:0')
+        self.server.start()
+        fd, self.config_file_path = tempfile.mkstemp(suffix='.ini')
+        with os.fdopen(fd, 'w') as f:
+            f.write(_INI + "experiment_manager_ip = localhost\nexperiment_manager_port = %d\nip = localhost\n"
+                           "description = test\nem_backoff_initial = 0.05\n[messaging]\nbind_port = 1\n" % port)
+
+    def tearDown(self):
+        close_channels()
+        self.server.stop(None)
+        os.remove(self.config_file_path)
+
+    def test_shared_channel(self):
+        stub = get_registration_stub(self.config_file_path)
+        self.assertIs(get_registration_stub(self.config_file_path), stub)
+        self.service.registered.set()
+        _unregister(self.config_file_path)
+        self.assertFalse(self.service.registered.is_set())
+        close_channels()
+        self.assertIsNot(get_registration_stub(self.config_file_path), stub)
+        _unregister(self.config_file_path)
+
+    def test_keepalive_within_server_policy(self):
+        options = dict(get_em_channel_options(self.config_file_path))
+        self.assertGreaterEqual(options['grpc.keepalive_time_ms'], 300000)
+
+    def test_register_retries(self):
+        registrations = metrics.REGISTRATIONS.get()
+        stop_event = threading.Event()
+        manager = DummyManager(self.config_file_path)
+        manager.get_status_digests().record('user', {'res': 'digest'})
+        thread = threading.Thread(target=_register_forever,
+                                  args=[self.config_file_path, stop_event, functools.partial(_resend_status, manager)])
+        thread.start()
+        try:
+            self.assertTrue(self.service.registered.wait(5))
+        finally:
+            stop_event.set()
+            thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(metrics.REGISTRATIONS.get(), registrations + 1)
+        self.assertEqual(len(manager.get_status_digests()), 0)
+        self.assertLess(metrics.TIME_TO_REGISTERED.get(), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
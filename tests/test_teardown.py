@@ -0,0 +1,76 @@
+import threading
+import time
+import unittest
+
+from sdk.softfire.cancellation import CancellationToken
+from sdk.softfire.teardown import TeardownPlan, TeardownStep
+from sdk.softfire.utils import CancelledError
+
+
+class _Cloud(object):
+    def __init__(self):
+        self.deleted = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def step(self, name, objects, after=(), fail=(), ignore_errors=False):
+        def delete(obj):
+            with self._lock:
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            time.sleep(0.05)
+            with self._lock:
+                self.running -= 1
+                if obj in fail:
+                    raise Exception("%s in use" % obj)
+                self.deleted.append((name, obj))
+
+        return TeardownStep(name, lambda: list(objects), delete, after, ignore_errors)
+
+
+class TeardownTestCase(unittest.TestCase):
+    def test_order_and_concurrency(self):
+        cloud = _Cloud()
+        plan = TeardownPlan([cloud.step('ports', ['p1', 'p2', 'p3', 'p4']),
+                             cloud.step('networks', ['n1'], after=['ports']),
+                             cloud.step('user', ['u1'])])
+        report = plan.run(max_workers=3)
+        self.assertFalse(report.failed)
+        self.assertEqual(cloud.max_running, 3)
+        self.assertEqual(cloud.deleted[-1], ('networks', 'n1'))
+        self.assertEqual(report.steps['ports'].deleted, 4)
+        self.assertIn('networks', report.summary())
+
+    def test_failed_step_blocks_dependents(self):
+        cloud = _Cloud()
+        plan = TeardownPlan([cloud.step('routers', ['r1'], fail=['r1']),
+                             cloud.step('ports', ['p1'], fail=['p1'], ignore_errors=True),
+                             cloud.step('networks', ['n1'], after=['ports']),
+                             cloud.step('project', ['x'], after=['routers', 'networks'])])
+        report = plan.run()
+        self.assertTrue(report.failed)
+        self.assertEqual(report.steps['routers'].errors, ['r1 in use'])
+        self.assertEqual(report.steps['networks'].deleted, 1)
+        self.assertTrue(report.steps['project'].skipped)
+        self.assertTrue(report.steps['routers'].blocking)
+        self.assertFalse(report.steps['ports'].blocking)
+        self.assertNotIn(('project', 'x'), cloud.deleted)
+
+    def test_invalid_plan(self):
+        cloud = _Cloud()
+        self.assertRaises(ValueError, TeardownPlan, [cloud.step('a', [], after=['b'])])
+        self.assertRaises(ValueError, TeardownPlan,
+                          [cloud.step('a', [], after=['b']), cloud.step('b', [], after=['a'])])
+
+    def test_cancelled(self):
+        cloud = _Cloud()
+        token = CancellationToken()
+        token.cancel()
+        plan = TeardownPlan([cloud.step('ports', ['p1'])])
+        self.assertRaises(CancelledError, plan.run, 2, token)
+        self.assertEqual(cloud.deleted, [])
+
+
+if __name__ == '__main__':
+    unittest.main()